@@ -82,10 +82,6 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
-    # Dev middleware: copy access_token cookie into Authorization header and
-    # perform lightweight role checks for protected paths. Keeps JWT auth
-    # working when the frontend uses httponly cookies in dev.
-    'user_accounts.middleware.RoleAuthorizationMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -143,6 +139,18 @@ if USE_SQLITE == '1' or USE_SQLITE.lower() in ('true', 'yes'):
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Take the write lock when a transaction starts (no deadlocking lock
+            # upgrades between concurrent ticket purchases) and wait for it
+            # instead of failing with "database is locked".
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
+            # A file-backed test database: the in-memory default uses shared-cache
+            # table locks that fail concurrent tests instead of waiting.
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
         }
     }
 
@@ -154,6 +162,30 @@ if USE_SQLITE == '1' or USE_SQLITE.lower() in ('true', 'yes'):
 # }
 
 
+# Cache (used for the global analytics snapshot). Per-process local memory by
+# default; CACHE_BACKEND=file shares entries between worker processes.
+if os.environ.get('CACHE_BACKEND', 'locmem').lower() == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', str(BASE_DIR / '.cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'campus-events',
+        }
+    }
+
+# /api/analytics/global/ snapshot: served from cache for ANALYTICS_CACHE_TTL
+# seconds, then served stale (while rebuilding in the background) for up to
+# ANALYTICS_CACHE_STALE more seconds. A TTL of 0 disables the cache.
+ANALYTICS_CACHE_TTL = int(os.environ.get('ANALYTICS_CACHE_TTL', '60'))
+ANALYTICS_CACHE_STALE = int(os.environ.get('ANALYTICS_CACHE_STALE', '300'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -224,11 +256,57 @@ REST_FRAMEWORK = {
     ]
 }
 
+# Per-process cache of JWT-resolved users, keyed by token jti (seconds; 0 = off).
+# Each request resolves its token once regardless; a short TTL such as 30 also
+# skips the users-table lookup for repeat requests with the same token.
+JWT_USER_CACHE_TTL = int(os.environ.get('JWT_USER_CACHE_TTL', '0'))
+JWT_USER_CACHE_SIZE = int(os.environ.get('JWT_USER_CACHE_SIZE', '1024'))
+
+# Event discovery pagination (/api/events/). Clients opt in with ?page_size=
+# and then follow the returned cursor links; page sizes are capped.
+EVENTS_PAGE_SIZE = int(os.environ.get('EVENTS_PAGE_SIZE', '20'))
+EVENTS_MAX_PAGE_SIZE = int(os.environ.get('EVENTS_MAX_PAGE_SIZE', '100'))
+# Attendee list pagination (/api/events/<id>/attendees/?page=)
+ATTENDEES_PAGE_SIZE = int(os.environ.get('ATTENDEES_PAGE_SIZE', '50'))
+ATTENDEES_MAX_PAGE_SIZE = int(os.environ.get('ATTENDEES_MAX_PAGE_SIZE', '500'))
+# Ranked event search (/api/events/search/?q=) is always paginated
+SEARCH_PAGE_SIZE = int(os.environ.get('SEARCH_PAGE_SIZE', '20'))
+SEARCH_MAX_PAGE_SIZE = int(os.environ.get('SEARCH_MAX_PAGE_SIZE', '100'))
+# Typeahead (/api/events/suggest/): each worker keeps an in-memory index that
+# signals keep current; it is rebuilt after this many seconds (0 = never) to
+# pick up writes made by other processes.
+SUGGEST_INDEX_MAX_AGE = int(os.environ.get('SUGGEST_INDEX_MAX_AGE', '300'))
+# Admission queue in front of /buy/ for ticket drops: switches on when an
+# event sees more than ADMISSION_HOT_THRESHOLD purchase attempts per second and
+# stays on for ADMISSION_COOLDOWN seconds; ADMISSION_MAX_ACTIVE buyers hold an
+# admission at a time, each for at most ADMISSION_TOKEN_TTL seconds.
+# Off by default: clients must handle the 429 by joining the queue, polling
+# /api/queue/status/ and retrying with X-Admission-Token, which the SPA does
+# not do yet. Queue state is per process, so enable it only with a single
+# worker (or sticky routing of each event's /buy/ and /queue/ requests).
+ADMISSION_QUEUE_ENABLED = os.environ.get('ADMISSION_QUEUE_ENABLED', '0').lower() in ('1', 'true', 'yes')
+ADMISSION_HOT_THRESHOLD = int(os.environ.get('ADMISSION_HOT_THRESHOLD', '20'))
+ADMISSION_COOLDOWN = int(os.environ.get('ADMISSION_COOLDOWN', '60'))
+ADMISSION_MAX_ACTIVE = int(os.environ.get('ADMISSION_MAX_ACTIVE', '50'))
+ADMISSION_TOKEN_TTL = int(os.environ.get('ADMISSION_TOKEN_TTL', '120'))
+ADMISSION_POLL_INTERVAL_MS = int(os.environ.get('ADMISSION_POLL_INTERVAL_MS', '1000'))
+# Largest batch of scans accepted by /api/events/<id>/checkin/bulk/ (offline
+# door scanners syncing their backlog)
+BULK_CHECKIN_MAX_SCANS = int(os.environ.get('BULK_CHECKIN_MAX_SCANS', '500'))
+# Build plain /api/events/ and /api/me/tickets/ lists straight from
+# values_list() rows instead of the DRF serializers (same output, less CPU).
+# The row converters are compiled from the serializers' declared fields; a
+# field they cannot render makes those lists use the serializers instead.
+FAST_LIST_SERIALIZATION = os.environ.get('FAST_LIST_SERIALIZATION', '1').lower() in ('1', 'true', 'yes')
+
 
 MEDIA_URL = "/media/"
 from pathlib import Path
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Background threads that render ticket QR PNGs after purchase
+QR_RENDER_WORKERS = int(os.environ.get('QR_RENDER_WORKERS', '2'))
+
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'no-reply@campusevents.local'
 
@@ -1,6 +1,6 @@
 # collegeEventsWeb/event_management/admin.py
 from django.contrib import admin
-from .models import Event, Payment, CalendarEntry
+from .models import Event, Payment, CalendarEntry, WaitlistEntry
 from ticket_services.models import Ticket
 
 @admin.register(Event)
@@ -42,3 +42,10 @@ class CalendarEntryAdmin(admin.ModelAdmin):
         return getattr(obj.event, "end_time", None)
     event_end.short_description = "Event end"
     event_end.admin_order_field = "event__end_time"
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ("id", "event", "user", "position", "status", "created_at", "promoted_at", "notified_at")
+    list_filter = ("status",)
+    search_fields = ("event__title", "user__email")
+    list_select_related = ("event", "user")
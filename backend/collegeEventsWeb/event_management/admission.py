@@ -0,0 +1,214 @@
+"""Admission queue in front of buy_ticket for high-demand ticket drops.
+
+When purchase attempts for an event spike (more than
+settings.ADMISSION_HOT_THRESHOLD per second), the event's queue switches on
+and buy_ticket turns away requests without a valid admission token (429).
+Clients then:
+
+1. POST /api/events/<id>/queue/ to get a signed queue token and a sequence
+   number,
+2. poll GET /api/queue/status/?token=... (no database access, no JWT) until
+   it reports ``admitted`` (or ``sold_out``),
+3. call buy with the token in the X-Admission-Token header.
+
+At most ADMISSION_MAX_ACTIVE tokens are admitted per event at a time. A slot
+frees up when its purchase finishes or ADMISSION_TOKEN_TTL seconds after
+admission, and the next sequence number is admitted. Positions and
+admissions advance in O(1) per call.
+
+The queue is in-process state, like the typeahead index: with several worker
+processes, requests for one event's queue must reach the same worker (sticky
+routing) or admission is per worker.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core import signing
+
+_SALT = 'event_management.admission'
+TOKEN_HEADER = 'HTTP_X_ADMISSION_TOKEN'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class EventQueue:
+    """FIFO admission state for one event."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_seq = 0           # last sequence number handed out
+        self.admitted_upto = 0      # every seq <= this has been admitted
+        self.active = OrderedDict()  # admitted seq -> admitted_at (admission order = expiry order)
+        self.users = {}             # user id -> seq while queued or admitted
+        self.hot_until = 0.0
+        self.sold_out = False       # set on a sold-out 409, cleared when a seat frees up
+        self._window_start = 0.0
+        self._window_count = 0
+
+    def _advance(self, now):
+        ttl = _setting('ADMISSION_TOKEN_TTL', 120)
+        while self.active:
+            admitted_at = next(iter(self.active.values()))
+            if now - admitted_at < ttl:
+                break
+            self.active.popitem(last=False)
+        max_active = _setting('ADMISSION_MAX_ACTIVE', 50)
+        while len(self.active) < max_active and self.admitted_upto < self.last_seq:
+            self.admitted_upto += 1
+            self.active[self.admitted_upto] = now
+
+    def is_hot(self, now):
+        return now < self.hot_until or self.admitted_upto < self.last_seq
+
+    def note_attempt(self, now):
+        """Count a purchase attempt; switch the queue on when attempts spike."""
+        if now - self._window_start >= 1.0:
+            self._window_start, self._window_count = now, 0
+        self._window_count += 1
+        if self._window_count > _setting('ADMISSION_HOT_THRESHOLD', 20):
+            self.hot_until = now + _setting('ADMISSION_COOLDOWN', 60)
+
+    def join(self, user_id, now):
+        seq = self.users.get(user_id)
+        if seq is None or (seq <= self.admitted_upto and seq not in self.active):
+            # new, or a previous admission that expired or was used: go to the back
+            self.last_seq += 1
+            seq = self.users[user_id] = self.last_seq
+        self.hot_until = max(self.hot_until, now + _setting('ADMISSION_COOLDOWN', 60))
+        self._advance(now)
+        return seq
+
+    def state(self, seq, now):
+        """('admitted', 0), ('waiting', n ahead), ('expired', 0) or ('sold_out', 0)."""
+        self._advance(now)
+        if self.sold_out:
+            return 'sold_out', 0
+        if seq > self.admitted_upto:
+            return 'waiting', seq - self.admitted_upto - 1
+        if seq in self.active:
+            return 'admitted', 0
+        return 'expired', 0
+
+    def release(self, seq, user_id, now):
+        self.active.pop(seq, None)
+        if self.users.get(user_id) == seq:
+            del self.users[user_id]
+        self._advance(now)
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def _queue(event_id):
+    queue = _queues.get(event_id)
+    if queue is None:
+        with _queues_lock:
+            queue = _queues.setdefault(event_id, EventQueue())
+    return queue
+
+
+def reset():
+    """Forget every queue (tests)."""
+    with _queues_lock:
+        _queues.clear()
+
+
+def enabled():
+    return _setting('ADMISSION_QUEUE_ENABLED', False)
+
+
+def _load_token(token):
+    try:
+        data = signing.loads(token, salt=_SALT)
+        return int(data['e']), int(data['u']), int(data['s'])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None
+
+
+def _status_payload(event_id, seq, state, ahead):
+    payload = {'event': event_id, 'sequence': seq, 'status': state}
+    if state == 'waiting':
+        payload['ahead'] = ahead
+        payload['poll_after_ms'] = _setting('ADMISSION_POLL_INTERVAL_MS', 1000)
+    return payload
+
+
+def join(event_id, user_id):
+    """Queue a user; returns the status payload including the token to poll with."""
+    queue = _queue(event_id)
+    now = time.monotonic()
+    with queue.lock:
+        seq = queue.join(user_id, now)
+        state, ahead = queue.state(seq, now)
+    payload = _status_payload(event_id, seq, state, ahead)
+    payload['token'] = signing.dumps({'e': event_id, 'u': user_id, 's': seq}, salt=_SALT, compress=False)
+    return payload
+
+
+def status(token):
+    """Status payload for a queue token, or None if the token is invalid."""
+    loaded = _load_token(token)
+    if loaded is None:
+        return None
+    event_id, _user_id, seq = loaded
+    queue = _queue(event_id)
+    now = time.monotonic()
+    with queue.lock:
+        state, ahead = queue.state(seq, now)
+    return _status_payload(event_id, seq, state, ahead)
+
+
+def gate(request, event_id, user_id):
+    """Admission check for buy_ticket.
+
+    Returns (admission, None) to let the purchase through, where admission is
+    the (event_id, user_id, seq) to release afterwards or None when the queue
+    is not in use, or (None, payload) with the 429 body to send back.
+    """
+    if not enabled():
+        return None, None
+    queue = _queue(event_id)
+    now = time.monotonic()
+    loaded = _load_token(request.META.get(TOKEN_HEADER, ''))
+    with queue.lock:
+        queue.note_attempt(now)
+        if queue.sold_out and queue.is_hot(now):
+            return None, {'detail': 'Event is sold out.', 'sold_out': True}
+        if loaded is not None and loaded[0] == event_id and loaded[1] == user_id:
+            state, _ahead = queue.state(loaded[2], now)
+            if state == 'admitted':
+                return loaded, None
+        if not queue.is_hot(now):
+            return None, None
+    return None, {
+        'detail': 'High demand: join the queue for this event to buy a ticket.',
+        'queue_url': f'/api/events/{event_id}/queue/',
+    }
+
+
+def mark_sold_out(event_id, sold_out=True):
+    """Remember (or forget) that an event has no seats left.
+
+    While the event is hot, queued buyers are then answered without each
+    reaching the purchase transaction for the same 409.
+    """
+    if not enabled():
+        return
+    queue = _queue(event_id)
+    with queue.lock:
+        queue.sold_out = sold_out
+
+
+def release(admission):
+    """Free an admitted slot once its purchase has finished."""
+    if admission is None:
+        return
+    event_id, user_id, seq = admission
+    queue = _queue(event_id)
+    with queue.lock:
+        queue.release(seq, user_id, time.monotonic())
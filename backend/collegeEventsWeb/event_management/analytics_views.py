@@ -1,58 +1,163 @@
-from datetime import timedelta
-from django.utils.timezone import now
-from django.db.models import Count
-from django.db.models.functions import TruncWeek
+import logging
+import threading
+import time as _time
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils.timezone import localdate, make_aware
+from django.db.models import Count, F, Func, Q, Subquery
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 # from user_accounts.permissions import IsAdmin  # (uncomment later if needed)
 from .models import Event, Ticket
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_TREND_WEEKS = 12
+# Window of the legacy 'trends_last_12_weeks' key, whatever ?weeks= says
+LEGACY_TREND_WEEKS = 12
+MAX_TREND_WEEKS = 104
+
+
+def _trend_weeks(request):
+    """Window length from ?weeks=, clamped to 1..MAX_TREND_WEEKS."""
+    try:
+        weeks = int(request.query_params.get('weeks', DEFAULT_TREND_WEEKS))
+    except (TypeError, ValueError):
+        weeks = DEFAULT_TREND_WEEKS
+    return min(max(weeks, 1), MAX_TREND_WEEKS)
+
+
+class _ScalarSubquery(Subquery):
+    """A one-value subquery that aggregate() accepts: it is the same for every row."""
+    contains_aggregate = True
+
+
+def _week_starts(weeks):
+    """Start of each of the last `weeks` weeks (oldest first), as aware datetimes.
+
+    Weeks start on Monday in the current timezone, like TruncWeek.
+    """
+    today = localdate()
+    current_week = today - timedelta(days=today.weekday())
+    return [make_aware(datetime.combine(current_week - timedelta(weeks=weeks - 1 - i), time.min))
+            for i in range(weeks)]
+
+
+def build_global_snapshot(weeks):
+    """Compute the global analytics payload in one query.
+
+    A single aggregate over the ticket table returns the totals and one pair
+    of conditional counts per week (weeks without tickets come back as
+    zeros), with the event count as a scalar subquery. The series covers
+    both the ?weeks= window and the legacy 12-week key.
+    """
+    starts = _week_starts(max(weeks, LEGACY_TREND_WEEKS))
+    ends = starts[1:] + [None]
+    counts = {}
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        in_week = Q(created_at__gte=start) & (Q(created_at__lt=end) if end else Q())
+        counts[f'issued_{i}'] = Count('id', filter=in_week)
+        counts[f'check_ins_{i}'] = Count('id', filter=in_week & Q(is_used=True))
+    totals = Ticket.objects.aggregate(
+        total_events=_ScalarSubquery(
+            Event.objects.order_by().values(n=Func(F('id'), function='COUNT'))),
+        total_tickets_issued=Count('id'),
+        unique_attendees=Count('owner', distinct=True),
+        **counts,
+    )
+    series = [
+        {
+            'week_start': localdate(start).isoformat(),
+            'tickets_issued': totals[f'issued_{i}'],
+            'check_ins': totals[f'check_ins_{i}'],
+        }
+        for i, start in enumerate(starts)
+    ]
+    return {
+        'total_events': totals['total_events'],
+        'total_tickets_issued': totals['total_tickets_issued'],
+        'unique_attendees': totals['unique_attendees'],
+        'weeks': weeks,
+        'trends': series[-weeks:],
+        # Kept for the admin dashboard, which reads this key: always 12 weeks
+        'trends_last_12_weeks': series[-LEGACY_TREND_WEEKS:],
+    }
+
+
+# ---------- snapshot cache (stale-while-revalidate) ----------
+def _snapshot_key(weeks):
+    return f'analytics:global:{weeks}'
+
+
+def _cache_windows():
+    return (max(getattr(settings, 'ANALYTICS_CACHE_TTL', 60), 0),
+            max(getattr(settings, 'ANALYTICS_CACHE_STALE', 300), 0))
+
+
+def _store_snapshot(weeks):
+    ttl, stale = _cache_windows()
+    entry = {'data': build_global_snapshot(weeks), 'built_at': _time.time()}
+    if ttl:
+        cache.set(_snapshot_key(weeks), entry, timeout=ttl + stale)
+    return entry
+
+
+def _refresh_in_background(weeks):
+    """Rebuild the snapshot on a daemon thread unless a rebuild is already running."""
+    lock_key = _snapshot_key(weeks) + ':refreshing'
+    ttl, _ = _cache_windows()
+    if not cache.add(lock_key, True, timeout=max(ttl, 30)):
+        return
+
+    def run():
+        try:
+            _store_snapshot(weeks)
+        except Exception:
+            # callers keep the stale snapshot until it expires
+            logger.exception('Background rebuild of the global analytics snapshot (%s weeks) failed', weeks)
+        finally:
+            cache.delete(lock_key)
+            connection.close()
+
+    threading.Thread(target=run, name='analytics-refresh', daemon=True).start()
+
+
+def _is_admin(user):
+    return bool(user and getattr(user, 'is_authenticated', False)
+                and (getattr(user, 'is_staff', False) or getattr(user, 'role', '') == 'admin'))
+
+
 @api_view(['GET'])
 def global_analytics(request):
+    """Global counters and weekly trends, served from a cached snapshot.
+
+    ?weeks= sets the trend window; ?fresh=1 (admins only) bypasses the cache.
+    The response reports when the snapshot was built and how old it is.
+    """
     try:
-        total_events = Event.objects.count()
-        total_tickets_issued = Ticket.objects.count()
-        unique_attendees = Ticket.objects.values('owner').distinct().count()
-
-        start = now() - timedelta(weeks=12)
-
-        weekly = (
-            Ticket.objects.filter(created_at__gte=start)
-            .annotate(week=TruncWeek('created_at'))
-            .values('week')
-            .annotate(tickets_issued=Count('id'))
-            .order_by('week')
-        )
-
-        by_week = {
-            (row['week'].date().isoformat() if row['week'] else None): {
-                'week_start': (row['week'].date().isoformat() if row['week'] else None),
-                'tickets_issued': row['tickets_issued'],
-                'check_ins': 0
-            }
-            for row in weekly
-        }
+        weeks = _trend_weeks(request)
+        ttl, stale = _cache_windows()
+        fresh = (request.query_params.get('fresh', '').lower() in ('1', 'true')
+                 and _is_admin(request.user))
+
+        entry = None if (fresh or not ttl) else cache.get(_snapshot_key(weeks))
+        age = _time.time() - entry['built_at'] if entry else None
+        if entry is None or age >= ttl + stale:
+            entry = _store_snapshot(weeks)
+            age = 0.0
+        elif age >= ttl:
+            # Serve the stale snapshot now and rebuild it for the next caller
+            _refresh_in_background(weeks)
 
-        used_weekly = (
-            Ticket.objects.filter(created_at__gte=start, is_used=True)
-            .annotate(week=TruncWeek('created_at'))
-            .values('week')
-            .annotate(count=Count('id'))
-            .order_by('week')
-        )
-        for row in used_weekly:
-            key = row['week'].date().isoformat() if row['week'] else None
-            by_week.setdefault(key, {'week_start': key, 'tickets_issued': 0, 'check_ins': 0})
-            by_week[key]['check_ins'] = row['count']
-
-        trends = list(by_week.values())
-
-        return Response({
-            'total_events': total_events,
-            'total_tickets_issued': total_tickets_issued,
-            'unique_attendees': unique_attendees,
-            'trends_last_12_weeks': trends,
+        data = dict(entry['data'])
+        data.update({
+            'snapshot_built_at': datetime.fromtimestamp(entry['built_at'], tz=dt_timezone.utc).isoformat(),
+            'snapshot_age_seconds': round(age, 1),
+            'snapshot_stale': bool(ttl) and age >= ttl,
         })
+        return Response(data)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -9,4 +9,7 @@ class EventManagementConfig(AppConfig):
     """
     default_auto_field = "django.db.models.BigAutoField"
     name = "event_management"
-    label = "event_management"
\ No newline at end of file
+    label = "event_management"
+    def ready(self):
+        # Register model signal handlers (EventStats rows for new events)
+        from . import signals  # noqa: F401
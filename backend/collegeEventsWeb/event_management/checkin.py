@@ -0,0 +1,118 @@
+"""Ticket check-in for door scanners.
+
+Both paths write only the check-in columns with a conditional UPDATE, so a
+ticket is checked in exactly once however many scanners race for it.
+
+Scanners that lose connectivity keep scanning and replay their backlog in one
+request once they are back online. bulk_check_in validates the whole batch
+with a single ``filter(pk__in=...)`` and marks the valid tickets used with a
+single ``UPDATE ... WHERE is_used = false``, recording each ticket's own scan
+time in checked_in_at. Ticket ids may be sent as bare UUIDs or as the scanned
+QR text; signed codes for another event are settled before the lookup.
+"""
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Ticket
+from .qr import parse_ticket_code
+from .stats import record_check_in
+
+OK, ALREADY_USED, UNKNOWN, WRONG_EVENT = 'ok', 'already-used', 'unknown', 'wrong-event'
+
+
+def _parse_scan(scan, now):
+    """(ScannedCode or None, ticket id as sent, scan time) for one scan.
+
+    A scan is {"ticket_id": ..., "scanned_at": ...} or a bare ticket id. A
+    missing or unreadable scan time counts as now; so does one in the future,
+    since a scanner clock running ahead must not date check-ins after the sync.
+    """
+    if isinstance(scan, dict):
+        raw, raw_time = scan.get('ticket_id'), scan.get('scanned_at')
+    else:
+        raw, raw_time = scan, None
+    code = parse_ticket_code(raw) if isinstance(raw, str) else None
+
+    scanned_at = None
+    if isinstance(raw_time, str):
+        try:
+            scanned_at = parse_datetime(raw_time)
+        except ValueError:
+            scanned_at = None
+    if scanned_at is None:
+        return code, raw, now
+    if timezone.is_naive(scanned_at):
+        scanned_at = timezone.make_aware(scanned_at)
+    return code, raw, min(scanned_at, now)
+
+
+def check_in_ticket(ticket_id, event_id):
+    """Mark one ticket used; returns False if it already was.
+
+    A single UPDATE ... WHERE is_used = false, so only the columns that change
+    are written and concurrent scans of the same ticket cannot both succeed.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        updated = (Ticket.objects
+                   .filter(pk=ticket_id, is_used=False)
+                   .update(is_used=True, checked_in_at=now, updated_at=now))
+        if updated:
+            record_check_in(event_id)
+    return bool(updated)
+
+
+def bulk_check_in(event_id, scans):
+    """Check in a batch of scans for one event; returns one result per scan, in order.
+
+    Each result is {"ticket_id", "result"} where result is ok, already-used
+    (including a repeat of a ticket earlier in the same batch), unknown or
+    wrong-event; ok and already-used results also carry checked_in_at.
+    """
+    now = timezone.now()
+    parsed = [_parse_scan(scan, now) for scan in scans]
+    ids = {code.ticket_id for code, _raw, _at in parsed
+           if code is not None and code.event_id in (None, event_id)}
+
+    results = []
+    with transaction.atomic():
+        # Locked so a concurrent check-in cannot slip between the read and the UPDATE
+        found = {
+            row[0]: row[1:]
+            for row in (Ticket.objects.select_for_update()
+                        .filter(pk__in=ids)
+                        .values_list('id', 'event_id', 'is_used', 'checked_in_at'))
+        }
+        to_mark = {}  # ticket id -> scan time; the first scan of a ticket wins
+        for code, raw, scanned_at in parsed:
+            result = {'ticket_id': raw}
+            ticket_id = code.ticket_id if code is not None else None
+            row = found.get(ticket_id)
+            if code is not None and code.event_id not in (None, event_id):
+                result['result'] = WRONG_EVENT
+            elif row is None:
+                result['result'] = UNKNOWN
+            elif row[0] != event_id:
+                result['result'] = WRONG_EVENT
+            elif row[1] or ticket_id in to_mark:
+                result['result'] = ALREADY_USED
+                result['checked_in_at'] = row[2] or to_mark.get(ticket_id)
+            else:
+                to_mark[ticket_id] = scanned_at
+                result['result'] = OK
+                result['checked_in_at'] = scanned_at
+            results.append(result)
+
+        if to_mark:
+            updated = Ticket.objects.filter(pk__in=list(to_mark), is_used=False).update(
+                is_used=True,
+                updated_at=now,
+                checked_in_at=Case(
+                    *[When(pk=ticket_id, then=Value(scanned_at)) for ticket_id, scanned_at in to_mark.items()],
+                    output_field=DateTimeField(),
+                ),
+            )
+            record_check_in(event_id, count=updated)
+    return results
@@ -0,0 +1,50 @@
+"""Conditional GET (ETag / If-None-Match) for event listings and details.
+
+The validator is computed from the queryset a view is about to serialize with
+one aggregate query: Max(Event.updated_at), Max(EventStats.updated_at) for the
+ticket counters, and Count(id) so deletions show up. Together with the query
+string it changes whenever the serialized page could. Polling clients that
+send If-None-Match therefore cost that single aggregate and get a bodiless
+304 instead of a re-serialized list.
+
+Names of a linked organizer or venue are not part of the validator; editing
+one alone does not invalidate the ETags of its events.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import parse_etags, quote_etag
+
+# Bump when the serialized representation changes shape
+ETAG_VERSION = '1'
+
+
+def events_etag(queryset, request):
+    """Return (row count, weak ETag) for the events in queryset as requested."""
+    agg = queryset.order_by().aggregate(
+        updated=Max('updated_at'),
+        stats_updated=Max('stats__updated_at'),
+        count=Count('id'),
+    )
+    parts = [
+        ETAG_VERSION,
+        request.get_full_path(),
+        str(agg['count']),
+        agg['updated'].isoformat() if agg['updated'] else '',
+        agg['stats_updated'].isoformat() if agg['stats_updated'] else '',
+    ]
+    digest = hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:32]
+    return agg['count'], 'W/' + quote_etag(digest)
+
+
+def _opaque(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def not_modified(request, etag):
+    """True if the request's If-None-Match matches etag (weak comparison)."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    return '*' in candidates or _opaque(etag) in {_opaque(c) for c in candidates}
@@ -0,0 +1,193 @@
+"""Read-only fast path for the hot list endpoints.
+
+``/api/events/`` and ``/api/me/tickets/`` spend most of their CPU in DRF's
+per-field machinery (``get_attribute``, ``to_representation`` and method
+fields, once per field per row). For plain list GETs those views instead
+fetch ``values_list()`` tuples and turn each one into the response dict with
+a converter compiled once per serializer.
+
+Converters are built from the serializer itself: its readable fields in
+order, each model field read from its ``source`` column, nested serializers
+compiled the same way under their relation, and computed fields read from the
+columns declared in ``Meta.field_sources`` (the same declarations
+``sparse.shape_queryset`` trims querysets with) and rendered by the helpers
+the serializer's own getters call. A field the compiler does not know (a new
+SerializerMethodField without an entry in ``_COMPUTED``, an unsupported field
+type) turns the fast path off for that serializer, so the lists fall back to
+the serializers rather than drift from them. ``EventFastPathTests`` compares
+the two outputs byte for byte.
+
+Requests that trim or expand the representation (?fields=, ?omit=, ?expand=,
+?view=slim) keep using the serializers, and
+``settings.FAST_LIST_SERIALIZATION = False`` turns the fast path off.
+"""
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+
+from .serializers import (
+    EventSerializer, TicketSerializer, google_calendar_url, image_url_or_default,
+    related_name, user_display_name,
+)
+from .sparse import has_sparse_params
+from .stats import count_event_tickets
+
+
+def _ticket_count(position):
+    def get(ctx, pk, issued, checked_in):
+        if issued is None:
+            # no EventStats row: counted once per page (see RowConverter.to_representation)
+            issued, checked_in = ctx.ticket_counts.get(pk, (0, 0))
+        return (issued, checked_in, max(issued - checked_in, 0))[position]
+    return get
+
+
+# Computed fields: (serializer, field) -> f(ctx, pk, *values of Meta.field_sources[field])
+_COMPUTED = {
+    (EventSerializer, "organizer_name"): lambda ctx, pk, email: user_display_name(email=email),
+    (EventSerializer, "venue_name"): lambda ctx, pk, name: name,
+    (EventSerializer, "category_name"): lambda ctx, pk, category: related_name(category),
+    (EventSerializer, "image_url"): lambda ctx, pk, value: image_url_or_default(value),
+    (EventSerializer, "tickets_issued"): _ticket_count(0),
+    (EventSerializer, "tickets_checked_in"): _ticket_count(1),
+    (EventSerializer, "tickets_pending"): _ticket_count(2),
+    (EventSerializer, "google_calendar_url"):
+        lambda ctx, pk, start, end, title, description, venue_name:
+            google_calendar_url(title, description, venue_name, start, end),
+    (TicketSerializer, "qr_png_url"): lambda ctx, pk, qr: ctx.file_url(qr, TicketSerializer.Meta.model, "qr"),
+}
+
+# Serializers whose rows need their ticket counts when the stats row is missing
+_COUNTED = {EventSerializer: "stats__tickets_issued"}
+
+
+class Unsupported(Exception):
+    """A serializer field the fast path cannot render."""
+
+
+def enabled(request, converter):
+    """True if a list request can use the fast path of converter."""
+    return (getattr(settings, "FAST_LIST_SERIALIZATION", True)
+            and request.method in ("GET", "HEAD")
+            and not has_sparse_params(request)
+            and converter.available)
+
+
+class _Context:
+    """Per-response state shared by the converters (timezone, request, ticket counts)."""
+
+    def __init__(self, request, ticket_counts):
+        self.request = request
+        self.tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        self.ticket_counts = ticket_counts
+
+    def datetime(self, value):
+        # DRF DateTimeField with DATETIME_FORMAT = "iso-8601"
+        if not value:
+            return None
+        if self.tz is not None:
+            value = value.astimezone(self.tz) if timezone.is_aware(value) else timezone.make_aware(value, self.tz)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, datetime.timezone.utc)
+        value = value.isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    def file_url(self, name, model, field):
+        # DRF FileField/ImageField with UPLOADED_FILES_USE_URL
+        if not name:
+            return None
+        url = model._meta.get_field(field).storage.url(name)
+        return self.request.build_absolute_uri(url) if self.request is not None else url
+
+
+def _plain(field, model, column, index):
+    """Getter for a model field rendered straight from its column."""
+    if isinstance(field, serializers.DateTimeField):
+        return lambda row, ctx: ctx.datetime(row[index])
+    if isinstance(field, serializers.FileField):
+        name = column.rsplit("__", 1)[-1]
+        return lambda row, ctx: ctx.file_url(row[index], model, name)
+    if isinstance(field, serializers.UUIDField):
+        return lambda row, ctx: None if row[index] is None else str(row[index])
+    if isinstance(field, (serializers.CharField, serializers.IntegerField, serializers.BooleanField,
+                          serializers.PrimaryKeyRelatedField)):
+        return lambda row, ctx: row[index]
+    raise Unsupported(field)
+
+
+def _compile(serializer, prefix, columns, counted):
+    """Plan for one serializer level: [(name, getter(row, ctx))], adding what it reads to columns."""
+
+    def column(lookup):
+        return columns.setdefault(prefix + lookup, len(columns))
+
+    serializer_class = type(serializer)
+    meta = serializer.Meta
+    model = meta.model
+    field_sources = getattr(meta, "field_sources", {})
+    pk = column(model._meta.pk.name)
+    if serializer_class in _COUNTED:
+        counted.append((pk, column(_COUNTED[serializer_class])))
+    plan = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            nested = _compile(field, prefix + field.source + "__", columns, counted)
+            plan.append((name, lambda row, ctx, nested=nested: {n: get(row, ctx) for n, get in nested}))
+        elif (serializer_class, name) in _COMPUTED:
+            compute = _COMPUTED[(serializer_class, name)]
+            indexes = [column(lookup) for lookup in field_sources[name]]
+            plan.append((name, lambda row, ctx, compute=compute, indexes=indexes:
+                         compute(ctx, row[pk], *[row[i] for i in indexes])))
+        elif isinstance(field, serializers.SerializerMethodField) or field.source == "*":
+            raise Unsupported(name)
+        else:
+            lookup = field.source.replace(".", "__")
+            plan.append((name, _plain(field, model, lookup, column(lookup))))
+    return plan
+
+
+class RowConverter:
+    """Builds a serializer's output from ``values_list()`` rows of fixed columns."""
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self._compiled = None
+
+    def _compile(self):
+        # compiled on first use: building the serializer's fields needs the app registry
+        if self._compiled is None:
+            columns, counted = {}, []
+            try:
+                plan = _compile(self.serializer_class(), "", columns, counted)
+            except Unsupported:
+                plan = None
+            self._compiled = (tuple(columns), plan, counted)
+        return self._compiled
+
+    @property
+    def available(self):
+        return self._compile()[1] is not None
+
+    @property
+    def columns(self):
+        return self._compile()[0]
+
+    def rows(self, queryset, named=False):
+        """The queryset as rows of this converter's columns (named rows work with cursor pagination)."""
+        return queryset.values_list(*self.columns, named=named)
+
+    def to_representation(self, rows, request=None):
+        _columns, plan, counted = self._compile()
+        rows = list(rows)
+        # one grouped COUNT for every event on the page without a stats row
+        missing = {row[pk] for row in rows for pk, issued in counted if row[issued] is None}
+        ctx = _Context(request, count_event_tickets(missing) if missing else {})
+        return [{name: get(row, ctx) for name, get in plan} for row in rows]
+
+
+EVENT_ROWS = RowConverter(EventSerializer)
+TICKET_ROWS = RowConverter(TicketSerializer)
@@ -0,0 +1,167 @@
+"""iCalendar (.ics) feeds for calendar apps to subscribe to.
+
+``/api/users/me/calendar.ics`` lists the events a user holds a ticket for or
+added to their calendar (CalendarEntry), once per event; ``/api/organizers/
+<id>/calendar.ics`` lists an organizer's approved events. The VCALENDAR is
+written one VEVENT at a time from ``values_list(...).iterator()`` and
+streamed, so a feed holds one DB chunk in memory however long it is.
+
+Calendar clients poll feeds every few minutes. Each response carries an ETag
+and Last-Modified computed from small aggregate queries (latest
+Event.updated_at, latest ticket / calendar-entry change, row counts), and
+``If-None-Match`` / ``If-Modified-Since`` are answered with a bodiless 304.
+Removing a ticket or calendar entry only changes the counts, so clients that
+revalidate with Last-Modified alone may see it one edit late; the ETag
+always changes. As with the event list ETags (see conditional.py), renaming
+a venue alone does not invalidate feeds.
+
+Calendar apps cannot send an Authorization header, so the personal feed also
+accepts ``?key=`` from ``feed_key``: the user id and an HMAC over it and the
+password hash, which stops working when the password changes.
+"""
+import hashlib
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import quote_etag
+
+from .models import CalendarEntry, Event, Ticket
+
+# Bump when the generated VEVENTs change shape
+FEED_VERSION = '1'
+FEED_CHUNK_SIZE = 2000
+PRODID = '-//Campus Events//Calendar Feed//EN'
+
+_KEY_SALT = 'event_management.ical'
+_EVENT_COLUMNS = ('id', 'title', 'description', 'start_time', 'end_time', 'updated_at', 'venue__name')
+
+
+# ---------- feed keys ----------
+def _key_mac(user_id, password_hash):
+    return salted_hmac(_KEY_SALT, f'{user_id}:{password_hash}', algorithm='sha256').hexdigest()[:32]
+
+
+def feed_key(user):
+    """Secret ?key= for a user's personal feed URL."""
+    return f'{user.pk}-{_key_mac(user.pk, user.password)}'
+
+
+def user_for_key(key):
+    """The user a feed key belongs to, or None if it is malformed, forged or revoked."""
+    from django.contrib.auth import get_user_model
+
+    user_id, _sep, mac = (key or '').partition('-')
+    if not user_id.isdigit() or not mac:
+        return None
+    user = get_user_model().objects.filter(pk=int(user_id), is_active=True).first()
+    if user is None or not constant_time_compare(mac, _key_mac(user.pk, user.password)):
+        return None
+    return user
+
+
+# ---------- feeds ----------
+def user_feed_events(user):
+    """Events a user holds a ticket for or saved to their calendar."""
+    return Event.objects.filter(
+        Q(pk__in=Ticket.objects.filter(owner=user).values('event_id'))
+        | Q(pk__in=CalendarEntry.objects.filter(user=user).values('event_id'))
+    )
+
+
+def organizer_feed_events(organizer_id):
+    return Event.objects.filter(organizer_id=organizer_id, is_approved=True)
+
+
+def _validators(parts, timestamps):
+    """(weak ETag, Last-Modified datetime or None) from the aggregate results."""
+    timestamps = [ts for ts in timestamps if ts is not None]
+    last_modified = max(timestamps) if timestamps else None
+    parts = [FEED_VERSION, *parts, *(ts.isoformat() for ts in timestamps)]
+    digest = hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:32]
+    return 'W/' + quote_etag(digest), last_modified
+
+
+def user_feed_validators(user):
+    """ETag and Last-Modified for a user's feed (one query per source)."""
+    tickets = Ticket.objects.filter(owner=user).aggregate(
+        count=Count('id'), updated=Max('updated_at'), events_updated=Max('event__updated_at'))
+    entries = CalendarEntry.objects.filter(user=user).aggregate(
+        count=Count('id'), updated=Max('created_at'), events_updated=Max('event__updated_at'))
+    return _validators(
+        ['user', str(user.pk), str(tickets['count']), str(entries['count'])],
+        [tickets['updated'], tickets['events_updated'], entries['updated'], entries['events_updated']],
+    )
+
+
+def organizer_feed_validators(organizer_id):
+    """ETag and Last-Modified for an organizer's feed (one query)."""
+    agg = organizer_feed_events(organizer_id).aggregate(count=Count('id'), updated=Max('updated_at'))
+    return _validators(['organizer', str(organizer_id), str(agg['count'])], [agg['updated']])
+
+
+# ---------- iCalendar text ----------
+def escape_text(value):
+    """Escape a TEXT property value (RFC 5545 section 3.3.11)."""
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n'))
+
+
+def fold(line):
+    """Fold a content line into CRLF-terminated lines of at most 75 octets."""
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line + '\r\n'
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        # never split a UTF-8 sequence
+        while end < len(data) and data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode('utf-8'))
+        start, limit = end, 74  # continuation lines start with a space
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _vevent(row, site, event_url):
+    event_id, title, description, start_time, end_time, updated_at, venue_name = row
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:event-{event_id}@{site}',
+        f'DTSTAMP:{_utc(updated_at)}',
+        f'LAST-MODIFIED:{_utc(updated_at)}',
+        f'DTSTART:{_utc(start_time)}',
+        f'DTEND:{_utc(end_time)}',
+        'SUMMARY:' + escape_text(title),
+    ]
+    if description:
+        lines.append('DESCRIPTION:' + escape_text(description))
+    if venue_name:
+        lines.append('LOCATION:' + escape_text(venue_name))
+    lines.append('URL:' + event_url.format(id=event_id))
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) for line in lines)
+
+
+def stream_calendar(events, name, chunk_size=FEED_CHUNK_SIZE):
+    """Yield a VCALENDAR for the events queryset, one VEVENT at a time."""
+    frontend = getattr(settings, 'FRONTEND_BASE_URL', 'http://localhost:5173').rstrip('/')
+    site = frontend.split('://', 1)[-1].split('/', 1)[0] or 'campusevents.local'
+    event_url = frontend + '/events/{id}'
+    yield ''.join(fold(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:' + PRODID,
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:' + escape_text(name),
+    ))
+    rows = events.order_by('start_time', 'id').values_list(*_EVENT_COLUMNS)
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield _vevent(row, site, event_url)
+    yield 'END:VCALENDAR\r\n'
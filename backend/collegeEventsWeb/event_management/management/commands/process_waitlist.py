@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ...models import Event, WaitlistEntry
+from ... import waitlist
+
+
+class Command(BaseCommand):
+    help = ('Promote waitlisted users into free seats and email everyone promoted since the last run '
+            '(run periodically, e.g. from cron)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Emails sent per SMTP connection')
+        parser.add_argument('--skip-promote', action='store_true',
+                            help='Only send notifications; do not fill free seats')
+
+    def handle(self, *args, **options):
+        batch_size = max(options.get('batch_size') or 100, 1)
+
+        if not options.get('skip_promote'):
+            # Seats freed without a cancellation (capacity raised, tickets removed in the admin)
+            events = (Event.objects.filter(waitlist_entries__status=WaitlistEntry.WAITING)
+                      .select_related('venue').distinct())
+            promoted = 0
+            for event in events.iterator():
+                promoted += len(waitlist.fill_free_seats(event))
+            self.stdout.write(f'Promoted {promoted} waitlisted user(s) into free seats.')
+
+        pending = (WaitlistEntry.objects
+                   .filter(status=WaitlistEntry.PROMOTED, notified_at__isnull=True)
+                   .select_related('user', 'event')
+                   .order_by('promoted_at', 'pk'))
+        frontend_base = getattr(settings, 'FRONTEND_BASE_URL', 'http://localhost:5173')
+        sent = 0
+        while True:
+            batch = list(pending[:batch_size])
+            if not batch:
+                break
+            messages = [
+                (
+                    f'You got a ticket for {entry.event.title}',
+                    f'A seat opened up for {entry.event.title} and your waitlist spot has been '
+                    f'turned into a ticket.\n\nView it here: {frontend_base}/me/tickets',
+                    getattr(settings, 'DEFAULT_FROM_EMAIL', None),
+                    [entry.user.email],
+                )
+                for entry in batch
+            ]
+            send_mass_mail(messages, fail_silently=False)
+            WaitlistEntry.objects.filter(pk__in=[entry.pk for entry in batch]).update(notified_at=timezone.now())
+            sent += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} waitlist notification(s).'))
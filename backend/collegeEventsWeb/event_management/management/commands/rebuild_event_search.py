@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ... import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the event full-text search index (after bulk imports or updates that bypass signals)'
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            self.stdout.write(self.style.WARNING(
+                'No search table on this database; run migrate (SQLite needs FTS5 support).'))
+            return
+        with transaction.atomic():
+            count = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} event(s).'))
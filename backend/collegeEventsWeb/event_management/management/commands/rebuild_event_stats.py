@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from ...models import Event, EventStats
+from ...stats import count_event_tickets
+
+
+class Command(BaseCommand):
+    help = 'Recompute EventStats counters from the Ticket table (backfill and drift repair)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event-id', type=int, help='Optional: only rebuild stats for a specific event id')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing')
+
+    def handle(self, *args, **options):
+        event_id = options.get('event_id')
+        dry_run = options.get('dry_run')
+
+        event_ids = list(Event.objects.filter(pk=event_id).values_list('id', flat=True)) if event_id \
+            else list(Event.objects.values_list('id', flat=True))
+        counts = count_event_tickets(event_ids if event_id else None)
+        existing = {s.event_id: s for s in EventStats.objects.filter(event_id__in=event_ids)}
+
+        now = timezone.now()
+        to_create, to_update = [], []
+        for eid in event_ids:
+            issued, checked_in = counts.get(eid, (0, 0))
+            stats = existing.get(eid)
+            if stats is None:
+                to_create.append(EventStats(event_id=eid, tickets_issued=issued,
+                                            tickets_checked_in=checked_in, updated_at=now))
+            elif (stats.tickets_issued, stats.tickets_checked_in) != (issued, checked_in):
+                self.stdout.write(
+                    f'  Event {eid}: issued {stats.tickets_issued} -> {issued}, '
+                    f'checked in {stats.tickets_checked_in} -> {checked_in}'
+                )
+                stats.tickets_issued, stats.tickets_checked_in, stats.updated_at = issued, checked_in, now
+                to_update.append(stats)
+
+        if not dry_run:
+            with transaction.atomic():
+                EventStats.objects.bulk_create(to_create, batch_size=1000, ignore_conflicts=True)
+                EventStats.objects.bulk_update(
+                    to_update, ['tickets_issued', 'tickets_checked_in', 'updated_at'], batch_size=1000
+                )
+
+        verb = 'Would fix' if dry_run else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {len(to_update)} drifted and {len(to_create)} missing EventStats row(s) '
+            f'across {len(event_ids)} event(s).'
+        ))
@@ -0,0 +1,165 @@
+"""Signed check-in manifests so door scanners can validate tickets offline.
+
+A full manifest lists every ticket of an event in one of two encodings:
+
+``sorted``
+    ``ids`` is the base64 of the tickets' 16-byte UUIDs in ascending byte
+    order (binary-searchable) and ``used`` is a base64 bitmap over that
+    order: bit i (byte i // 8, bit i % 8, least significant first) is set
+    when ticket i is already checked in.
+``bloom``
+    ``bloom`` is a Bloom filter of the ticket ids ({"m": bits, "k": hashes,
+    "bits": base64}). The k bit positions of a ticket are
+    (h1 + i * h2) % m for i in 0..k-1, with h1 and h2 the big-endian
+    integers of the first and last 8 UUID bytes (h2 forced odd). ``used``
+    is then the sorted id array of the checked-in tickets only.
+
+Every manifest carries ``cursor``. Passing it back as ``?since=`` returns a
+delta: the tickets issued or checked in after that pull, always in the
+``sorted`` encoding (``ids`` + ``used`` bitmap), plus ``removed``, the sorted
+id array of tickets deleted (cancelled) since then, read from
+TicketTombstone. Scanners add the former and drop the latter from what they
+hold.
+
+Every response also includes ``count`` (the event's current number of
+tickets) and ``digest``, the hex SHA-256 of the concatenated sorted 16-byte
+ids of all current tickets. A scanner whose merged id set hashes differently
+has diverged and should pull a full manifest again.
+
+``signature`` is the hex HMAC-SHA256 of the newline-joined event id, mode,
+cursor, digest and encoded bodies (for ``sorted``: ids, used[, removed];
+for ``bloom``: m, k, bits, used), keyed with the event's scanner key.
+Full manifests carry that key as ``scanner_key`` (hex, 32 bytes): a
+scanner keeps the key from its first authenticated pull and can then check
+every later manifest for the event offline, including ones relayed between
+devices. The key is derived from SECRET_KEY and the event id, so it stays
+the same across pulls and only opens that one event's manifests.
+"""
+import base64
+import hashlib
+import hmac
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core import signing
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from .models import Ticket, TicketTombstone
+
+SORTED, BLOOM = 'sorted', 'bloom'
+ENCODINGS = (SORTED, BLOOM)
+BLOOM_FALSE_POSITIVE_RATE = 0.001
+# Ticket rows are stamped with the app server's clock before their
+# transaction commits, so deltas reach this far back before the cursor.
+# Re-sent tickets merge harmlessly.
+DELTA_OVERLAP = timedelta(seconds=5)
+
+_SALT = 'event_management.manifest'
+
+
+def _b64(data):
+    return base64.b64encode(bytes(data)).decode('ascii')
+
+
+def _sorted_ids(rows):
+    """Return (sorted 16-byte ids, used bitmap) for (uuid, is_used) rows."""
+    rows = sorted((ticket_id.bytes, is_used) for ticket_id, is_used in rows)
+    used = bytearray((len(rows) + 7) // 8)
+    for i, (_id, is_used) in enumerate(rows):
+        if is_used:
+            used[i >> 3] |= 1 << (i & 7)
+    return b''.join(ticket_id for ticket_id, _used in rows), used
+
+
+def bloom_positions(ticket_id, m, k):
+    """Bit positions of a 16-byte ticket id in a Bloom filter of m bits and k hashes."""
+    h1 = int.from_bytes(ticket_id[:8], 'big')
+    h2 = int.from_bytes(ticket_id[8:], 'big') | 1
+    return [(h1 + i * h2) % m for i in range(k)]
+
+
+def _bloom(ids, rate=BLOOM_FALSE_POSITIVE_RATE):
+    n = max(len(ids), 1)
+    m = max(int(math.ceil(-n * math.log(rate) / (math.log(2) ** 2))), 8)
+    k = max(int(round(m / n * math.log(2))), 1)
+    bits = bytearray((m + 7) // 8)
+    for ticket_id in ids:
+        for pos in bloom_positions(ticket_id, m, k):
+            bits[pos >> 3] |= 1 << (pos & 7)
+    return {'m': m, 'k': k, 'bits': _b64(bits)}
+
+
+def make_cursor(event_id, at):
+    return signing.dumps({'e': event_id, 't': at.timestamp()}, salt=_SALT, compress=False)
+
+
+def load_cursor(event_id, cursor):
+    """Datetime a cursor was issued at, or None if it is forged or for another event."""
+    try:
+        data = signing.loads(cursor, salt=_SALT)
+        if int(data['e']) != event_id:
+            return None
+        return datetime.fromtimestamp(float(data['t']), tz=dt_timezone.utc)
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None
+
+
+def scanner_key(event_id):
+    """The 32-byte key an event's manifests are signed with (handed to its scanners)."""
+    return salted_hmac(_SALT + '.scanner', str(event_id), algorithm='sha256').digest()
+
+
+def _sign(event_id, mode, cursor, *parts):
+    message = '\n'.join([str(event_id), mode, cursor, *parts])
+    return hmac.new(scanner_key(event_id), message.encode(), hashlib.sha256).hexdigest()
+
+
+def _digest(tickets):
+    """(count, hex SHA-256 of the sorted 16-byte ids) of the current tickets."""
+    ids = sorted(ticket_id.bytes for ticket_id in tickets.values_list('id', flat=True).iterator())
+    return len(ids), hashlib.sha256(b''.join(ids)).hexdigest()
+
+
+def build_manifest(event_id, encoding=SORTED, since=None):
+    """Manifest payload for an event: full, or the changes after ``since`` (a datetime)."""
+    generated_at = timezone.now()
+    tickets = Ticket.objects.filter(event_id=event_id)
+    cursor = make_cursor(event_id, generated_at)
+    count, digest = _digest(tickets)
+    payload = {'event': event_id, 'generated_at': generated_at.isoformat(), 'cursor': cursor,
+               'count': count, 'digest': digest}
+
+    if since is not None:
+        changed = tickets.filter(updated_at__gt=since - DELTA_OVERLAP).values_list('id', 'is_used')
+        ids, used = _sorted_ids(changed.iterator())
+        removed = (TicketTombstone.objects
+                   .filter(event_id=event_id, removed_at__gt=since - DELTA_OVERLAP)
+                   .values_list('ticket_id', flat=True))
+        removed = b''.join(sorted({ticket_id.bytes for ticket_id in removed.iterator()}))
+        payload.update(mode='delta', encoding=SORTED, changed=len(ids) // 16, ids=_b64(ids), used=_b64(used),
+                       removed=_b64(removed))
+        payload['signature'] = _sign(event_id, 'delta', cursor, digest, payload['ids'], payload['used'],
+                                     payload['removed'])
+        return payload
+
+    # full pulls hand the key to the scanner so it can check later manifests offline
+    payload['scanner_key'] = scanner_key(event_id).hex()
+    rows = tickets.values_list('id', 'is_used').iterator()
+    if encoding == BLOOM:
+        all_ids, used_ids = [], []
+        for ticket_id, is_used in rows:
+            all_ids.append(ticket_id.bytes)
+            if is_used:
+                used_ids.append(ticket_id.bytes)
+        bloom = _bloom(all_ids)
+        payload.update(mode='full', encoding=BLOOM, bloom=bloom, used=_b64(b''.join(sorted(used_ids))))
+        payload['signature'] = _sign(event_id, 'full', cursor, digest, str(bloom['m']), str(bloom['k']),
+                                     bloom['bits'], payload['used'])
+        return payload
+
+    ids, used = _sorted_ids(rows)
+    payload.update(mode='full', encoding=SORTED, ids=_b64(ids), used=_b64(used))
+    payload['signature'] = _sign(event_id, 'full', cursor, digest, payload['ids'], payload['used'])
+    return payload
+
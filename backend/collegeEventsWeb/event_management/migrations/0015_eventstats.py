@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:03
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_event_stats(apps, schema_editor):
+    Event = apps.get_model('event_management', 'Event')
+    EventStats = apps.get_model('event_management', 'EventStats')
+    Ticket = apps.get_model('event_management', 'Ticket')
+    counts = {
+        r['event_id']: r
+        for r in Ticket.objects.values('event_id')
+        .annotate(issued=Count('id'), checked_in=Count('id', filter=Q(is_used=True)))
+        .order_by()
+    }
+    EventStats.objects.bulk_create([
+        EventStats(
+            event_id=event_id,
+            tickets_issued=counts.get(event_id, {}).get('issued', 0),
+            tickets_checked_in=counts.get(event_id, {}).get('checked_in', 0),
+        )
+        for event_id in Event.objects.values_list('id', flat=True).iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_management', '0014_event_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventStats',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='event_management.event')),
+                ('tickets_issued', models.PositiveIntegerField(default=0)),
+                ('tickets_checked_in', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(backfill_event_stats, migrations.RunPython.noop),
+    ]
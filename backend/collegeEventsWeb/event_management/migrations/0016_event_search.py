@@ -0,0 +1,61 @@
+from django.db import migrations
+
+# The search side table as first created (kept here so later changes to
+# search.py don't alter this migration). 0023 widens event_id on PostgreSQL.
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS event_search USING fts5("
+    "title, description, organization, category, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+SQLITE_FILL = (
+    "INSERT INTO event_search (rowid, title, description, organization, category) "
+    "SELECT id, title, description, organization, category FROM event_management_event"
+)
+POSTGRES_CREATE = [
+    "CREATE TABLE IF NOT EXISTS event_search (event_id integer PRIMARY KEY, document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS event_search_document_gin ON event_search USING GIN (document)",
+]
+POSTGRES_FILL = (
+    "INSERT INTO event_search (event_id, document) SELECT id, "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(organization, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(category, '')), 'B') "
+    "FROM event_management_event"
+)
+DROP = "DROP TABLE IF EXISTS event_search"
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            try:
+                cursor.execute(SQLITE_CREATE)
+            except Exception:
+                # SQLite built without FTS5: search falls back to icontains
+                return
+            cursor.execute('DELETE FROM event_search')
+            cursor.execute(SQLITE_FILL)
+        elif vendor == 'postgresql':
+            for statement in POSTGRES_CREATE:
+                cursor.execute(statement)
+            cursor.execute('DELETE FROM event_search')
+            cursor.execute(POSTGRES_FILL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(DROP)
+
+
+class Migration(migrations.Migration):
+    """Full-text search side table for events (FTS5 on SQLite, tsvector + GIN on PostgreSQL)."""
+
+    dependencies = [
+        ('event_management', '0015_eventstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
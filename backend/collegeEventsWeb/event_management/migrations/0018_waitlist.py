@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_management', '0017_event_venue_capacity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventstats',
+            name='waitlist_last_position',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveBigIntegerField()),
+                ('status', models.CharField(choices=[('WAITING', 'Waiting'), ('PROMOTED', 'Promoted')], default='WAITING', max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('promoted_at', models.DateTimeField(blank=True, null=True)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='event_management.event')),
+                ('ticket', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entry', to='event_management.ticket')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'WAITING')), fields=['event', 'position'], name='waitlist_waiting_pos_idx'), models.Index(condition=models.Q(('notified_at__isnull', True), ('status', 'PROMOTED')), fields=['promoted_at'], name='waitlist_unnotified_idx')],
+                'constraints': [models.UniqueConstraint(fields=('event', 'position'), name='waitlist_event_position_uniq'), models.UniqueConstraint(condition=models.Q(('status', 'WAITING')), fields=('event', 'user'), name='waitlist_one_waiting_entry_per_user')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Re-adds Ticket.checked_in_at to the model state. 0006 created the column and
+# 0010 only dropped it from the state, so most databases still have it; add it
+# only where it is missing.
+from django.db import migrations, models
+
+
+def add_column_if_missing(apps, schema_editor):
+    Ticket = apps.get_model('event_management', 'Ticket')
+    table = Ticket._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        columns = {col.name for col in schema_editor.connection.introspection.get_table_description(cursor, table)}
+    if 'checked_in_at' not in columns:
+        schema_editor.add_field(Ticket, Ticket._meta.get_field('checked_in_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_management', '0018_waitlist'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='ticket',
+                    name='checked_in_at',
+                    field=models.DateTimeField(blank=True, null=True),
+                ),
+            ],
+        ),
+        # runs against the state above, so the historical model has the field
+        migrations.RunPython(add_column_if_missing, migrations.RunPython.noop),
+    ]
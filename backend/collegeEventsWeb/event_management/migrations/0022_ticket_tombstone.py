@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_management', '0021_event_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.BigIntegerField()),
+                ('ticket_id', models.UUIDField()),
+                ('removed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['event_id', 'removed_at'], name='tombstone_event_removed_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+WIDEN_EVENT_ID = 'ALTER TABLE event_search ALTER COLUMN event_id TYPE bigint'
+
+
+def widen_event_id(apps, schema_editor):
+    # Tables created by 0016 used integer; Event.id is a BigAutoField
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(WIDEN_EVENT_ID)
+
+
+class Migration(migrations.Migration):
+    """PostgreSQL search side table: event_id bigint to match Event.id."""
+
+    dependencies = [
+        ('event_management', '0022_ticket_tombstone'),
+    ]
+
+    operations = [
+        migrations.RunPython(widen_event_id, migrations.RunPython.noop),
+    ]
@@ -36,6 +36,8 @@ class Event(models.Model):
     is_approved = models.BooleanField(default=True)
     rejection_reason = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save; part of the ETag validators for event listings
+    updated_at = models.DateTimeField(auto_now=True)
     # Optional organizer FK: some forks of this project include it, add as nullable for compatibility
     organizer = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -44,10 +46,64 @@ class Event(models.Model):
         on_delete=models.SET_NULL,
         related_name='events'
     )
+    venue = models.ForeignKey(
+        Venue,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='events'
+    )
+    # Ticket limit for this event; when unset the venue's capacity applies,
+    # and events with neither are unlimited.
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Public discovery: is_approved=True AND end_time >= now ORDER BY start_time, id.
+            # Partial indexes keep pending events out of the hot path.
+            models.Index(fields=['start_time', 'id'], condition=models.Q(is_approved=True),
+                         name='event_approved_start_idx'),
+            models.Index(fields=['end_time'], condition=models.Q(is_approved=True),
+                         name='event_approved_end_idx'),
+            # ?date= / ?from= / ?to= ranges and staff listings without the approval predicate
+            models.Index(fields=['start_time', 'end_time'], name='event_start_end_idx'),
+            # Admin approvals page (?is_approved=false)
+            models.Index(fields=['start_time'], condition=models.Q(is_approved=False),
+                         name='event_pending_start_idx'),
+            # Organizer dashboard (?organizer=me)
+            models.Index(fields=['organizer', 'start_time'], name='event_organizer_start_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} @ {self.start_time:%Y-%m-%d %H:%M}"
 
+    @property
+    def effective_capacity(self):
+        """Ticket limit: the event's own capacity, else the venue's, else None (unlimited)."""
+        if self.capacity is not None:
+            return self.capacity
+        if self.venue_id is not None:
+            return self.venue.capacity
+        return None
+
+
+class EventStats(models.Model):
+    """Per-event ticket counters, one row per event.
+
+    Maintained incrementally (F() updates) in the same transaction as
+    buy/cancel/check-in, see event_management.stats. The
+    `rebuild_event_stats` command recomputes rows from the Ticket table.
+    """
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    tickets_issued = models.PositiveIntegerField(default=0)
+    tickets_checked_in = models.PositiveIntegerField(default=0)
+    # Last WaitlistEntry.position handed out for this event
+    waitlist_last_position = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Stats for event {self.event_id}: {self.tickets_issued} issued, {self.tickets_checked_in} checked in"
+
 
 class CalendarEntry(models.Model):
     user = models.ForeignKey(
@@ -85,7 +141,12 @@ class Ticket(models.Model):
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="event_management_tickets_owned")
     qr = models.ImageField(upload_to="qr_codes/", null=True, blank=True)  # ✅ new field
     is_used = models.BooleanField(default=False)
+    # When the ticket was scanned at the door (the scanner's clock for bulk syncs)
+    checked_in_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
+    # Last issue/check-in write; the cursor for check-in manifest deltas.
+    # QuerySet.update() skips auto_now, so bulk writers set it explicitly.
+    updated_at = models.DateTimeField(auto_now=True)
     # Restore legacy status column that still exists in some DBs to avoid NOT NULL violations
     PENDING, CHECKED_IN, NO_SHOW, CANCELLED = "PENDING", "CHECKED_IN", "NO_SHOW", "CANCELLED"
     STATUS_CHOICES = [
@@ -96,5 +157,72 @@ class Ticket(models.Model):
     ]
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
 
+    class Meta:
+        indexes = [
+            # Check-in manifest deltas: an event's tickets changed since a cursor
+            models.Index(fields=["event", "updated_at"], name="ticket_event_updated_idx"),
+        ]
+
+    def __str__(self):
+        return f"Ticket {self.id} - {self.event}"
+
+
+class TicketTombstone(models.Model):
+    """A deleted (cancelled) ticket, so check-in manifest deltas can list removals.
+
+    Written by a post_delete signal on Ticket. event_id is a plain column
+    rather than a foreign key so tickets removed along with their event can
+    still be recorded; the event's tombstones are dropped when it is deleted.
+    """
+    event_id = models.BigIntegerField()
+    ticket_id = models.UUIDField()
+    removed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["event_id", "removed_at"], name="tombstone_event_removed_idx"),
+        ]
+
+    def __str__(self):
+        return f"Removed ticket {self.ticket_id} of event {self.event_id}"
+
+
+class WaitlistEntry(models.Model):
+    """A user's place in an event's FIFO waitlist.
+
+    Positions come from EventStats.waitlist_last_position and only grow, so
+    the head of the queue is the WAITING entry with the lowest position and
+    is found through the partial (event, position) index. Promotion turns the
+    entry into a ticket (see event_management.waitlist); `notified_at` is set
+    by the process_waitlist command once the user has been emailed.
+    """
+    WAITING, PROMOTED = "WAITING", "PROMOTED"
+    STATUS_CHOICES = [(WAITING, "Waiting"), (PROMOTED, "Promoted")]
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="waitlist_entries")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="waitlist_entries")
+    position = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=WAITING)
+    ticket = models.OneToOneField(Ticket, null=True, blank=True, on_delete=models.SET_NULL,
+                                  related_name="waitlist_entry")
+    created_at = models.DateTimeField(default=timezone.now)
+    promoted_at = models.DateTimeField(null=True, blank=True)
+    notified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["event", "position"], name="waitlist_event_position_uniq"),
+            models.UniqueConstraint(fields=["event", "user"], condition=models.Q(status="WAITING"),
+                                    name="waitlist_one_waiting_entry_per_user"),
+        ]
+        indexes = [
+            # Head of the queue: WAITING entries of an event ordered by position
+            models.Index(fields=["event", "position"], condition=models.Q(status="WAITING"),
+                         name="waitlist_waiting_pos_idx"),
+            # process_waitlist: promotions not yet notified
+            models.Index(fields=["promoted_at"], condition=models.Q(status="PROMOTED", notified_at__isnull=True),
+                         name="waitlist_unnotified_idx"),
+        ]
+
     def __str__(self):
-        return f"Ticket {self.id} - {self.event}"
\ No newline at end of file
+        return f"{self.user} waiting for {self.event} (#{self.position})"
@@ -0,0 +1,70 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+def _opt_in_page_size(request, size_param, trigger_param, default, maximum):
+    """Page size for opt-in pagination, or None to return the unpaginated list.
+
+    Paginates when ?<size_param>= is present, or when ?<trigger_param>= is
+    (following a next/previous link) using the default size. Sizes are capped.
+    """
+    raw = request.query_params.get(size_param)
+    if raw is None:
+        return default if request.query_params.get(trigger_param) else None
+    try:
+        size = int(raw)
+    except (TypeError, ValueError):
+        return default
+    if size <= 0:
+        return default
+    return min(size, maximum)
+
+
+class EventCursorPagination(CursorPagination):
+    """Keyset pagination for /api/events/ ordered on (start_time, id).
+
+    Pagination is opt-in so existing clients that expect a plain JSON list keep
+    working: it only kicks in when the request carries ?page_size= or a
+    ?cursor= taken from a previous page's next/previous link. Page sizes are
+    capped by settings.EVENTS_MAX_PAGE_SIZE.
+    """
+    ordering = ("start_time", "id")
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        return _opt_in_page_size(
+            request, self.page_size_query_param, self.cursor_query_param,
+            getattr(settings, "EVENTS_PAGE_SIZE", 20),
+            getattr(settings, "EVENTS_MAX_PAGE_SIZE", 100),
+        )
+
+
+class AttendeePagination(PageNumberPagination):
+    """Opt-in page-number pagination for the attendee list.
+
+    Active when the request carries ?page= or ?page_size=; sizes default to
+    settings.ATTENDEES_PAGE_SIZE and are capped by ATTENDEES_MAX_PAGE_SIZE.
+    """
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        return _opt_in_page_size(
+            request, self.page_size_query_param, self.page_query_param,
+            getattr(settings, "ATTENDEES_PAGE_SIZE", 50),
+            getattr(settings, "ATTENDEES_MAX_PAGE_SIZE", 500),
+        )
+
+
+class EventSearchPagination(PageNumberPagination):
+    """Page-number pagination for ranked search results (always on).
+
+    ?page_size= is capped by settings.SEARCH_MAX_PAGE_SIZE.
+    """
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        return _opt_in_page_size(
+            request, self.page_size_query_param, self.page_query_param,
+            getattr(settings, "SEARCH_PAGE_SIZE", 20),
+            getattr(settings, "SEARCH_MAX_PAGE_SIZE", 100),
+        ) or getattr(settings, "SEARCH_PAGE_SIZE", 20)
@@ -0,0 +1,179 @@
+"""QR codes for tickets: signed payloads and PNG rendering.
+
+A ticket's QR code holds a signed token, ``TK1:`` followed by the base32 of
+(version, event id, ticket UUID, issued-at, truncated HMAC-SHA256 keyed from
+SECRET_KEY). Only the server can check the signature: scanners send the code
+back unchanged and ``parse_ticket_code`` checks it and reads the event id
+without touching the database, so forged or wrong-event codes are rejected
+in pure CPU. The uppercase base32 alphabet fits the QR
+alphanumeric mode. Codes printed before signing (a bare ticket UUID, or
+``event:owner:uuid`` from ticket_services) are still accepted, but only the
+database can vouch for those.
+
+Rendering a PNG is kept off the purchase path: buy_ticket schedules
+``render_ticket_qr`` on a small thread pool once its transaction commits, and
+``ticket_qr_png`` (GET /api/tickets/<uuid>/qr.png) renders in memory whenever
+the stored file is not there (yet).
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import logging
+import os
+import struct
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+import qrcode
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils.crypto import salted_hmac
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "QR_RENDER_WORKERS", 2),
+            thread_name_prefix="qr-render",
+        )
+    return _executor
+
+
+TOKEN_PREFIX = "TK1:"
+# version, event id, ticket UUID, issued-at (epoch seconds). Event ids are
+# 64-bit (BigAutoField) from version 2 on; version 1 tokens with a 32-bit
+# event id are still accepted.
+_TOKEN_VERSION = 2
+_TOKEN_BODIES = {
+    1: struct.Struct(">BI16sI"),
+    2: struct.Struct(">BQ16sI"),
+}
+_TOKEN_BODY = _TOKEN_BODIES[_TOKEN_VERSION]
+_MAC_BYTES = 10
+_SALT = "event_management.qr"
+
+
+class ScannedCode:
+    """What a scanned QR code says: ticket id, and the event id when the code carries one.
+
+    ``signed`` is True for verified tokens; legacy codes are only as good as
+    the database lookup that follows.
+    """
+    __slots__ = ("ticket_id", "event_id", "signed")
+
+    def __init__(self, ticket_id, event_id=None, signed=False):
+        self.ticket_id = ticket_id
+        self.event_id = event_id
+        self.signed = signed
+
+
+def _mac(body):
+    return salted_hmac(_SALT, body, algorithm="sha256").digest()[:_MAC_BYTES]
+
+
+def ticket_token(event_id, ticket_id, issued_at):
+    """Signed QR token for a ticket (deterministic, so rendered PNGs can be cached)."""
+    body = _TOKEN_BODY.pack(_TOKEN_VERSION, event_id, uuid.UUID(str(ticket_id)).bytes, int(issued_at.timestamp()))
+    return TOKEN_PREFIX + base64.b32encode(body + _mac(body)).decode("ascii").rstrip("=")
+
+
+def ticket_qr_payload(ticket):
+    """Text encoded in a ticket's QR code (what scanners send back)."""
+    return ticket_token(ticket.event_id, ticket.id, ticket.created_at)
+
+
+def parse_ticket_code(text):
+    """Read a scanned code; returns a ScannedCode, or None for garbage and forged tokens."""
+    text = (text or "").strip()
+    if text.upper().startswith(TOKEN_PREFIX):
+        encoded = text[len(TOKEN_PREFIX):].upper()
+        try:
+            raw = base64.b32decode(encoded + "=" * (-len(encoded) % 8))
+        except (binascii.Error, ValueError):
+            return None
+        # the last base32 character may carry unused bits; accept one spelling per token
+        if base64.b32encode(raw).decode("ascii").rstrip("=") != encoded:
+            return None
+        body, mac = raw[:-_MAC_BYTES], raw[-_MAC_BYTES:]
+        layout = _TOKEN_BODIES.get(body[0]) if body else None
+        if layout is None or len(body) != layout.size:
+            return None
+        if not hmac.compare_digest(mac, _mac(body)):
+            return None
+        _version, event_id, ticket_bytes, _issued_at = layout.unpack(body)
+        return ScannedCode(uuid.UUID(bytes=ticket_bytes), event_id, signed=True)
+
+    # Legacy codes: "<uuid>" or ticket_services' "<event>:<owner>:<uuid>"
+    event_id = None
+    parts = text.split(":")
+    if len(parts) == 3:
+        try:
+            event_id = int(parts[0])
+        except ValueError:
+            return None
+        text = parts[2]
+    try:
+        return ScannedCode(uuid.UUID(text), event_id)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=256)
+def render_qr_png(payload: str) -> bytes:
+    """Render payload as PNG bytes. Payloads are immutable, so results are memoized."""
+    buf = BytesIO()
+    qrcode.make(payload).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def qr_etag(payload: str) -> str:
+    return '"qr-%s"' % hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def ticket_qr_url(ticket):
+    """URL of the ticket's QR PNG: the stored file if present, else the on-demand endpoint."""
+    try:
+        if getattr(ticket, "qr", None):
+            return ticket.qr.url
+    except Exception:
+        pass
+    return reverse("ticket_qr_png", args=[ticket.id])
+
+
+def render_ticket_qr(ticket_id):
+    """Render and store the PNG for a ticket. Runs on the worker pool."""
+    from .models import Ticket
+
+    try:
+        ticket = Ticket.objects.only("id", "qr", "event_id", "created_at").filter(pk=ticket_id).first()
+        if ticket is None or ticket.qr:
+            return
+        # Ensure MEDIA_ROOT exists so FileSystemStorage can write files
+        os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+        ticket.qr.save(
+            f"ticket-{ticket.id}.png",
+            ContentFile(render_qr_png(ticket_qr_payload(ticket))),
+            save=False,
+        )
+        # Only touch the qr column; the ticket row may have changed meanwhile
+        Ticket.objects.filter(pk=ticket.id).update(qr=ticket.qr.name)
+    except Exception:
+        # A missing PNG is not fatal: the qr.png endpoint renders on demand
+        logger.exception("Rendering the QR PNG for ticket %s failed", ticket_id)
+    finally:
+        connection.close()
+
+
+def schedule_ticket_qr(ticket_id):
+    """Queue PNG rendering for a ticket once the current transaction commits."""
+    transaction.on_commit(lambda: _get_executor().submit(render_ticket_qr, ticket_id))
@@ -0,0 +1,195 @@
+"""Full-text search over events (title, description, organization, category).
+
+The index lives in a side table named ``event_search`` keyed by event id:
+
+- SQLite: an FTS5 virtual table (rowid = event id), ranked with bm25().
+- PostgreSQL: a weighted tsvector column with a GIN index, ranked with ts_rank().
+
+Migration 0016 creates and backfills the table; signals.py keeps it in sync on
+Event save/delete, and ``manage.py rebuild_event_search`` rebuilds it after bulk
+writes that bypass signals. On databases without either feature the helpers
+fall back to case-insensitive substring matching.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'event_search'
+EVENT_TABLE = 'event_management_event'
+SEARCH_FIELDS = ('title', 'description', 'organization', 'category')
+
+# bm25() column weights, in SEARCH_FIELDS order
+_FTS5_WEIGHTS = '10.0, 1.0, 3.0, 3.0'
+# tsvector weight per field (A highest), in SEARCH_FIELDS order
+_PG_WEIGHTS = ('A', 'C', 'B', 'B')
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_MAX_TOKENS = 16
+
+_available = None
+
+
+def _pg_document(columns):
+    """Weighted tsvector expression over four SQL expressions (SEARCH_FIELDS order)."""
+    return ' || '.join(
+        "setweight(to_tsvector('english', coalesce(%s, '')), '%s')" % (col, weight)
+        for col, weight in zip(columns, _PG_WEIGHTS)
+    )
+
+
+def query_tokens(text):
+    """Word tokens of a user query (operators and punctuation dropped)."""
+    return _TOKEN_RE.findall(text or '')[:_MAX_TOKENS]
+
+
+def _match_expression(tokens):
+    """Backend query string: all tokens required, the last one as a prefix."""
+    if connection.vendor == 'postgresql':
+        return ' & '.join(tokens[:-1] + [tokens[-1] + ':*'])
+    return ' '.join(['"%s"' % t for t in tokens[:-1]] + ['"%s"*' % tokens[-1]])
+
+
+def is_available():
+    """True when the search table exists on the current database."""
+    global _available
+    if _available is None:
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            _available = False
+        else:
+            with connection.cursor() as cursor:
+                _available = SEARCH_TABLE in connection.introspection.table_names(cursor)
+    return _available
+
+
+# ---------- schema ----------
+def create_index(conn):
+    """Create (if needed) and fill the search table from the events table."""
+    global _available
+    vendor = conn.vendor
+    with conn.cursor() as cursor:
+        if vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS %s USING fts5("
+                    "title, description, organization, category, "
+                    "tokenize = 'unicode61 remove_diacritics 2')" % SEARCH_TABLE
+                )
+            except Exception:
+                # SQLite built without FTS5: search falls back to icontains
+                return
+            cursor.execute('DELETE FROM %s' % SEARCH_TABLE)
+            cursor.execute(
+                'INSERT INTO %s (rowid, title, description, organization, category) '
+                'SELECT id, title, description, organization, category FROM %s'
+                % (SEARCH_TABLE, EVENT_TABLE)
+            )
+        elif vendor == 'postgresql':
+            cursor.execute(
+                'CREATE TABLE IF NOT EXISTS %s ('
+                'event_id bigint PRIMARY KEY, document tsvector NOT NULL)' % SEARCH_TABLE
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS event_search_document_gin ON %s USING GIN (document)'
+                % SEARCH_TABLE
+            )
+            cursor.execute('DELETE FROM %s' % SEARCH_TABLE)
+            cursor.execute(
+                'INSERT INTO %s (event_id, document) SELECT id, %s FROM %s'
+                % (SEARCH_TABLE, _pg_document(SEARCH_FIELDS), EVENT_TABLE)
+            )
+    _available = None
+
+
+def drop_index(conn):
+    global _available
+    if conn.vendor in ('sqlite', 'postgresql'):
+        with conn.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS %s' % SEARCH_TABLE)
+    _available = None
+
+
+# ---------- sync ----------
+def index_event(event):
+    """Insert or refresh one event's search row."""
+    if not is_available():
+        return
+    values = [getattr(event, f) or '' for f in SEARCH_FIELDS]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'INSERT INTO %s (event_id, document) VALUES (%%s, %s) '
+                'ON CONFLICT (event_id) DO UPDATE SET document = EXCLUDED.document'
+                % (SEARCH_TABLE, _pg_document(['%s'] * len(SEARCH_FIELDS))),
+                [event.pk] + values,
+            )
+        else:
+            cursor.execute('DELETE FROM %s WHERE rowid = %%s' % SEARCH_TABLE, [event.pk])
+            cursor.execute(
+                'INSERT INTO %s (rowid, title, description, organization, category) '
+                'VALUES (%%s, %%s, %%s, %%s, %%s)' % SEARCH_TABLE,
+                [event.pk] + values,
+            )
+
+
+def remove_event(event_id):
+    if not is_available():
+        return
+    key = 'event_id' if connection.vendor == 'postgresql' else 'rowid'
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM %s WHERE %s = %%s' % (SEARCH_TABLE, key), [event_id])
+
+
+def rebuild_index():
+    """Repopulate the search table from the events table. Returns the row count."""
+    if not is_available():
+        return 0
+    create_index(connection)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT COUNT(*) FROM %s' % SEARCH_TABLE)
+        return cursor.fetchone()[0]
+
+
+# ---------- querying ----------
+def filter_events(qs, text):
+    """Restrict an Event queryset to events matching `text` (no ordering change)."""
+    tokens = query_tokens(text)
+    if not tokens:
+        return qs.none()
+    if not is_available():
+        return qs.filter(_icontains_q(tokens))
+    if connection.vendor == 'postgresql':
+        sql = ("SELECT event_id FROM %s WHERE document @@ to_tsquery('english', %%s)"
+               % SEARCH_TABLE)
+    else:
+        sql = 'SELECT rowid FROM %s WHERE %s MATCH %%s' % (SEARCH_TABLE, SEARCH_TABLE)
+    return qs.filter(id__in=RawSQL(sql, (_match_expression(tokens),)))
+
+
+def rank_events(qs, text):
+    """Matching events annotated with `search_rank` and ordered best first."""
+    tokens = query_tokens(text)
+    qs = filter_events(qs, text)
+    if not tokens or not is_available():
+        return qs
+    expression = _match_expression(tokens)
+    if connection.vendor == 'postgresql':
+        sql = ("SELECT ts_rank(s.document, to_tsquery('english', %%s)) FROM %s s "
+               "WHERE s.event_id = %s.id" % (SEARCH_TABLE, EVENT_TABLE))
+    else:
+        # bm25() is lower-is-better; negate so higher ranks sort first like ts_rank
+        sql = ('SELECT -bm25(%s, %s) FROM %s WHERE %s MATCH %%s AND rowid = %s.id'
+               % (SEARCH_TABLE, _FTS5_WEIGHTS, SEARCH_TABLE, SEARCH_TABLE, EVENT_TABLE))
+    return (qs.annotate(search_rank=RawSQL(sql, (expression,)))
+            .order_by('-search_rank', 'start_time', 'id'))
+
+
+def _icontains_q(tokens):
+    q = Q()
+    for token in tokens:
+        token_q = Q()
+        for field in SEARCH_FIELDS:
+            token_q |= Q(**{f'{field}__icontains': token})
+        q &= token_q
+    return q
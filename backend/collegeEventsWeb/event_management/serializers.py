@@ -2,24 +2,78 @@ import os, qrcode
 import datetime
 from rest_framework import serializers
 from .models import Event, Category, Venue, Ticket
+from .qr import ticket_qr_payload, ticket_qr_url
+from .sparse import SparseFieldsetMixin
 from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
 #from collegeEventsWeb.ticket_services.models import Ticket
 from io import BytesIO
 from django.core.files.base import ContentFile
 from django.utils import timezone
 from urllib.parse import urlencode
 
+# Shown when an event has no image (same placeholder as the frontend discovery view)
+DEFAULT_EVENT_IMAGE_URL = (
+    "https://images.unsplash.com/photo-1527525443983-6e60c75fff46?q=80&w=800&auto=format&fit=crop"
+)
 
-class CategorySerializer(serializers.ModelSerializer):
+
+def image_url_or_default(value):
+    """A stored image_url, or the default placeholder when it is blank."""
+    return (value or "").strip() or DEFAULT_EVENT_IMAGE_URL
+
+
+def event_image_url(event):
+    """The event's image_url, or the default placeholder when none is set."""
+    return image_url_or_default(getattr(event, "image_url", None))
+
+
+def user_display_name(first_name="", last_name="", username=None, email=None):
+    """The full name, else the username, else the email (what organizer_name shows)."""
+    full = f"{first_name or ''} {last_name or ''}".strip()
+    return full or username or email
+
+
+def related_name(value):
+    """The name of a related object, or None (e.g. for a plain CharField value)."""
+    return getattr(value, "name", None) if value else None
+
+
+def google_calendar_url(title, description, location, start, end):
+    """Google Calendar "add event" link, or None when a time is missing."""
+    if not start or not end:
+        return None
+
+    # make sure they're timezone-aware, then convert to UTC
+    if timezone.is_naive(start):
+        start = timezone.make_aware(start, timezone.get_current_timezone())
+    if timezone.is_naive(end):
+        end = timezone.make_aware(end, timezone.get_current_timezone())
+
+    start_str = start.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    end_str = end.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    params = {
+        "action": "TEMPLATE",
+        "text": title,
+        "details": description or "",
+        "location": location or "",
+        "dates": f"{start_str}/{end_str}",
+    }
+
+    return "https://calendar.google.com/calendar/render?" + urlencode(params)
+
+
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
 
-class VenueSerializer(serializers.ModelSerializer):
+class VenueSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Venue
         fields = '__all__'
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # Read-only extras for the UI
     organizer = serializers.PrimaryKeyRelatedField(read_only=True)
     organizer_name = serializers.SerializerMethodField(read_only=True)
@@ -29,6 +83,7 @@ class EventSerializer(serializers.ModelSerializer):
     tickets_checked_in = serializers.SerializerMethodField(read_only=True)
     tickets_pending = serializers.SerializerMethodField(read_only=True)
     google_calendar_url = serializers.SerializerMethodField(read_only=True)
+    venue_name = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Event
@@ -43,6 +98,9 @@ class EventSerializer(serializers.ModelSerializer):
             "organization",
             "end_time",   
             "category",     
+            "venue",
+            "venue_name",
+            "capacity",
             "organizer_name",
             "tickets_issued",
             "tickets_checked_in",
@@ -51,7 +109,20 @@ class EventSerializer(serializers.ModelSerializer):
             "image_url",
             "google_calendar_url",
         ]
-        read_only_fields = ["organizer", "organizer_name", "category_name", "image_url", "tickets_issued", "tickets_checked_in", "tickets_pending", "google_calendar_url"]
+        read_only_fields = ["organizer", "organizer_name", "venue_name", "category_name", "image_url", "tickets_issued", "tickets_checked_in", "tickets_pending", "google_calendar_url"]
+        # ?expand=venue nests the venue instead of its id
+        expandable_fields = {"venue": VenueSerializer}
+        # What the computed fields read, so trimmed requests can .only() the rest away
+        field_sources = {
+            "organizer_name": ["organizer__email"],
+            "venue_name": ["venue__name"],
+            "category_name": ["category"],
+            "image_url": ["image_url"],
+            "tickets_issued": ["stats__tickets_issued", "stats__tickets_checked_in"],
+            "tickets_checked_in": ["stats__tickets_issued", "stats__tickets_checked_in"],
+            "tickets_pending": ["stats__tickets_issued", "stats__tickets_checked_in"],
+            "google_calendar_url": ["start_time", "end_time", "title", "description", "venue__name"],
+        }
 
     # ---- helpers ----
     def get_organizer_name(self, obj):
@@ -59,42 +130,57 @@ class EventSerializer(serializers.ModelSerializer):
         for attr in ("organizer", "user", "created_by", "owner", "host"):
             u = getattr(obj, attr, None)
             if u:
-                full = f"{getattr(u, 'first_name', '')} {getattr(u, 'last_name', '')}".strip()
-                return full or getattr(u, "username", None) or getattr(u, "email", None)
+                return user_display_name(getattr(u, "first_name", ""), getattr(u, "last_name", ""),
+                                         getattr(u, "username", None), getattr(u, "email", None))
         return None
 
+    def get_venue_name(self, obj):
+        venue = getattr(obj, "venue", None)
+        return getattr(venue, "name", None) if venue else None
+
     def get_category_name(self, obj):
-        c = getattr(obj, "category", None)
-        return getattr(c, "name", None) if c else None
+        return related_name(getattr(obj, "category", None))
 
     def get_image_url(self, obj):
         # Return the stored image_url if provided, otherwise fall back to a
         # sensible default (same as used by the frontend discovery view).
-        img = getattr(obj, "image_url", None) or ""
-        img = img.strip()
-        if img:
-            return img
-        # Default Unsplash placeholder used in the frontend when no image is set
-        return (
-            "https://images.unsplash.com/photo-1527525443983-6e60c75fff46?q=80&w=800&auto=format&fit=crop"
-        )
+        return event_image_url(obj)
+
+    def _ticket_counts(self, obj):
+        """Return (issued, checked_in) for an event.
+
+        Read from the event's EventStats row (joined by EventViewSet, so
+        listing pages stay at a constant number of queries); events without
+        a stats row fall back to counting tickets once per render.
+        """
+        try:
+            return obj.stats.tickets_issued, obj.stats.tickets_checked_in
+        except ObjectDoesNotExist:
+            pass
+        issued = getattr(obj, "tickets_issued_count", None)
+        checked = getattr(obj, "tickets_checked_in_count", None)
+        if issued is None or checked is None:
+            issued = obj.event_management_tickets.count()
+            checked = obj.event_management_tickets.filter(is_used=True).count()
+            # remember the result so the three count fields share one lookup
+            obj.tickets_issued_count, obj.tickets_checked_in_count = issued, checked
+        return issued, checked
 
     def get_tickets_issued(self, obj):
         try:
-            return obj.event_management_tickets.count()
+            return self._ticket_counts(obj)[0]
         except Exception:
             return 0
 
     def get_tickets_checked_in(self, obj):
         try:
-            return obj.event_management_tickets.filter(is_used=True).count()
+            return self._ticket_counts(obj)[1]
         except Exception:
             return 0
 
     def get_tickets_pending(self, obj):
         try:
-            issued = obj.event_management_tickets.count()
-            checked = obj.event_management_tickets.filter(is_used=True).count()
+            issued, checked = self._ticket_counts(obj)
             return max(issued - checked, 0)
         except Exception:
             return 0
@@ -111,39 +197,14 @@ class EventSerializer(serializers.ModelSerializer):
         #return req.build_absolute_uri(url) if req else url
     
     def get_google_calendar_url(self, obj):
-        # if times are missing, don't return a link
-        if not obj.start_time or not obj.end_time:
-            return None
-
-        start = obj.start_time
-        end = obj.end_time
-
-        # make sure they're timezone-aware, then convert to UTC
-        if timezone.is_naive(start):
-            start = timezone.make_aware(start, timezone.get_current_timezone())
-        if timezone.is_naive(end):
-            end = timezone.make_aware(end, timezone.get_current_timezone())
-
-        start_str = start.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-        end_str = end.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-
         # best-effort location (depends on how Event ↔ Venue is set up)
         location = ""
         venue = getattr(obj, "venue", None)
         if venue:
             location = getattr(venue, "name", "") or str(venue)
+        return google_calendar_url(obj.title, obj.description, location, obj.start_time, obj.end_time)
 
-        params = {
-            "action": "TEMPLATE",
-            "text": obj.title,
-            "details": obj.description or "",
-            "location": location,
-            "dates": f"{start_str}/{end_str}",
-        }
-
-        return "https://calendar.google.com/calendar/render?" + urlencode(params)
-
-class TicketSerializer(serializers.ModelSerializer):
+class TicketSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     event = EventSerializer(read_only=True)
     qr_png_url = serializers.SerializerMethodField(read_only=True)
 
@@ -151,6 +212,9 @@ class TicketSerializer(serializers.ModelSerializer):
         model = Ticket
         fields = ["id", "event", "owner", "qr", "is_used", "qr_png_url"]
         extra_kwargs = {"owner": {"write_only": True}}
+        # ?expand=owner renders the (requesting) owner's account
+        expandable_fields = {"owner": "user_accounts.serializers.UserSerializer"}
+        field_sources = {"qr_png_url": ["qr"]}
 
     def get_qr_png_url(self, obj):
         # If an image was saved to the ImageField, return its URL
@@ -161,4 +225,83 @@ class TicketSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(url) if request else url
         except Exception:
             pass
-        return None
\ No newline at end of file
+        return None
+
+
+class SlimTicketSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Ticket with flattened event fields, for "my tickets" lists (?view=slim).
+
+    Everything comes from the ticket row joined with its event and venue; the
+    event's ticket counters (from EventStats) are only included when named in
+    ?fields=.
+    """
+    event = serializers.IntegerField(source="event_id", read_only=True)
+    event_title = serializers.CharField(source="event.title", read_only=True)
+    event_start_time = serializers.DateTimeField(source="event.start_time", read_only=True)
+    event_end_time = serializers.DateTimeField(source="event.end_time", read_only=True)
+    event_organization = serializers.CharField(source="event.organization", read_only=True)
+    event_category = serializers.CharField(source="event.category", read_only=True)
+    event_image_url = serializers.SerializerMethodField(read_only=True)
+    event_venue_name = serializers.SerializerMethodField(read_only=True)
+    event_tickets_issued = serializers.SerializerMethodField(read_only=True)
+    event_tickets_checked_in = serializers.SerializerMethodField(read_only=True)
+    qr_code = serializers.SerializerMethodField(read_only=True)
+    qr_png_url = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = Ticket
+        fields = [
+            "id",
+            "event",
+            "event_title",
+            "event_start_time",
+            "event_end_time",
+            "event_organization",
+            "event_category",
+            "event_image_url",
+            "event_venue_name",
+            "event_tickets_issued",
+            "event_tickets_checked_in",
+            "is_used",
+            "checked_in_at",
+            "created_at",
+            "qr_code",
+            "qr_png_url",
+        ]
+        read_only_fields = fields
+        optional_fields = ["event_tickets_issued", "event_tickets_checked_in"]
+        field_sources = {
+            "event_image_url": ["event__image_url"],
+            "event_venue_name": ["event__venue__name"],
+            "event_tickets_issued": ["event__stats__tickets_issued"],
+            "event_tickets_checked_in": ["event__stats__tickets_checked_in"],
+            "qr_code": ["event", "created_at"],
+            "qr_png_url": ["qr"],
+        }
+
+    def get_event_image_url(self, obj):
+        return event_image_url(obj.event)
+
+    def get_event_venue_name(self, obj):
+        venue = obj.event.venue
+        return venue.name if venue else None
+
+    def _stats(self, obj):
+        try:
+            return obj.event.stats
+        except ObjectDoesNotExist:
+            return None
+
+    def get_event_tickets_issued(self, obj):
+        stats = self._stats(obj)
+        return stats.tickets_issued if stats else obj.event.event_management_tickets.count()
+
+    def get_event_tickets_checked_in(self, obj):
+        stats = self._stats(obj)
+        return stats.tickets_checked_in if stats else obj.event.event_management_tickets.filter(is_used=True).count()
+
+    def get_qr_code(self, obj):
+        return ticket_qr_payload(obj)
+
+    def get_qr_png_url(self, obj):
+        return ticket_qr_url(obj)
@@ -0,0 +1,49 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search
+from .models import Event, EventStats, Ticket, TicketTombstone
+from .suggest import index as suggest_index
+
+
+@receiver(post_save, sender=Event)
+def create_event_stats(sender, instance, created, raw=False, **kwargs):
+    """Give every new event its (empty) EventStats row."""
+    if created and not raw:
+        EventStats.objects.get_or_create(event=instance)
+
+
+@receiver(post_save, sender=Event)
+def index_event_for_search(sender, instance, **kwargs):
+    """Keep the full-text search row in step with the event."""
+    search.index_event(instance)
+
+
+@receiver(post_delete, sender=Event)
+def remove_event_from_search(sender, instance, **kwargs):
+    search.remove_event(instance.pk)
+
+
+@receiver(post_save, sender=Event)
+def update_suggest_index(sender, instance, **kwargs):
+    """Refresh the in-process typeahead index once the write is committed."""
+    transaction.on_commit(lambda: suggest_index.update(instance))
+
+
+@receiver(post_delete, sender=Event)
+def discard_from_suggest_index(sender, instance, **kwargs):
+    event_id = instance.pk
+    transaction.on_commit(lambda: suggest_index.discard(event_id))
+
+
+@receiver(post_delete, sender=Ticket)
+def record_ticket_tombstone(sender, instance, **kwargs):
+    """Remember removed tickets for check-in manifest deltas (see manifest.py)."""
+    TicketTombstone.objects.create(event_id=instance.event_id, ticket_id=instance.pk)
+
+
+@receiver(post_delete, sender=Event)
+def drop_ticket_tombstones(sender, instance, **kwargs):
+    # runs after the event's tickets (and their tombstones) are deleted
+    TicketTombstone.objects.filter(event_id=instance.pk).delete()
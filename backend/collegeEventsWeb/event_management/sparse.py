@@ -0,0 +1,174 @@
+"""Sparse fieldsets and expansion for DRF serializers.
+
+``?fields=id,title`` limits a response to the named fields and ``?omit=``
+drops fields from the default set. Dotted names reach into nested
+serializers: ``?fields=id,event.title`` returns the ticket id and its event
+with just the title. A level with no names requested keeps its default
+fields.
+
+``?expand=venue`` swaps a relation rendered as a primary key for the nested
+serializer named in the serializer's ``Meta.expandable_fields``; nested
+fields can then be trimmed the same way (``?fields=title,venue.name``).
+
+Fields listed in a serializer's ``Meta.optional_fields`` are left out unless
+they are named, so expensive extras are only computed on request. Fields that
+are not selected are dropped before rendering, so their SerializerMethodField
+getters never run, and ``shape_queryset`` narrows the queryset to the columns
+(``.only()``) and joins (``.select_related()``) the remaining fields read.
+Computed fields declare what they read in ``Meta.field_sources``. Only
+GET/HEAD responses are trimmed.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+EXPAND_PARAM = 'expand'
+SPARSE_PARAMS = (FIELDS_PARAM, OMIT_PARAM, EXPAND_PARAM)
+
+
+def parse_field_paths(value):
+    """Split a ?fields= value into a set of dotted-path tuples."""
+    paths = set()
+    for item in (value or '').split(','):
+        item = item.strip()
+        if item:
+            paths.add(tuple(part for part in item.split('.') if part))
+    paths.discard(())
+    return paths
+
+
+def requested_fields(paths, prefix=()):
+    """Names requested directly under prefix, or None when nothing below it was named."""
+    depth = len(prefix)
+    names = {path[depth] for path in paths if len(path) > depth and path[:depth] == prefix}
+    return names or None
+
+
+def _leaf_fields(paths, prefix):
+    """Names whose full path ends directly under prefix (used for ?omit=)."""
+    depth = len(prefix)
+    return {path[depth] for path in paths if len(path) == depth + 1 and path[:depth] == prefix}
+
+
+def _sparse_params(request):
+    """The request's sparse-fieldset params as path sets, or None if it has none (or is a write)."""
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    params = getattr(request, 'query_params', request.GET)
+    if not any(params.get(name) for name in SPARSE_PARAMS):
+        return None
+    return {name: parse_field_paths(params.get(name)) for name in SPARSE_PARAMS}
+
+
+def has_sparse_params(request):
+    """True if a GET/HEAD request asks to trim or expand the response."""
+    return _sparse_params(request) is not None
+
+
+class SparseFieldsetMixin:
+    """Apply ?fields= / ?omit= / ?expand= from the request in the serializer context."""
+
+    def _field_path(self):
+        """Names of the fields leading from the root serializer to this one."""
+        path = []
+        node = self
+        while node is not None:
+            name = getattr(node, 'field_name', None)
+            if name:
+                path.append(name)
+            node = getattr(node, 'parent', None)
+        return tuple(reversed(path))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        meta = getattr(self, 'Meta', None)
+        request = self.root.context.get('request') if self.root is not None else None
+        params = _sparse_params(request) or {name: set() for name in SPARSE_PARAMS}
+        path = self._field_path()
+
+        wanted = requested_fields(params[FIELDS_PARAM], path)
+        if wanted is None:
+            for name in getattr(meta, 'optional_fields', ()):
+                fields.pop(name, None)
+        else:
+            fields = {name: field for name, field in fields.items() if name in wanted}
+        for name in _leaf_fields(params[OMIT_PARAM], path):
+            fields.pop(name, None)
+
+        expandable = getattr(meta, 'expandable_fields', {})
+        for name in requested_fields(params[EXPAND_PARAM], path) or ():
+            if name in expandable and name in fields:
+                serializer_class = expandable[name]
+                if isinstance(serializer_class, str):
+                    serializer_class = import_string(serializer_class)
+                fields[name] = serializer_class(read_only=True)
+        return fields
+
+
+def _serializer_columns(serializer, prefix, columns, relations):
+    """Collect the ORM lookups a serializer's fields read; False if some field can't be mapped."""
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    meta = getattr(serializer, 'Meta', None)
+    model = getattr(meta, 'model', None)
+    if model is None:
+        return False
+    field_sources = getattr(meta, 'field_sources', {})
+    columns.add(prefix + model._meta.pk.name)
+    for name, field in serializer.fields.items():
+        if name in field_sources:
+            lookups = field_sources[name]
+        elif field.source == '*':
+            return False
+        else:
+            lookups = [field.source.replace('.', '__')]
+        if isinstance(field, (serializers.BaseSerializer,)):
+            relation = prefix + lookups[0]
+            relations.add(relation)
+            if not _serializer_columns(field, relation + '__', columns, relations):
+                return False
+            continue
+        for lookup in lookups:
+            if not _is_model_lookup(model, lookup):
+                return False
+            columns.add(prefix + lookup)
+            parts = (prefix + lookup).split('__')
+            relations.update('__'.join(parts[:i]) for i in range(1, len(parts)))
+    return True
+
+
+def _is_model_lookup(model, lookup):
+    """True if lookup names a concrete field, following forward and one-to-one relations."""
+    for part in lookup.split('__'):
+        if model is None:
+            return False
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return False
+        if field.is_relation and (field.many_to_many or field.one_to_many):
+            return False
+        model = field.related_model
+    return True
+
+
+def shape_queryset(queryset, serializer):
+    """Narrow queryset to what serializer renders for a trimmed (?fields=/?omit=/?expand=) GET.
+
+    Returns the queryset unchanged when the request asks for no trimming or
+    when a field's sources are unknown, so the default path keeps the view's
+    own select_related().
+    """
+    request = serializer.context.get('request')
+    if not has_sparse_params(request):
+        return queryset
+    columns, relations = set(), set()
+    if not _serializer_columns(serializer, '', columns, relations):
+        return queryset
+    # Only relations rendered by the serializer are joined; drop the view's defaults
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*sorted(relations))
+    return queryset.only(*sorted(columns))
@@ -0,0 +1,105 @@
+"""Incremental maintenance of EventStats.
+
+Call these helpers inside the transaction that changes the tickets so the
+counters commit (or roll back) together with the change.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import EventStats, Ticket
+
+
+def count_event_tickets(event_ids=None):
+    """Return {event_id: (issued, checked_in)} computed from the Ticket table."""
+    qs = Ticket.objects.all()
+    if event_ids is not None:
+        qs = qs.filter(event_id__in=event_ids)
+    rows = (qs.values('event_id')
+              .annotate(issued=Count('id'), checked_in=Count('id', filter=Q(is_used=True)))
+              .order_by())
+    return {r['event_id']: (r['issued'], r['checked_in']) for r in rows}
+
+
+def rebuild_stats_for_event(event_id):
+    """Recompute one event's row from the Ticket table (creating it if missing)."""
+    issued, checked_in = count_event_tickets([event_id]).get(event_id, (0, 0))
+    try:
+        with transaction.atomic():
+            stats, _ = EventStats.objects.update_or_create(
+                event_id=event_id,
+                defaults={'tickets_issued': issued, 'tickets_checked_in': checked_in,
+                          'updated_at': timezone.now()},
+            )
+    except IntegrityError:
+        # Created concurrently; that row is built from the same tickets
+        stats = EventStats.objects.get(event_id=event_id)
+    return stats
+
+
+def _apply(event_id, **deltas):
+    updates = {field: Greatest(F(field) + delta, Value(0)) for field, delta in deltas.items() if delta}
+    if not updates:
+        return
+    updated = EventStats.objects.filter(event_id=event_id).update(updated_at=timezone.now(), **updates)
+    if not updated:
+        # No row yet (legacy event): the ticket change is already visible in
+        # this transaction, so counting now yields the post-change values.
+        rebuild_stats_for_event(event_id)
+
+
+def record_ticket_issued(event_id):
+    _apply(event_id, tickets_issued=1)
+
+
+def reserve_ticket(event_id, capacity=None):
+    """Count one issued ticket if a seat is left; return False when sold out.
+
+    The seat is taken with a single conditional UPDATE
+    (tickets_issued = tickets_issued + 1 WHERE tickets_issued < capacity), so
+    concurrent buyers serialize on the stats row and the counter can never
+    pass the capacity. Call it in the transaction that creates the ticket.
+    """
+    if capacity is None:
+        record_ticket_issued(event_id)
+        return True
+    for _ in range(2):
+        updated = (EventStats.objects
+                   .filter(event_id=event_id, tickets_issued__lt=capacity)
+                   .update(tickets_issued=F('tickets_issued') + 1, updated_at=timezone.now()))
+        if updated:
+            return True
+        if EventStats.objects.filter(event_id=event_id).exists():
+            return False
+        # Legacy event without a stats row: build it from the tickets, then retry
+        rebuild_stats_for_event(event_id)
+    return False
+
+
+def record_ticket_cancelled(event_id, was_checked_in=False):
+    _apply(event_id, tickets_issued=-1, tickets_checked_in=-1 if was_checked_in else 0)
+
+
+def release_ticket(ticket):
+    """Delete a ticket and count it out; return False if it was already gone.
+
+    The row is locked before the delete, so when two cancellations of the same
+    ticket overlap only the one whose DELETE removes the row decrements the
+    counters (and writes the tombstone). Call it inside a transaction.
+    """
+    was_checked_in = (Ticket.objects.select_for_update()
+                      .filter(pk=ticket.pk)
+                      .values_list('is_used', flat=True)
+                      .first())
+    if was_checked_in is None:
+        return False
+    _, deleted = Ticket.objects.filter(pk=ticket.pk).delete()
+    if not deleted.get(Ticket._meta.label):
+        return False
+    record_ticket_cancelled(ticket.event_id, was_checked_in=was_checked_in)
+    return True
+
+
+def record_check_in(event_id, count=1):
+    _apply(event_id, tickets_checked_in=count)
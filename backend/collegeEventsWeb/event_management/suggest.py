@@ -0,0 +1,232 @@
+"""In-process typeahead index for /api/events/suggest/?prefix=.
+
+Approved events are tokenized over title, organization and category into a
+sorted term list; each term maps to a sorted ``array('q')`` of event ids (8
+bytes per posting instead of a Python int object per id). A lookup bisects to
+the first term carrying the prefix and walks forward, so it touches only the
+matching terms and never the database.
+
+The index is built lazily on first use (not in AppConfig.ready(), where the
+tables may not exist yet) and kept current by the Event signals, applied on
+commit. Each worker process holds its own copy, so it is also rebuilt once it
+is older than settings.SUGGEST_INDEX_MAX_AGE seconds to pick up changes made
+by other processes or by bulk writes that bypass signals.
+"""
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Event
+
+# Stop collecting candidates after this many ids; ranking happens on these only
+MAX_CANDIDATES = 500
+
+_ANY = object()
+
+
+def normalize(text):
+    """Casefold and strip accents so 'Café' and 'cafe' index the same."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def tokenize(text):
+    tokens, current = [], []
+    for ch in normalize(text):
+        if ch.isalnum():
+            current.append(ch)
+        elif current:
+            tokens.append(''.join(current))
+            current = []
+    if current:
+        tokens.append(''.join(current))
+    return tokens
+
+
+class SuggestIndex:
+    """Prefix index over event titles, organizations and categories."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._terms = []      # sorted distinct terms
+        self._postings = {}   # term -> array('q') of sorted event ids
+        self._docs = {}       # event id -> (title, organization, category, start, end, title phrase)
+        self._pending = None  # signal updates that arrive while a build is reading the table
+        self.built_at = None
+
+    # ---------- maintenance ----------
+    @staticmethod
+    def _make_doc(title, organization, category, start, end):
+        return (title, organization, category, start, end, ' '.join(tokenize(title)))
+
+    @staticmethod
+    def _terms_for(doc):
+        return set(doc[5].split()) | set(tokenize(doc[1])) | set(tokenize(doc[2]))
+
+    def _add(self, event_id, doc):
+        self._docs[event_id] = doc
+        for term in self._terms_for(doc):
+            ids = self._postings.get(term)
+            if ids is None:
+                self._postings[term] = array('q', [event_id])
+                insort(self._terms, term)
+                continue
+            pos = bisect_left(ids, event_id)
+            if pos == len(ids) or ids[pos] != event_id:
+                ids.insert(pos, event_id)
+
+    def _remove(self, event_id):
+        doc = self._docs.pop(event_id, None)
+        if doc is None:
+            return
+        for term in self._terms_for(doc):
+            ids = self._postings.get(term)
+            if ids is None:
+                continue
+            pos = bisect_left(ids, event_id)
+            if pos < len(ids) and ids[pos] == event_id:
+                del ids[pos]
+            if not ids:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+
+    def build(self, expected_built_at=_ANY):
+        """(Re)load every approved event that has not ended yet.
+
+        With expected_built_at, skip the rebuild if another thread has
+        (re)built the index since that value was read.
+        """
+        with self._build_lock:
+            if expected_built_at is not _ANY and self.built_at != expected_built_at:
+                return
+            with self._lock:
+                self._pending = []
+            try:
+                rows = (Event.objects.filter(is_approved=True, end_time__gte=timezone.now())
+                        .order_by('id')
+                        .values_list('id', 'title', 'organization', 'category', 'start_time', 'end_time'))
+                postings, docs = {}, {}
+                for event_id, *fields in rows.iterator(chunk_size=2000):
+                    doc = docs[event_id] = self._make_doc(*fields)
+                    for term in self._terms_for(doc):
+                        # ids arrive in ascending order, so appending keeps postings sorted
+                        postings.setdefault(term, array('q')).append(event_id)
+            except Exception:
+                with self._lock:
+                    self._pending = None
+                raise
+            with self._lock:
+                self._postings, self._docs = postings, docs
+                self._terms = sorted(postings)
+                pending, self._pending = self._pending, None
+                for event_id, doc in pending:
+                    self._apply(event_id, doc)
+                self.built_at = time.monotonic()
+
+    def _apply(self, event_id, doc):
+        self._remove(event_id)
+        if doc is not None:
+            self._add(event_id, doc)
+
+    def _record(self, event_id, doc):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((event_id, doc))
+            if self.built_at is not None:
+                self._apply(event_id, doc)
+
+    def update(self, event):
+        doc = None
+        if event.is_approved and event.end_time >= timezone.now():
+            doc = self._make_doc(event.title, event.organization, event.category,
+                                 event.start_time, event.end_time)
+        self._record(event.pk, doc)
+
+    def discard(self, event_id):
+        self._record(event_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._terms, self._postings, self._docs = [], {}, {}
+            self.built_at = None
+
+    def ensure_fresh(self):
+        max_age = getattr(settings, 'SUGGEST_INDEX_MAX_AGE', 300)
+        built_at = self.built_at
+        if built_at is None or (max_age > 0 and time.monotonic() - built_at > max_age):
+            # the check is repeated under the build lock, so concurrent callers rebuild once
+            self.build(expected_built_at=built_at)
+
+    # ---------- lookup ----------
+    def _prefix_ids(self, prefix, now, within=None):
+        """Ids of events not ended by `now` for every term starting with `prefix`.
+
+        Capped at MAX_CANDIDATES unless restricted to the ids in `within`.
+        Ended events stay indexed until the next rebuild, so they are dropped
+        before the cap rather than after it.
+        """
+        ids = set()
+        docs = self._docs
+        terms = self._terms
+        i = bisect_left(terms, prefix)
+        while i < len(terms) and terms[i].startswith(prefix):
+            postings = self._postings[terms[i]]
+            if within is None:
+                ids.update(event_id for event_id in postings if docs[event_id][4] >= now)
+                if len(ids) >= MAX_CANDIDATES:
+                    break
+            else:
+                ids.update(within.intersection(postings))
+            i += 1
+        return ids
+
+    def lookup(self, prefix, limit=8, now=None):
+        """Upcoming approved events matching `prefix`, best first.
+
+        Every word of the prefix must match a term exactly except the last,
+        which matches as a prefix. Events whose title starts with the phrase
+        rank first, then events sooner in time.
+        """
+        tokens = tokenize(prefix)
+        if not tokens:
+            return []
+        now = now or timezone.now()
+        with self._lock:
+            candidates = None
+            for token in tokens[:-1]:
+                ids = set(self._postings.get(token, ()))
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+            candidates = self._prefix_ids(tokens[-1], now, within=candidates)
+            docs = [(event_id, self._docs[event_id]) for event_id in candidates]
+
+        phrase = ' '.join(tokens)
+        ranked = sorted(
+            ((event_id, doc) for event_id, doc in docs if doc[4] >= now),
+            key=lambda item: (not item[1][5].startswith(phrase), item[1][3], item[0]),
+        )
+        return [
+            {
+                'id': event_id,
+                'title': title,
+                'organization': organization,
+                'category': category,
+                'start_time': start,
+            }
+            for event_id, (title, organization, category, start, _end, _phrase) in ranked[:limit]
+        ]
+
+
+index = SuggestIndex()
+
+
+def suggest(prefix, limit=8):
+    index.ensure_fresh()
+    return index.lookup(prefix, limit=limit)
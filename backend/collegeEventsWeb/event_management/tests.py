@@ -1,10 +1,11 @@
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
-from event_management.models import Event, Ticket
+from event_management.models import Category, Event, EventStats, Ticket, Venue
 from django.utils import timezone
 from datetime import timedelta
+import uuid
 
 User = get_user_model()
 
@@ -223,6 +224,36 @@ class AttendeeListTests(TestCase):
         self.assertEqual(response.data['total_attendees'], 1)
         self.assertEqual(response.data['attendees'][0]['email'], 'student@example.com')
     
+    def test_attendee_list_filters_and_pagination(self):
+        """Test checked_in/q filters and pages keep event-wide totals"""
+        for i in range(4):
+            attendee = User.objects.create_user(
+                email=f'attendee{i}@example.com',
+                password='testpass123',
+                name=f'Attendee {i}',
+                role='student'
+            )
+            Ticket.objects.create(event=self.event, owner=attendee, is_used=(i % 2 == 0))
+
+        client = APIClient()
+        client.force_authenticate(user=self.organizer)
+        url = f'/api/events/{self.event.id}/attendees/'
+
+        response = client.get(url, {'page_size': 2})
+        self.assertEqual(response.data['total_attendees'], 5)
+        self.assertEqual(response.data['checked_in_count'], 2)
+        self.assertEqual(len(response.data['attendees']), 2)
+        self.assertEqual(response.data['count'], 5)
+        self.assertIsNotNone(response.data['next'])
+
+        response = client.get(url, {'checked_in': 'true'})
+        self.assertEqual({a['is_checked_in'] for a in response.data['attendees']}, {True})
+        self.assertEqual(len(response.data['attendees']), 2)
+
+        response = client.get(url, {'q': 'attendee3@'})
+        self.assertEqual([a['email'] for a in response.data['attendees']], ['attendee3@example.com'])
+        self.assertEqual(response.data['total_attendees'], 5)
+
     def test_csv_export_includes_correct_data(self):
         """Test CSV export contains attendee information"""
         client = APIClient()
@@ -232,10 +263,38 @@ class AttendeeListTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response['Content-Type'], 'text/csv')
         
-        # Check CSV contains student email
-        content = response.content.decode('utf-8')
+        # Check CSV contains student email (the export is streamed)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertIn('student@example.com', content)
+
+    def test_export_formats_and_gzip(self):
+        """Test NDJSON, XLSX and gzip export variants"""
+        import gzip
+        import io
+        import json
+        import zipfile
+        client = APIClient()
+        client.force_authenticate(user=self.organizer)
+        url = f'/api/events/{self.event.id}/attendees/export/'
+
+        response = client.get(url, {'file_format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(json.loads(lines[0])['email'], 'student@example.com')
+
+        response = client.get(url, {'file_format': 'xlsx'})
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as zf:
+            sheet = zf.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertIn('student@example.com', sheet)
+
+        response = client.get(url, {'gzip': '1'})
+        self.assertTrue(response['Content-Disposition'].endswith('.csv.gz"'))
+        content = gzip.decompress(b''.join(response.streaming_content)).decode('utf-8')
         self.assertIn('student@example.com', content)
 
+        response = client.get(url, {'file_format': 'pdf'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class PermissionTests(TestCase):
     """Test role-based permissions"""
@@ -290,4 +349,1768 @@ class PermissionTests(TestCase):
         client.force_authenticate(user=other_organizer)
         response = client.get(f'/api/events/{self.event.id}/attendees/')
         
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+class EventListQueryCountTests(TestCase):
+    """Event listing must not issue per-event ticket COUNT queries"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email='organizer@example.com',
+            password='testpass123',
+            name='Test Organizer',
+            role='organizer',
+            status='active'
+        )
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='testpass123',
+            name='Test Student',
+            role='student'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.student)
+
+    def _create_events(self, count):
+        events = []
+        for i in range(count):
+            events.append(Event.objects.create(
+                title=f'Event {i}',
+                description='Test',
+                start_time=timezone.now() + timedelta(days=1, hours=i),
+                end_time=timezone.now() + timedelta(days=1, hours=i + 2),
+                organization='Test Org',
+                category='Workshop',
+                organizer=self.organizer,
+                is_approved=True
+            ))
+        return events
+
+    def _list_query_count(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/events/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        """Test listing 2 or 8 events costs the same number of queries"""
+        self._create_events(2)
+        small = self._list_query_count()
+        self._create_events(6)
+        large = self._list_query_count()
+        self.assertEqual(small, large)
+
+    def test_list_reports_ticket_counters(self):
+        """Test annotated counters match issued and checked-in tickets"""
+        event = self._create_events(1)[0]
+        response = self.client.post(f'/api/events/{event.id}/buy/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # /api/tickets/ is guarded by RoleAuthorizationMiddleware, which needs a real JWT
+        from rest_framework_simplejwt.tokens import RefreshToken
+        organizer_client = APIClient()
+        organizer_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.organizer).access_token}'
+        )
+        checkin = organizer_client.post(f"/api/tickets/{response.data['ticket_id']}/checkin/")
+        self.assertEqual(checkin.status_code, status.HTTP_200_OK)
+
+        other = User.objects.create_user(
+            email='student2@example.com',
+            password='testpass123',
+            name='Second Student',
+            role='student'
+        )
+        other_client = APIClient()
+        other_client.force_authenticate(user=other)
+        other_client.post(f'/api/events/{event.id}/buy/')
+
+        data = self.client.get('/api/events/').data[0]
+        self.assertEqual(data['tickets_issued'], 2)
+        self.assertEqual(data['tickets_checked_in'], 1)
+        self.assertEqual(data['tickets_pending'], 1)
+
+
+class EventPaginationTests(TestCase):
+    """Test opt-in cursor pagination on the event list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        base = timezone.now() + timedelta(days=1)
+        self.events = [
+            Event.objects.create(
+                title=f'Event {i}',
+                description='Test',
+                # two events share a start time to exercise the id tie-breaker
+                start_time=base + timedelta(hours=i // 2),
+                end_time=base + timedelta(hours=i // 2 + 2),
+                organization='Test Org',
+                category='Workshop',
+                is_approved=True
+            )
+            for i in range(5)
+        ]
+        Event.objects.create(
+            title='Hidden', description='Test',
+            start_time=base, end_time=base + timedelta(hours=2),
+            organization='Test Org', category='Workshop', is_approved=False
+        )
+
+    def test_unpaginated_list_keeps_plain_shape(self):
+        """Test requests without page_size still get a plain list"""
+        response = self.client.get('/api/events/')
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 5)
+
+    def test_cursor_pages_cover_all_events_in_order(self):
+        """Test following next links walks every visible event once"""
+        seen = []
+        url = '/api/events/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(e['id'] for e in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, [e.id for e in self.events])
+
+    @override_settings(EVENTS_MAX_PAGE_SIZE=3)
+    def test_page_size_is_capped(self):
+        """Test page_size above the configured maximum is clamped"""
+        response = self.client.get('/api/events/?page_size=50')
+        self.assertEqual(len(response.data['results']), 3)
+
+
+class EventDateFilterTests(TestCase):
+    """Test ?date=/?from=/?to= filters use whole calendar days"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.day = (timezone.now() + timedelta(days=10)).date()
+        midnight = timezone.make_aware(timezone.datetime.combine(self.day, timezone.datetime.min.time()))
+
+        def create(title, start, end):
+            return Event.objects.create(
+                title=title, description='Test', organization='Test Org', category='Workshop',
+                start_time=start, end_time=end, is_approved=True
+            )
+
+        self.overnight = create('Overnight', midnight - timedelta(hours=1), midnight + timedelta(hours=1))
+        self.late = create('Late', midnight + timedelta(hours=23, minutes=30), midnight + timedelta(hours=25))
+        self.next_day = create('Next day', midnight + timedelta(days=1), midnight + timedelta(days=1, hours=2))
+        self.day_before = create('Day before', midnight - timedelta(hours=3), midnight - timedelta(hours=1))
+
+    def _ids(self, query):
+        return {e['id'] for e in self.client.get(f'/api/events/?{query}').data}
+
+    def test_date_returns_events_intersecting_the_day(self):
+        """Test events overlapping the day are included, others are not"""
+        self.assertEqual(self._ids(f'date={self.day.isoformat()}'), {self.overnight.id, self.late.id})
+
+    def test_from_and_to_are_inclusive_days(self):
+        """Test from/to bound the start time by whole days"""
+        ids = self._ids(f'from={self.day.isoformat()}&to={self.day.isoformat()}')
+        self.assertEqual(ids, {self.late.id})
+
+
+class TicketQRTests(TestCase):
+    """Test QR rendering is deferred and served on demand"""
+
+    def setUp(self):
+        from rest_framework_simplejwt.tokens import RefreshToken
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='testpass123',
+            name='Test Student',
+            role='student'
+        )
+        self.other = User.objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+            name='Other Student',
+            role='student'
+        )
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org',
+            category='Workshop',
+            is_approved=True
+        )
+        # /api/tickets/ is guarded by RoleAuthorizationMiddleware, which needs a real JWT
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.student).access_token}')
+        self.other_client = APIClient()
+        self.other_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.other).access_token}')
+
+    def test_purchase_defers_png_rendering(self):
+        """Test buy responds with the textual payload and the on-demand PNG url"""
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(f'/api/events/{self.event.id}/buy/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        ticket_id = response.data['ticket_id']
+        from event_management.qr import parse_ticket_code
+        code = parse_ticket_code(response.data['qr_code'])
+        self.assertEqual((str(code.ticket_id), code.event_id, code.signed), (ticket_id, self.event.id, True))
+        self.assertEqual(response.data['qr_png_url'], f'/api/tickets/{ticket_id}/qr.png')
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(Ticket.objects.get(pk=ticket_id).qr)
+
+    def test_qr_png_endpoint_renders_and_supports_etag(self):
+        """Test the PNG renders without a stored file and revalidates with 304"""
+        ticket = Ticket.objects.create(event=self.event, owner=self.student)
+        url = f'/api/tickets/{ticket.id}/qr.png'
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(response.content.startswith(b'\x89PNG'))
+        self.assertIn('max-age', response['Cache-Control'])
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        forbidden = self.other_client.get(url)
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_failed_png_render_is_logged(self):
+        """Test a worker render that raises is logged and leaves the ticket without a file"""
+        from unittest import mock
+        from event_management import qr
+        ticket = Ticket.objects.create(event=self.event, owner=self.student)
+        with mock.patch.object(qr, 'render_qr_png', side_effect=RuntimeError('boom')), \
+                mock.patch.object(qr.connection, 'close'), \
+                self.assertLogs('event_management.qr', level='ERROR') as logs:
+            qr.render_ticket_qr(ticket.id)
+        self.assertIn(str(ticket.id), logs.output[0])
+        self.assertFalse(Ticket.objects.get(pk=ticket.id).qr)
+
+    def test_qr_png_reads_the_ticket_once(self):
+        """Test the signed payload needs no deferred-field query"""
+        ticket = Ticket.objects.create(event=self.event, owner=self.student)
+        url = f'/api/tickets/{ticket.id}/qr.png'
+        etag = self.client.get(url)['ETag']
+        # the JWT user, then the ticket with its event
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                             status.HTTP_304_NOT_MODIFIED)
+
+
+class GlobalAnalyticsTests(TestCase):
+    """Test the admin dashboard's global analytics endpoint"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org',
+            category='Workshop',
+            is_approved=True
+        )
+        self.students = [
+            User.objects.create_user(
+                email=f'student{i}@example.com',
+                password='testpass123',
+                name=f'Student {i}',
+                role='student'
+            )
+            for i in range(3)
+        ]
+        # two tickets this week (one used), one three weeks ago
+        Ticket.objects.create(event=self.event, owner=self.students[0], is_used=True)
+        Ticket.objects.create(event=self.event, owner=self.students[1])
+        Ticket.objects.create(event=self.event, owner=self.students[2],
+                              created_at=timezone.now() - timedelta(weeks=3))
+
+    def test_weekly_trends_fill_missing_weeks(self):
+        """Test every week in the window is present, with zeros for gaps"""
+        client = APIClient()
+        response = client.get('/api/analytics/global/', {'weeks': 6})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_tickets_issued'], 3)
+        self.assertEqual(response.data['unique_attendees'], 3)
+
+        trends = response.data['trends']
+        self.assertEqual(len(trends), 6)
+        self.assertEqual((trends[-1]['tickets_issued'], trends[-1]['check_ins']), (2, 1))
+        self.assertEqual(trends[-4]['tickets_issued'], 1)
+        self.assertEqual(sum(t['tickets_issued'] for t in trends), 3)
+        # the legacy key keeps its 12-week window
+        legacy = response.data['trends_last_12_weeks']
+        self.assertEqual(len(legacy), 12)
+        self.assertEqual(legacy[-6:], trends)
+
+    def test_default_window_and_query_budget(self):
+        """Test the whole snapshot, weekly series included, is one query over the ticket table"""
+        client = APIClient()
+        with self.assertNumQueries(1):
+            response = client.get('/api/analytics/global/')
+        self.assertEqual(response.data['total_events'], 1)
+        # the event count does not depend on there being tickets
+        from event_management.analytics_views import build_global_snapshot
+        Ticket.objects.all().delete()
+        snapshot = build_global_snapshot(12)
+        self.assertEqual((snapshot['total_events'], snapshot['total_tickets_issued']), (1, 0))
+        self.assertEqual(response.data['weeks'], 12)
+        self.assertEqual(len(response.data['trends_last_12_weeks']), 12)
+
+    def test_snapshot_is_cached_and_reports_age(self):
+        """Test repeated calls are served from the cache until ?fresh=1 by an admin"""
+        client = APIClient()
+        client.get('/api/analytics/global/')
+        Ticket.objects.filter(owner=self.students[1]).delete()
+
+        with self.assertNumQueries(0):
+            cached = client.get('/api/analytics/global/')
+        self.assertEqual(cached.data['total_tickets_issued'], 3)
+        self.assertIn('snapshot_age_seconds', cached.data)
+        self.assertFalse(cached.data['snapshot_stale'])
+
+        # ?fresh=1 is ignored for non-admins
+        self.assertEqual(client.get('/api/analytics/global/?fresh=1').data['total_tickets_issued'], 3)
+
+        admin = User.objects.create_superuser(email='admin@example.com', name='Admin', password='pw')
+        client.force_authenticate(user=admin)
+        fresh = client.get('/api/analytics/global/?fresh=1')
+        self.assertEqual(fresh.data['total_tickets_issued'], 2)
+        self.assertEqual(fresh.data['snapshot_age_seconds'], 0)
+
+    @override_settings(ANALYTICS_CACHE_TTL=60, ANALYTICS_CACHE_STALE=300)
+    def test_stale_snapshot_served_while_refreshing(self):
+        """Test an expired snapshot inside the stale window is served and rebuilt in the background"""
+        import time
+        from unittest import mock
+        from django.core.cache import cache
+        from event_management import analytics_views
+
+        client = APIClient()
+        client.get('/api/analytics/global/')
+        key = analytics_views._snapshot_key(12)
+        entry = cache.get(key)
+        entry['built_at'] = time.time() - 120
+        cache.set(key, entry)
+
+        with mock.patch.object(analytics_views, '_refresh_in_background') as refresh:
+            response = client.get('/api/analytics/global/')
+        self.assertTrue(response.data['snapshot_stale'])
+        self.assertGreaterEqual(response.data['snapshot_age_seconds'], 120)
+        refresh.assert_called_once_with(12)
+
+    def test_failed_background_rebuild_is_logged(self):
+        """Test a rebuild that raises is logged and releases the refresh lock"""
+        from unittest import mock
+        from django.core.cache import cache
+        from event_management import analytics_views
+
+        class InlineThread:
+            def __init__(self, target, **kwargs):
+                self.target = target
+
+            def start(self):
+                self.target()
+
+        with mock.patch.object(analytics_views.threading, 'Thread', InlineThread), \
+                mock.patch.object(analytics_views, '_store_snapshot', side_effect=RuntimeError('boom')), \
+                mock.patch.object(analytics_views.connection, 'close'), \
+                self.assertLogs('event_management.analytics_views', level='ERROR') as logs:
+            analytics_views._refresh_in_background(12)
+        self.assertIn('boom', logs.output[0])
+        self.assertIsNone(cache.get(analytics_views._snapshot_key(12) + ':refreshing'))
+
+
+class EventStatsTests(TestCase):
+    """Test EventStats counters follow buy/check-in/cancel"""
+
+    def setUp(self):
+        from rest_framework_simplejwt.tokens import RefreshToken
+        self.organizer = User.objects.create_user(
+            email='organizer@example.com',
+            password='testpass123',
+            name='Test Organizer',
+            role='organizer',
+            status='active'
+        )
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='testpass123',
+            name='Test Student',
+            role='student'
+        )
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org',
+            category='Workshop',
+            organizer=self.organizer,
+            is_approved=True
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.student).access_token}')
+
+    def _stats(self):
+        return EventStats.objects.get(event=self.event)
+
+    def test_counters_follow_ticket_lifecycle(self):
+        """Test buy, check-in and cancel update the stats row"""
+        self.assertEqual(self._stats().tickets_issued, 0)
+
+        ticket_id = self.client.post(f'/api/events/{self.event.id}/buy/').data['ticket_id']
+        self.assertEqual(self._stats().tickets_issued, 1)
+
+        self.client.post(f'/api/tickets/{ticket_id}/checkin/')
+        self.assertEqual(self._stats().tickets_checked_in, 1)
+
+        self.client.post(f'/api/events/{self.event.id}/cancel/')
+        stats = self._stats()
+        self.assertEqual((stats.tickets_issued, stats.tickets_checked_in), (0, 0))
+
+    def test_rebuild_command_repairs_drift(self):
+        """Test rebuild_event_stats recomputes counters from tickets"""
+        from django.core.management import call_command
+        from io import StringIO
+        Ticket.objects.create(event=self.event, owner=self.student, is_used=True)
+        EventStats.objects.filter(event=self.event).delete()
+
+        call_command('rebuild_event_stats', stdout=StringIO())
+        stats = self._stats()
+        self.assertEqual((stats.tickets_issued, stats.tickets_checked_in), (1, 1))
+
+
+class JWTResolutionTests(TestCase):
+    """Test a JWT is resolved to a user at most once per request"""
+
+    def setUp(self):
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from user_accounts.authentication import user_cache
+        user_cache.clear()
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='testpass123',
+            name='Test Student',
+            role='student'
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.student).access_token}')
+
+    def test_single_user_lookup_per_request(self):
+        """Test middleware and DRF view share one users-table query"""
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/users/me/')
+        self.assertEqual(response.data['email'], 'student@example.com')
+
+    @override_settings(JWT_USER_CACHE_TTL=30)
+    def test_user_cache_hit_skips_lookup(self):
+        """Test a cached token jti needs no user query"""
+        self.client.get('/api/users/me/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/users/me/')
+        self.assertEqual(response.data['email'], 'student@example.com')
+
+
+class RoleMiddlewareTests(TestCase):
+    """Test the role middleware runs once and matches compiled path rules"""
+
+    def test_registered_once(self):
+        """Test RoleAuthorizationMiddleware appears once in MIDDLEWARE"""
+        from django.conf import settings
+        self.assertEqual(settings.MIDDLEWARE.count('user_accounts.middleware.RoleAuthorizationMiddleware'), 1)
+
+    def test_matcher_unions_overlapping_rules(self):
+        """Test the compiled matcher agrees with a prefix scan"""
+        from user_accounts.middleware import PathRuleMatcher
+        matcher = PathRuleMatcher(
+            ['/api/users/login', '/admin'],
+            {'student': ['/api/tickets'], 'organizer': ['/api/tickets', '/api/organizer'],
+             'admin': ['/api/adminpanel'], 'nobody': []},
+        )
+        self.assertTrue(matcher.is_open('/admin/login/'))
+        self.assertFalse(matcher.is_open('/api/users/me/'))
+        self.assertEqual(matcher.allowed_roles('/api/tickets/x/checkin/'), {'student', 'organizer'})
+        self.assertEqual(matcher.allowed_roles('/api/organizer/events/'), {'organizer'})
+        self.assertEqual(matcher.allowed_roles('/api/events/'), frozenset())
+
+    def test_decision_stored_on_request(self):
+        """Test the middleware records its decision and skips a second pass"""
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from user_accounts.middleware import RoleAuthorizationMiddleware
+        middleware = RoleAuthorizationMiddleware(lambda request: HttpResponse())
+        request = RequestFactory().get('/api/tickets/')
+        self.assertEqual(middleware(request).status_code, 401)
+        self.assertEqual(request.role_authorization, {'student', 'organizer'})
+        # A second pass over the same request does not re-run the checks
+        self.assertEqual(middleware(request).status_code, 200)
+
+
+class EventSearchTests(TestCase):
+    """Test full-text event search and its signal-maintained index"""
+
+    def setUp(self):
+        self.client = APIClient()
+        base = timezone.now() + timedelta(days=1)
+
+        def make(title, description='', category='Workshop', is_approved=True):
+            return Event.objects.create(
+                title=title, description=description,
+                start_time=base, end_time=base + timedelta(hours=2),
+                organization='Test Org', category=category, is_approved=is_approved
+            )
+
+        self.title_hit = make('Jazz Night')
+        self.description_hit = make('Evening Social', description='Live jazz in the atrium')
+        self.other = make('Robotics Workshop')
+        self.hidden = make('Jazz Rehearsal', is_approved=False)
+
+    def test_ranked_search_prefers_title_matches(self):
+        """Test search orders title matches first and hides unapproved events"""
+        response = self.client.get('/api/events/search/?q=jazz')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([e['id'] for e in response.data['results']],
+                         [self.title_hit.id, self.description_hit.id])
+
+    def test_prefix_and_multiple_terms(self):
+        """Test all terms must match and the last one matches as a prefix"""
+        response = self.client.get('/api/events/search/?q=robot')
+        self.assertEqual([e['id'] for e in response.data['results']], [self.other.id])
+        response = self.client.get('/api/events/search/?q=jazz atr')
+        self.assertEqual([e['id'] for e in response.data['results']], [self.description_hit.id])
+
+    def test_query_syntax_is_neutralised(self):
+        """Test operator characters in the query do not cause errors"""
+        response = self.client.get('/api/events/search/?q="jazz" OR (NEAR* -')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get('/api/events/search/?q=%22%22')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_q_filter(self):
+        """Test ?q= on the list filters but keeps the plain list shape"""
+        response = self.client.get('/api/events/?q=jazz')
+        self.assertIsInstance(response.data, list)
+        self.assertEqual({e['id'] for e in response.data}, {self.title_hit.id, self.description_hit.id})
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test saving and deleting events keeps the index in sync"""
+        self.other.title = 'Jazz Robotics'
+        self.other.save()
+        response = self.client.get('/api/events/search/?q=jazz')
+        self.assertIn(self.other.id, [e['id'] for e in response.data['results']])
+        self.title_hit.delete()
+        response = self.client.get('/api/events/search/?q=jazz')
+        self.assertNotIn(self.title_hit.id, [e['id'] for e in response.data['results']])
+        response = self.client.get('/api/events/search/?q=robot')
+        self.assertEqual([e['id'] for e in response.data['results']], [self.other.id])
+
+
+class EventSuggestTests(TestCase):
+    """Test typeahead suggestions from the in-process index"""
+
+    def setUp(self):
+        from event_management.suggest import index
+        index.clear()
+        self.index = index
+        self.client = APIClient()
+        base = timezone.now() + timedelta(days=1)
+
+        def make(title, organization='Test Org', category='Workshop', days=0, **kwargs):
+            return Event.objects.create(
+                title=title, description='',
+                start_time=base + timedelta(days=days), end_time=base + timedelta(days=days, hours=2),
+                organization=organization, category=category, **kwargs
+            )
+
+        self.make = make
+        self.jazz_late = make('Jazz Night', days=3)
+        self.jazz_soon = make('Late Jazz Session', days=1)
+        self.cafe = make('Open Mic', organization='Café Society', category='Music')
+        make('Jazz Rehearsal', is_approved=False)
+        make('Jazz Past', days=-5)
+
+    def suggest(self, prefix, **params):
+        response = self.client.get('/api/events/suggest/', {'prefix': prefix, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [e['id'] for e in response.data['results']]
+
+    def test_prefix_matches_rank_title_starts_first(self):
+        """Test title-prefix matches come first, then sooner events"""
+        self.assertEqual(self.suggest('ja'), [self.jazz_late.id, self.jazz_soon.id])
+        self.assertEqual(self.suggest('late jaz'), [self.jazz_soon.id])
+        self.assertEqual(self.suggest('ja', limit=1), [self.jazz_late.id])
+
+    def test_matches_organization_and_category_ignoring_accents(self):
+        """Test organization/category words match, accent- and case-insensitively"""
+        self.assertEqual(self.suggest('CAFE'), [self.cafe.id])
+        self.assertEqual(self.suggest('mus'), [self.cafe.id])
+        self.assertEqual(self.suggest('  '), [])
+
+    def test_lookup_needs_no_queries_once_built(self):
+        """Test lookups are served from memory after the first build"""
+        self.suggest('ja')
+        self.index.ensure_fresh()
+        with self.assertNumQueries(0):
+            self.index.lookup('ja')
+
+    def test_signals_update_index_incrementally(self):
+        """Test committed saves and deletes are reflected without a rebuild"""
+        self.suggest('ja')
+        built_at = self.index.built_at
+        with self.captureOnCommitCallbacks(execute=True):
+            new = self.make('Jazz Brunch', days=2)
+            self.jazz_late.title = 'Blues Night'
+            self.jazz_late.save()
+        self.assertEqual(self.suggest('ja'), [new.id, self.jazz_soon.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            new.delete()
+        self.assertEqual(self.suggest('ja'), [self.jazz_soon.id])
+        self.assertEqual(self.suggest('blu'), [self.jazz_late.id])
+        self.assertEqual(self.index.built_at, built_at)
+
+    def test_ended_events_do_not_use_up_candidates(self):
+        """Test events that ended since the build are skipped before the candidate cap"""
+        from unittest import mock
+        jam = self.make('Jam Session', days=0)
+        self.index.build()
+        later = jam.end_time + timedelta(hours=1)
+        with mock.patch('event_management.suggest.MAX_CANDIDATES', 1):
+            results = [e['id'] for e in self.index.lookup('ja', now=later)]
+        self.assertTrue(results)
+        self.assertNotIn(jam.id, results)
+
+    def test_stale_rebuild_happens_once(self):
+        """Test a rebuild is skipped when another thread rebuilt after the staleness check"""
+        self.index.build()
+        seen = self.index.built_at
+        self.index.build()  # another thread got there first
+        with self.assertNumQueries(0):
+            self.index.build(expected_built_at=seen)
+
+
+class TicketCapacityTests(TestCase):
+    """Test ticket purchases respect event and venue capacity"""
+
+    def setUp(self):
+        self.venue = Venue.objects.create(name='Small Hall', address='Campus', capacity=2)
+        self.event = Event.objects.create(
+            title='Small Event', description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org', category='Workshop',
+            venue=self.venue, is_approved=True
+        )
+        self.students = [
+            User.objects.create_user(email=f'student{i}@example.com', password='testpass123',
+                                     name=f'Student {i}', role='student')
+            for i in range(3)
+        ]
+        self.client = APIClient()
+
+    def buy(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.post(f'/api/events/{self.event.id}/buy/')
+
+    def test_venue_capacity_limits_sales(self):
+        """Test the venue capacity applies when the event has none"""
+        self.assertEqual(self.buy(self.students[0]).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.buy(self.students[1]).status_code, status.HTTP_201_CREATED)
+        response = self.buy(self.students[2])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['detail'], 'Event is sold out.')
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 2)
+        self.assertEqual(EventStats.objects.get(event=self.event).tickets_issued, 2)
+        # Existing holders still get their ticket back
+        self.assertEqual(self.buy(self.students[0]).status_code, status.HTTP_200_OK)
+
+    def test_event_capacity_overrides_venue(self):
+        """Test the event's own capacity takes precedence"""
+        self.event.capacity = 1
+        self.event.save()
+        self.assertEqual(self.buy(self.students[0]).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.buy(self.students[1]).status_code, status.HTTP_409_CONFLICT)
+
+    def test_cancellation_frees_a_seat(self):
+        """Test cancelling a ticket lets another student buy"""
+        self.buy(self.students[0])
+        self.buy(self.students[1])
+        self.client.force_authenticate(user=self.students[0])
+        self.client.post(f'/api/events/{self.event.id}/cancel/')
+        self.assertEqual(self.buy(self.students[2]).status_code, status.HTTP_201_CREATED)
+
+    def test_overlapping_cancellations_free_one_seat(self):
+        """Test a cancel that loses the race to another cancel of the same ticket changes nothing"""
+        from unittest import mock
+        from event_management import views
+        from event_management.models import TicketTombstone
+        self.buy(self.students[0])
+        self.buy(self.students[1])
+        self.client.force_authenticate(user=self.students[0])
+        url = f'/api/events/{self.event.id}/cancel/'
+        codes = []
+
+        def overlapped(ticket):
+            # the other request deletes the ticket after this one has read it
+            with mock.patch('event_management.views.release_ticket', side_effect=real_release):
+                codes.append(self.client.post(url).status_code)
+            return real_release(ticket)
+
+        real_release = views.release_ticket
+        with mock.patch('event_management.views.release_ticket', side_effect=overlapped):
+            codes.append(self.client.post(url).status_code)
+
+        self.assertEqual(codes, [status.HTTP_200_OK, status.HTTP_404_NOT_FOUND])
+        self.assertEqual(EventStats.objects.get(event=self.event).tickets_issued, 1)
+        self.assertEqual(TicketTombstone.objects.filter(event_id=self.event.id).count(), 1)
+        self.assertEqual(self.buy(self.students[2]).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.buy(self.students[0]).status_code, status.HTTP_409_CONFLICT)
+
+    def test_only_lock_timeouts_are_retryable(self):
+        """Test a locked database answers 503 and other OperationalErrors are not masked"""
+        from unittest import mock
+        from django.db import OperationalError
+        with mock.patch('event_management.views.reserve_ticket', side_effect=OperationalError('database is locked')):
+            response = self.buy(self.students[0])
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+        with mock.patch('event_management.views.reserve_ticket',
+                        side_effect=OperationalError('no such column: event_management_ticket.status')):
+            with self.assertRaises(OperationalError):
+                self.buy(self.students[0])
+
+    def test_missing_stats_row_is_rebuilt(self):
+        """Test legacy events without stats still enforce capacity"""
+        self.buy(self.students[0])
+        self.buy(self.students[1])
+        EventStats.objects.filter(event=self.event).delete()
+        self.assertEqual(self.buy(self.students[2]).status_code, status.HTTP_409_CONFLICT)
+
+
+@override_settings(ADMISSION_QUEUE_ENABLED=False)
+class TicketConcurrencyTests(TransactionTestCase):
+    """Stress concurrent purchases against one event (database path, no admission queue)"""
+
+    BUYERS = 200
+    CAPACITY = 50
+
+    def test_parallel_purchases_never_oversell(self):
+        """Test hundreds of parallel purchases issue exactly `capacity` tickets"""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest import mock
+        from django.db import connection
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        event = Event.objects.create(
+            title='Popular Event', description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org', category='Concert',
+            capacity=self.CAPACITY, is_approved=True
+        )
+        User.objects.bulk_create([
+            User(email=f'buyer{i}@example.com', name=f'Buyer {i}', role='student', password='!')
+            for i in range(self.BUYERS)
+        ])
+        tokens = [str(RefreshToken.for_user(u).access_token)
+                  for u in User.objects.filter(email__startswith='buyer')]
+        start = threading.Barrier(16)
+
+        def buy(token):
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            try:
+                try:
+                    start.wait(timeout=5)
+                except threading.BrokenBarrierError:
+                    pass
+                for _ in range(100):
+                    response = client.post(f'/api/events/{event.id}/buy/')
+                    if response.status_code != status.HTTP_503_SERVICE_UNAVAILABLE:
+                        return response.status_code
+                    time.sleep(0.01)
+                return response.status_code
+            finally:
+                connection.close()
+
+        # QR rendering is irrelevant here and would outlive the test
+        with mock.patch('event_management.views.schedule_ticket_qr'):
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                codes = list(pool.map(buy, tokens))
+
+        self.assertEqual(codes.count(status.HTTP_201_CREATED), self.CAPACITY)
+        self.assertEqual(codes.count(status.HTTP_409_CONFLICT), self.BUYERS - self.CAPACITY)
+        self.assertEqual(Ticket.objects.filter(event=event).count(), self.CAPACITY)
+        self.assertEqual(EventStats.objects.get(event=event).tickets_issued, self.CAPACITY)
+
+
+class WaitlistTests(TestCase):
+    """Test the FIFO waitlist and promotion on cancellation"""
+
+    def setUp(self):
+        self.event = Event.objects.create(
+            title='Full Event', description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org', category='Workshop',
+            capacity=1, is_approved=True
+        )
+        self.holder, self.first, self.second = [
+            User.objects.create_user(email=f'{name}@example.com', password='testpass123',
+                                     name=name.title(), role='student')
+            for name in ('holder', 'first', 'second')
+        ]
+        self.client = APIClient()
+        self.url = f'/api/events/{self.event.id}/waitlist/'
+
+    def as_user(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client
+
+    def test_join_only_when_sold_out(self):
+        """Test joining is refused while tickets remain"""
+        response = self.as_user(self.first).post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.as_user(self.holder).post(f'/api/events/{self.event.id}/buy/')
+        response = self.as_user(self.holder).post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        response = self.as_user(self.first).post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['position'], 1)
+        # joining twice keeps the original place
+        self.assertEqual(self.as_user(self.first).post(self.url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.as_user(self.second).post(self.url).data['position'], 2)
+
+    def test_cancellation_promotes_head_in_order(self):
+        """Test a cancellation hands the seat to the first waiting user"""
+        self.as_user(self.holder).post(f'/api/events/{self.event.id}/buy/')
+        self.as_user(self.first).post(self.url)
+        self.as_user(self.second).post(self.url)
+
+        self.as_user(self.holder).post(f'/api/events/{self.event.id}/cancel/')
+        self.assertTrue(Ticket.objects.filter(event=self.event, owner=self.first).exists())
+        self.assertEqual(EventStats.objects.get(event=self.event).tickets_issued, 1)
+        response = self.as_user(self.first).get(self.url)
+        self.assertEqual(response.data['status'], 'promoted')
+        self.assertIsNotNone(response.data['ticket_id'])
+        self.assertEqual(self.as_user(self.second).get(self.url).data['position'], 1)
+
+    def test_overlapping_cancellations_promote_once(self):
+        """Test two overlapping cancels of one ticket promote a single waiting user"""
+        from unittest import mock
+        from event_management import views
+        self.as_user(self.holder).post(f'/api/events/{self.event.id}/buy/')
+        self.as_user(self.first).post(self.url)
+        self.as_user(self.second).post(self.url)
+        cancel_url = f'/api/events/{self.event.id}/cancel/'
+        real_release = views.release_ticket
+
+        def overlapped(ticket):
+            # the other request deletes the ticket after this one has read it
+            with mock.patch('event_management.views.release_ticket', side_effect=real_release):
+                self.as_user(self.holder).post(cancel_url)
+            return real_release(ticket)
+
+        with mock.patch('event_management.views.release_ticket', side_effect=overlapped):
+            response = self.as_user(self.holder).post(cancel_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(list(Ticket.objects.filter(event=self.event).values_list('owner', flat=True)),
+                         [self.first.id])
+        self.assertEqual(EventStats.objects.get(event=self.event).tickets_issued, 1)
+        self.assertEqual(self.as_user(self.second).get(self.url).data['status'], 'waiting')
+
+    def test_leave_and_promotion_skip_rules(self):
+        """Test leaving drops the entry and users who bought directly are skipped"""
+        from event_management.models import WaitlistEntry
+        self.as_user(self.holder).post(f'/api/events/{self.event.id}/buy/')
+        self.as_user(self.first).post(self.url)
+        self.as_user(self.second).post(self.url)
+        self.assertEqual(self.as_user(self.first).delete(self.url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.as_user(self.first).get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        # second somehow holds a ticket already (e.g. issued by an admin)
+        Ticket.objects.create(event=self.event, owner=self.second)
+        self.as_user(self.holder).post(f'/api/events/{self.event.id}/cancel/')
+        self.assertFalse(WaitlistEntry.objects.filter(event=self.event, status=WaitlistEntry.WAITING).exists())
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 1)
+
+    def test_process_waitlist_fills_seats_and_notifies_in_batches(self):
+        """Test the command promotes into new seats and emails each promoted user once"""
+        from io import StringIO
+        from django.core import mail
+        from django.core.management import call_command
+        self.as_user(self.holder).post(f'/api/events/{self.event.id}/buy/')
+        self.as_user(self.first).post(self.url)
+        self.as_user(self.second).post(self.url)
+        self.event.capacity = 3
+        self.event.save()
+        call_command('process_waitlist', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 3)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['first@example.com', 'second@example.com'])
+        call_command('process_waitlist', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+
+
+@override_settings(ADMISSION_HOT_THRESHOLD=100, ADMISSION_MAX_ACTIVE=1, ADMISSION_TOKEN_TTL=60)
+@override_settings(ADMISSION_QUEUE_ENABLED=True)
+class AdmissionQueueTests(TestCase):
+    """Test the admission queue in front of ticket purchases"""
+
+    def setUp(self):
+        from event_management import admission
+        admission.reset()
+        self.event = Event.objects.create(
+            title='Ticket Drop', description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org', category='Concert', is_approved=True
+        )
+        self.first, self.second = [
+            User.objects.create_user(email=f'{name}@example.com', password='testpass123',
+                                     name=name.title(), role='student')
+            for name in ('first', 'second')
+        ]
+        self.client = APIClient()
+
+    def tearDown(self):
+        from event_management import admission
+        admission.reset()
+
+    def as_user(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client
+
+    def buy(self, user, token=None):
+        headers = {'HTTP_X_ADMISSION_TOKEN': token} if token else {}
+        return self.as_user(user).post(f'/api/events/{self.event.id}/buy/', **headers)
+
+    def status(self, token):
+        return APIClient().get('/api/queue/status/', {'token': token}).data
+
+    def test_quiet_event_needs_no_token(self):
+        """Test purchases go straight through while the queue is off"""
+        self.assertEqual(self.buy(self.first).status_code, status.HTTP_201_CREATED)
+
+    def test_admission_order_and_gate(self):
+        """Test queued buyers are admitted one slot at a time, in order"""
+        first = self.as_user(self.first).post(f'/api/events/{self.event.id}/queue/').data
+        second = self.as_user(self.second).post(f'/api/events/{self.event.id}/queue/').data
+        self.assertEqual(first['status'], 'admitted')
+        self.assertEqual((second['status'], second['ahead']), ('waiting', 0))
+
+        # the queue is hot: no token, or a token that is not admitted yet, gets 429
+        self.assertEqual(self.buy(self.second).status_code, 429)
+        self.assertEqual(self.buy(self.second, second['token']).status_code, 429)
+        # a token only works for the user it was issued to
+        self.assertEqual(self.buy(self.second, first['token']).status_code, 429)
+
+        self.assertEqual(self.buy(self.first, first['token']).status_code, status.HTTP_201_CREATED)
+        # the finished purchase frees the slot for the next in line
+        self.assertEqual(self.status(second['token'])['status'], 'admitted')
+        self.assertEqual(self.status(first['token'])['status'], 'expired')
+        self.assertEqual(self.buy(self.second, second['token']).status_code, status.HTTP_201_CREATED)
+
+    @override_settings(ADMISSION_HOT_THRESHOLD=2)
+    def test_attempt_spike_switches_queue_on(self):
+        """Test a burst of purchase attempts turns the queue on"""
+        codes = [self.buy(self.first).status_code for _ in range(4)]
+        self.assertEqual(codes[:2], [status.HTTP_201_CREATED, status.HTTP_200_OK])
+        self.assertEqual(codes[3], 429)
+
+    def test_status_is_served_from_memory(self):
+        """Test status polling needs no database queries and rejects forged tokens"""
+        token = self.as_user(self.first).post(f'/api/events/{self.event.id}/queue/').data['token']
+        client = APIClient()
+        with self.assertNumQueries(0):
+            response = client.get('/api/queue/status/', {'token': token})
+        self.assertEqual(response.data['status'], 'admitted')
+        response = client.get('/api/queue/status/', {'token': token[:-2] + 'xx'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sold_out_is_answered_from_memory(self):
+        """Test queued buyers learn the event sold out without reaching the database"""
+        self.event.capacity = 1
+        self.event.save()
+        first = self.as_user(self.first).post(f'/api/events/{self.event.id}/queue/').data
+        second = self.as_user(self.second).post(f'/api/events/{self.event.id}/queue/').data
+        self.assertEqual(self.buy(self.first, first['token']).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.buy(self.second, second['token']).status_code, status.HTTP_409_CONFLICT)
+
+        self.assertEqual(self.status(second['token'])['status'], 'sold_out')
+        self.as_user(self.second)
+        # only the ticket-holder lookup, no purchase transaction
+        with self.assertNumQueries(1):
+            response = self.client.post(f'/api/events/{self.event.id}/buy/')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        # the buyer who got the last seat still gets their ticket back
+        response = self.buy(self.first)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['detail'], 'Ticket already exists.')
+
+        # a cancellation with nobody on the waitlist reopens sales
+        self.as_user(self.first).post(f'/api/events/{self.event.id}/cancel/')
+        again = self.as_user(self.second).post(f'/api/events/{self.event.id}/queue/').data
+        self.assertEqual(again['status'], 'admitted')
+        self.assertEqual(self.buy(self.second, again['token']).status_code, status.HTTP_201_CREATED)
+
+
+class BulkCheckinTests(TestCase):
+    """Test batched check-in for offline door scanners"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email='organizer@example.com', password='testpass123',
+            name='Test Organizer', role='organizer', status='active'
+        )
+        self.event, self.other_event = [
+            Event.objects.create(
+                title=title, description='Test',
+                start_time=timezone.now() + timedelta(days=1),
+                end_time=timezone.now() + timedelta(days=1, hours=2),
+                organization='Test Org', category='Workshop',
+                organizer=self.organizer, is_approved=True
+            )
+            for title in ('Door Event', 'Other Event')
+        ]
+        self.students = [
+            User.objects.create_user(email=f'student{i}@example.com', password='testpass123',
+                                     name=f'Student {i}', role='student')
+            for i in range(3)
+        ]
+        self.fresh, self.used = [Ticket.objects.create(event=self.event, owner=s) for s in self.students[:2]]
+        self.used.is_used = True
+        self.used.checked_in_at = timezone.now() - timedelta(hours=1)
+        self.used.save()
+        self.foreign = Ticket.objects.create(event=self.other_event, owner=self.students[2])
+        self.url = f'/api/events/{self.event.id}/checkin/bulk/'
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.organizer)
+
+    def test_per_ticket_results_with_one_update(self):
+        """Test each scan gets its own result and valid tickets are marked with a single UPDATE"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        scanned_at = timezone.now() - timedelta(minutes=5)
+        scans = [
+            {'ticket_id': str(self.fresh.id), 'scanned_at': scanned_at.isoformat()},
+            str(self.used.id),
+            {'ticket_id': '00000000-0000-0000-0000-000000000000'},
+            {'ticket_id': str(self.foreign.id)},
+            {'ticket_id': 'not-a-uuid'},
+            str(self.fresh.id),
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {'scans': scans}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r['result'] for r in response.data['results']],
+            ['ok', 'already-used', 'unknown', 'wrong-event', 'unknown', 'already-used'],
+        )
+        self.assertEqual(response.data['checked_in'], 1)
+        ticket_updates = [q for q in ctx.captured_queries
+                          if q['sql'].startswith('UPDATE') and 'event_management_ticket' in q['sql']]
+        self.assertEqual(len(ticket_updates), 1)
+
+        self.fresh.refresh_from_db()
+        self.assertTrue(self.fresh.is_used)
+        self.assertEqual(self.fresh.checked_in_at, scanned_at)
+        self.assertEqual(EventStats.objects.get(event=self.event).tickets_checked_in, 1)
+
+    def test_replaying_a_batch_is_harmless(self):
+        """Test a scanner resending the same batch does not double count"""
+        scans = [str(self.fresh.id)]
+        self.client.post(self.url, {'scans': scans}, format='json')
+        response = self.client.post(self.url, {'scans': scans}, format='json')
+        self.assertEqual(response.data['results'][0]['result'], 'already-used')
+        self.assertEqual(EventStats.objects.get(event=self.event).tickets_checked_in, 1)
+
+    def test_permissions_and_validation(self):
+        """Test only organizers/admins may sync scans and the batch is validated"""
+        student = APIClient()
+        student.force_authenticate(user=self.students[0])
+        response = student.post(self.url, {'scans': [str(self.fresh.id)]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.assertEqual(self.client.post(self.url, {'scans': []}, format='json').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        with override_settings(BULK_CHECKIN_MAX_SCANS=1):
+            response = self.client.post(self.url, {'scans': ['a', 'b']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CheckinManifestTests(TestCase):
+    """Test the signed check-in manifest for offline scanners"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email='organizer@example.com', password='testpass123',
+            name='Test Organizer', role='organizer', status='active'
+        )
+        self.event = Event.objects.create(
+            title='Door Event', description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org', category='Workshop',
+            organizer=self.organizer, is_approved=True
+        )
+        self.tickets = [
+            Ticket.objects.create(
+                event=self.event, is_used=(i == 0),
+                owner=User.objects.create_user(email=f'student{i}@example.com', password='testpass123',
+                                               name=f'Student {i}', role='student'),
+            )
+            for i in range(5)
+        ]
+        self.url = f'/api/events/{self.event.id}/checkin/manifest/'
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.organizer)
+
+    @staticmethod
+    def decode_sorted(data):
+        import base64
+        raw, used = base64.b64decode(data['ids']), base64.b64decode(data['used'])
+        ids = [raw[i:i + 16] for i in range(0, len(raw), 16)]
+        return {ticket_id: bool(used[i >> 3] & (1 << (i & 7))) for i, ticket_id in enumerate(ids)}
+
+    def test_sorted_manifest(self):
+        """Test the sorted encoding lists every ticket in byte order with its used bit"""
+        data = self.client.get(self.url).data
+        self.assertEqual((data['mode'], data['encoding'], data['count']), ('full', 'sorted', 5))
+        decoded = self.decode_sorted(data)
+        self.assertEqual(list(decoded), sorted(t.id.bytes for t in self.tickets))
+        self.assertEqual(decoded, {t.id.bytes: t.is_used for t in self.tickets})
+        self.assertEqual(len(data['signature']), 64)
+
+    def test_scanner_key_verifies_manifests_offline(self):
+        """Test the key from a full pull checks later manifests and exposes tampering"""
+        import hashlib
+        import hmac
+
+        def verify(key, data, *bodies):
+            message = '\n'.join([str(data['event']), data['mode'], data['cursor'], data['digest'],
+                                  *(data[name] for name in bodies)])
+            expected = hmac.new(bytes.fromhex(key), message.encode(), hashlib.sha256).hexdigest()
+            return hmac.compare_digest(expected, data['signature'])
+
+        full = self.client.get(self.url).data
+        key = full['scanner_key']
+        self.assertTrue(verify(key, full, 'ids', 'used'))
+        bloom = self.client.get(self.url, {'encoding': 'bloom'}).data
+        self.assertEqual(bloom['scanner_key'], key)
+        bloom_parts = dict(bloom, m=str(bloom['bloom']['m']), k=str(bloom['bloom']['k']), bits=bloom['bloom']['bits'])
+        self.assertTrue(verify(key, bloom_parts, 'm', 'k', 'bits', 'used'))
+        delta = self.client.get(self.url, {'since': full['cursor']}).data
+        self.assertNotIn('scanner_key', delta)
+        self.assertTrue(verify(key, delta, 'ids', 'used', 'removed'))
+        # a relayed manifest with a ticket slipped in no longer verifies
+        self.assertFalse(verify(key, dict(full, used='/w=='), 'ids', 'used'))
+        # another event's key does not open this one
+        other = Event.objects.create(title='Other', description='', start_time=self.event.start_time,
+                                     end_time=self.event.end_time, organization='Org', category='Talk',
+                                     organizer=self.organizer, is_approved=True)
+        other_key = self.client.get(f'/api/events/{other.id}/checkin/manifest/').data['scanner_key']
+        self.assertFalse(verify(other_key, full, 'ids', 'used'))
+
+    def test_bloom_manifest(self):
+        """Test the Bloom encoding matches every ticket and lists used tickets separately"""
+        import base64
+        from event_management.manifest import bloom_positions
+        data = self.client.get(self.url, {'encoding': 'bloom'}).data
+        bloom = data['bloom']
+        bits = base64.b64decode(bloom['bits'])
+        for ticket in self.tickets:
+            self.assertTrue(all(bits[p >> 3] & (1 << (p & 7))
+                                for p in bloom_positions(ticket.id.bytes, bloom['m'], bloom['k'])))
+        self.assertEqual(base64.b64decode(data['used']), self.tickets[0].id.bytes)
+
+    def test_since_returns_only_changes(self):
+        """Test a ?since= pull carries only tickets issued or checked in after the cursor"""
+        Ticket.objects.filter(event=self.event).update(updated_at=timezone.now() - timedelta(minutes=5))
+        cursor = self.client.get(self.url).data['cursor']
+
+        checked = self.tickets[1]
+        self.client.post(f'/api/events/{self.event.id}/checkin/bulk/', {'scans': [str(checked.id)]}, format='json')
+        new = Ticket.objects.create(event=self.event, owner=self.organizer)
+
+        data = self.client.get(self.url, {'since': cursor}).data
+        self.assertEqual((data['mode'], data['changed'], data['count']), ('delta', 2, 6))
+        self.assertEqual(self.decode_sorted(data), {checked.id.bytes: True, new.id.bytes: False})
+
+    def test_delta_lists_cancellation_replaced_from_waitlist(self):
+        """Test a cancelled ticket shows up in ?since= even when a waitlist promotion keeps the count"""
+        import base64
+        import hashlib
+        from event_management.stats import rebuild_stats_for_event
+        self.event.capacity = 5
+        self.event.save()
+        rebuild_stats_for_event(self.event.id)
+        Ticket.objects.filter(event=self.event).update(updated_at=timezone.now() - timedelta(minutes=5))
+        full = self.client.get(self.url).data
+        held = set(self.decode_sorted(full))
+
+        waiting = User.objects.create_user(email='waiting@example.com', password='testpass123',
+                                           name='Waiting', role='student')
+        joined = APIClient()
+        joined.force_authenticate(user=waiting)
+        self.assertEqual(joined.post(f'/api/events/{self.event.id}/waitlist/').status_code, status.HTTP_201_CREATED)
+        cancelled = self.tickets[2]
+        owner = APIClient()
+        owner.force_authenticate(user=cancelled.owner)
+        self.assertEqual(owner.post(f'/api/events/{self.event.id}/cancel/').status_code, status.HTTP_200_OK)
+        promoted = Ticket.objects.get(event=self.event, owner=waiting)
+
+        data = self.client.get(self.url, {'since': full['cursor']}).data
+        self.assertEqual(data['count'], full['count'])
+        self.assertEqual(base64.b64decode(data['removed']), cancelled.id.bytes)
+        self.assertEqual(self.decode_sorted(data), {promoted.id.bytes: False})
+        # merging the delta reproduces the server's id set
+        merged = (held - {cancelled.id.bytes}) | set(self.decode_sorted(data))
+        self.assertEqual(hashlib.sha256(b''.join(sorted(merged))).hexdigest(), data['digest'])
+        self.assertNotEqual(data['digest'], full['digest'])
+
+    def test_rejects_bad_requests(self):
+        """Test forged or foreign cursors, unknown encodings and non-organizers are refused"""
+        other = Event.objects.create(
+            title='Other', description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org', category='Workshop', organizer=self.organizer, is_approved=True
+        )
+        foreign = self.client.get(f'/api/events/{other.id}/checkin/manifest/').data['cursor']
+        self.assertEqual(self.client.get(self.url, {'since': foreign}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'since': 'forged'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'encoding': 'zip'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        student = APIClient()
+        student.force_authenticate(user=self.tickets[0].owner)
+        self.assertEqual(student.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class SignedQRCodeTests(TestCase):
+    """Test signed QR codes are verified before the database is touched"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email='organizer@example.com', password='testpass123',
+            name='Test Organizer', role='organizer', status='active'
+        )
+        self.student = User.objects.create_user(
+            email='student@example.com', password='testpass123', name='Test Student', role='student'
+        )
+        self.event = Event.objects.create(
+            title='Door Event', description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org', category='Workshop',
+            organizer=self.organizer, is_approved=True
+        )
+        self.ticket = Ticket.objects.create(event=self.event, owner=self.student)
+        self.url = f'/api/events/{self.event.id}/checkin/scan/'
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.organizer)
+
+    def scan(self, code):
+        return self.client.post(self.url, {'code': code}, format='json')
+
+    def test_signed_code_checks_in_once(self):
+        """Test a genuine code checks the ticket in and a second scan is refused"""
+        from event_management.qr import ticket_qr_payload
+        code = ticket_qr_payload(self.ticket)
+        self.assertTrue(code.startswith('TK1:'))
+        response = self.scan(code)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['result'], 'ok')
+        self.ticket.refresh_from_db()
+        self.assertTrue(self.ticket.is_used)
+        self.assertEqual(self.scan(code).status_code, status.HTTP_409_CONFLICT)
+
+    def test_forged_and_wrong_event_codes_skip_the_database(self):
+        """Test tampered codes and codes for another event are rejected without queries"""
+        from event_management.qr import ticket_token
+        genuine = ticket_token(self.event.id, self.ticket.id, self.ticket.created_at)
+        forged = genuine[:-1] + ('A' if genuine[-1] != 'A' else 'B')
+        elsewhere = ticket_token(self.event.id + 1, self.ticket.id, self.ticket.created_at)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.scan(forged).status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(self.scan('garbage').status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(self.scan(elsewhere).status_code, status.HTTP_409_CONFLICT)
+
+    def test_legacy_codes_still_work(self):
+        """Test bare ticket ids and event:owner:id codes are still accepted"""
+        other = Ticket.objects.create(
+            event=self.event,
+            owner=User.objects.create_user(email='other@example.com', password='testpass123',
+                                           name='Other', role='student'),
+        )
+        self.assertEqual(self.scan(str(self.ticket.id)).status_code, status.HTTP_200_OK)
+        legacy = f'{self.event.id}:{other.owner_id}:{other.id}'
+        self.assertEqual(self.scan(legacy).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.scan(str(uuid.uuid4())).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_checkin_accepts_scanned_codes(self):
+        """Test bulk sync takes QR text and settles wrong-event codes before the lookup"""
+        from event_management.qr import ticket_qr_payload, ticket_token
+        elsewhere = ticket_token(self.event.id + 1, self.ticket.id, self.ticket.created_at)
+        response = self.client.post(f'/api/events/{self.event.id}/checkin/bulk/',
+                                    {'scans': [ticket_qr_payload(self.ticket), elsewhere]}, format='json')
+        self.assertEqual([r['result'] for r in response.data['results']], ['ok', 'wrong-event'])
+
+    def test_large_event_ids_and_version_1_tokens(self):
+        """Test 64-bit event ids round-trip and 32-bit (version 1) tokens still verify"""
+        import base64
+        from event_management.qr import TOKEN_PREFIX, _TOKEN_BODIES, _mac, parse_ticket_code, ticket_token
+        code = parse_ticket_code(ticket_token(2 ** 40, self.ticket.id, self.ticket.created_at))
+        self.assertEqual((code.event_id, code.ticket_id, code.signed), (2 ** 40, self.ticket.id, True))
+
+        body = _TOKEN_BODIES[1].pack(1, self.event.id, self.ticket.id.bytes, int(self.ticket.created_at.timestamp()))
+        legacy = TOKEN_PREFIX + base64.b32encode(body + _mac(body)).decode('ascii').rstrip('=')
+        self.assertEqual(self.scan(legacy).status_code, status.HTTP_200_OK)
+
+    def test_attendee_list_returns_signed_codes(self):
+        """Test the attendee list hands out the same signed code as the ticket"""
+        from event_management.qr import ticket_qr_payload
+        response = self.client.get(f'/api/events/{self.event.id}/attendees/')
+        self.assertEqual(response.data['attendees'][0]['qr_code'], ticket_qr_payload(self.ticket))
+
+
+class TicketCheckinTests(TestCase):
+    """Test single check-in is one conditional UPDATE that records the check-in time"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email='organizer@example.com', password='testpass123',
+            name='Test Organizer', role='organizer', status='active'
+        )
+        self.student = User.objects.create_user(
+            email='student@example.com', password='testpass123', name='Test Student', role='student'
+        )
+        self.event = Event.objects.create(
+            title='Door Event', description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org', category='Workshop',
+            organizer=self.organizer, is_approved=True
+        )
+        self.ticket = Ticket.objects.create(event=self.event, owner=self.student,
+                                            created_at=timezone.now() - timedelta(days=3))
+        # /api/tickets/ is guarded by RoleAuthorizationMiddleware, which needs a real JWT
+        from rest_framework_simplejwt.tokens import RefreshToken
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.organizer).access_token}')
+
+    def test_checkin_updates_only_checkin_columns(self):
+        """Test the check-in UPDATE leaves other columns (like the QR path) alone and runs once"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = f'/api/tickets/{self.ticket.id}/checkin/'
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updates = [q['sql'] for q in ctx.captured_queries
+                   if q['sql'].startswith('UPDATE') and 'event_management_ticket' in q['sql']]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"qr"', updates[0])
+
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(EventStats.objects.get(event=self.event).tickets_checked_in, 1)
+
+    def test_attendees_report_real_checkin_time(self):
+        """Test attendees and exports report checked_in_at rather than the purchase time"""
+        from event_management.exports import attendee_rows
+        self.client.post(f'/api/tickets/{self.ticket.id}/checkin/')
+        self.ticket.refresh_from_db()
+        self.assertGreater(self.ticket.checked_in_at, self.ticket.created_at + timedelta(days=2))
+
+        data = self.client.get(f'/api/events/{self.event.id}/attendees/').data
+        self.assertEqual(data['attendees'][0]['check_in_time'], self.ticket.checked_in_at)
+        self.assertEqual(list(attendee_rows(self.event))[0][4], self.ticket.checked_in_at)
+
+
+class EventConditionalGetTests(TestCase):
+    """Test ETag revalidation on event listings and details"""
+
+    def setUp(self):
+        self.event = Event.objects.create(
+            title='Polled Event', description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org', category='Workshop', is_approved=True
+        )
+        self.client = APIClient()
+
+    def test_list_revalidates_with_one_query(self):
+        """Test an unchanged list answers 304 after a single aggregate query"""
+        response = self.client.get('/api/events/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with self.assertNumQueries(1):
+            cached = self.client.get('/api/events/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached.content, b'')
+
+        # other query strings are other representations
+        self.assertEqual(self.client.get('/api/events/?page_size=5', HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_200_OK)
+
+    def test_changes_invalidate_the_etag(self):
+        """Test edits, ticket counters and new events all change the validators"""
+        etag = self.client.get('/api/events/')['ETag']
+        self.event.title = 'Renamed'
+        self.event.save()
+        fresh = self.client.get('/api/events/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, status.HTTP_200_OK)
+
+        etag = fresh['ETag']
+        from event_management.stats import record_ticket_issued
+        record_ticket_issued(self.event.id)
+        fresh = self.client.get('/api/events/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, status.HTTP_200_OK)
+
+        etag = fresh['ETag']
+        Event.objects.filter(pk=self.event.pk).delete()
+        self.assertEqual(self.client.get('/api/events/', HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_200_OK)
+
+    def test_detail_revalidates(self):
+        """Test event details carry an ETag and answer 304 while unchanged"""
+        url = f'/api/events/{self.event.id}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        other = self.client.get(f'/api/events/{self.event.id + 100}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(other.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class MyTicketsRepresentationTests(TestCase):
+    """Test the slim ticket list and ?fields= sparse fieldsets"""
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email='student@example.com', password='testpass123', name='Test Student', role='student'
+        )
+        self.venue = Venue.objects.create(name='Main Hall', address='1 Campus Way', capacity=100)
+        self.events = [
+            Event.objects.create(
+                title=f'Event {i}', description='Test',
+                start_time=timezone.now() + timedelta(days=i + 1),
+                end_time=timezone.now() + timedelta(days=i + 1, hours=2),
+                organization='Test Org', category='Workshop', venue=self.venue, is_approved=True
+            )
+            for i in range(4)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.student)
+
+    def buy(self, events):
+        for event in events:
+            Ticket.objects.create(event=event, owner=self.student)
+
+    def test_query_count_does_not_grow_with_tickets(self):
+        """Test full and slim lists both load every ticket in a single query"""
+        self.buy(self.events[:1])
+        for params in ({}, {'view': 'slim'}, {'view': 'slim', 'fields': 'id,event_tickets_issued'}):
+            with self.assertNumQueries(1):
+                self.client.get('/api/me/tickets/', params)
+        self.buy(self.events[1:])
+        for params in ({}, {'view': 'slim'}, {'view': 'slim', 'fields': 'id,event_tickets_issued'}):
+            with self.assertNumQueries(1):
+                response = self.client.get('/api/me/tickets/', params)
+            self.assertEqual(len(response.data), 4)
+
+    def test_slim_tickets_are_flat_and_counts_are_opt_in(self):
+        """Test the slim view flattens event fields and leaves counters out unless requested"""
+        self.buy(self.events[:1])
+        ticket = self.client.get('/api/me/tickets/', {'view': 'slim'}).data[0]
+        self.assertEqual(ticket['event'], self.events[0].id)
+        self.assertEqual((ticket['event_title'], ticket['event_venue_name']), ('Event 0', 'Main Hall'))
+        self.assertTrue(ticket['qr_code'].startswith('TK1:'))
+        self.assertNotIn('event_tickets_issued', ticket)
+
+        ticket = self.client.get('/api/me/tickets/', {'view': 'slim', 'fields': 'id,event_tickets_issued'}).data[0]
+        self.assertEqual(set(ticket), {'id', 'event_tickets_issued'})
+        self.assertEqual(ticket['event_tickets_issued'], 0)
+
+    def test_fields_reach_into_nested_serializers(self):
+        """Test dotted ?fields= names trim nested event serializers and event lists"""
+        self.buy(self.events[:1])
+        ticket = self.client.get('/api/me/tickets/', {'fields': 'id,event.title'}).data[0]
+        self.assertEqual(ticket, {'id': ticket['id'], 'event': {'title': 'Event 0'}})
+
+        events = self.client.get('/api/events/', {'fields': 'id,title'}).data
+        self.assertEqual(set(events[0]), {'id', 'title'})
+
+
+class SparseFieldsetTests(TestCase):
+    """Test ?fields= / ?omit= / ?expand= and the narrowed querysets behind them"""
+
+    def setUp(self):
+        self.venue = Venue.objects.create(name='Main Hall', address='1 Campus Way', capacity=100)
+        self.event = Event.objects.create(
+            title='Sparse Event', description='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            organization='Test Org', category='Workshop', venue=self.venue, is_approved=True
+        )
+        self.client = APIClient()
+
+    def get_events(self, **params):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/events/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # the aggregate for the ETag, then the page itself
+        self.assertEqual(len(ctx.captured_queries), 2)
+        return response.data[0], ctx.captured_queries[-1]['sql']
+
+    def test_fields_skip_columns_and_method_fields(self):
+        """Test ?fields= selects only the needed columns and never runs skipped getters"""
+        from unittest import mock
+        from event_management.serializers import EventSerializer
+        with mock.patch.object(EventSerializer, 'get_google_calendar_url') as calendar:
+            data, sql = self.get_events(fields='id,title,start_time')
+        calendar.assert_not_called()
+        self.assertEqual(set(data), {'id', 'title', 'start_time'})
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('event_management_venue', sql)
+
+    def test_omit_and_computed_sources(self):
+        """Test ?omit= drops fields and computed fields still load what they read"""
+        data, sql = self.get_events(omit='description,google_calendar_url')
+        self.assertNotIn('description', data)
+        self.assertNotIn('google_calendar_url', data)
+        self.assertEqual(data['venue_name'], 'Main Hall')
+
+        data, _sql = self.get_events(fields='title,tickets_issued,venue_name')
+        self.assertEqual((data['tickets_issued'], data['venue_name']), (0, 'Main Hall'))
+
+    def test_expand_nests_and_trims_relations(self):
+        """Test ?expand=venue nests the venue, and dotted names trim it"""
+        data, _sql = self.get_events(expand='venue')
+        self.assertEqual(data['venue']['name'], 'Main Hall')
+        data, _sql = self.get_events(fields='title,venue.name', expand='venue')
+        self.assertEqual(data, {'title': 'Sparse Event', 'venue': {'name': 'Main Hall'}})
+
+    def test_simple_serializers_and_writes(self):
+        """Test venues and categories honour ?fields= and writes ignore it"""
+        response = self.client.get('/api/venues/', {'fields': 'name'})
+        self.assertEqual(response.data, [{'name': 'Main Hall'}])
+        Category.objects.create(name='Talks')
+        self.assertEqual(self.client.get('/api/categories/', {'omit': 'id'}).data, [{'name': 'Talks'}])
+
+        admin = User.objects.create_user(email='admin@example.com', password='testpass123',
+                                         name='Admin', role='admin')
+        self.client.force_authenticate(user=admin)
+        response = self.client.post('/api/venues/?fields=name',
+                                    {'name': 'Annex', 'address': '2 Campus Way', 'capacity': 20}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn('capacity', response.data)
+
+    def test_ticket_owner_expands_to_user(self):
+        """Test ?expand=owner on /api/me/tickets/ nests the owner through UserSerializer"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+        student = User.objects.create_user(email='sparse@example.com', password='testpass123',
+                                           name='Sparse Student', role='student')
+        Ticket.objects.create(event=self.event, owner=student)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(student).access_token}')
+        response = self.client.get('/api/me/tickets/', {'fields': 'id,owner.email', 'expand': 'owner'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['owner'], {'email': 'sparse@example.com'})
+
+
+class EventFastPathTests(TestCase):
+    """Test the values_list() fast path renders exactly what the serializers do"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.organizer = User.objects.create_user(email='fast-org@example.com', password='testpass123',
+                                                  name='Fast Organizer', role='organizer')
+        self.student = User.objects.create_user(email='fast-student@example.com', password='testpass123',
+                                                name='Fast Student', role='student')
+        venue = Venue.objects.create(name='Hall & Annex', address='1 Campus Way', capacity=100)
+        start = timezone.now() + timedelta(days=1)
+        self.events = [
+            Event.objects.create(title='Full event?', description='Bring a laptop / charger',
+                                 start_time=start, end_time=start + timedelta(hours=2),
+                                 organization='Org', category='Workshop', venue=venue,
+                                 organizer=self.organizer, capacity=50, image_url=' https://example.com/a.png '),
+            Event.objects.create(title='Bare event', description='', start_time=start + timedelta(hours=1),
+                                 end_time=start + timedelta(hours=3), organization='Org', category='Talk'),
+        ]
+        # one event counted without an EventStats row
+        EventStats.objects.filter(event=self.events[1]).delete()
+        for event in self.events:
+            Ticket.objects.create(event=event, owner=self.student)
+        used = Ticket.objects.create(event=self.events[0], owner=self.student, is_used=True)
+        Ticket.objects.filter(pk=used.pk).update(qr='qr_codes/used.png')
+
+    def assertSameAsSerializer(self, url, **params):
+        fast = self.client.get(url, params)
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            slow = self.client.get(url, params)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, slow.content)
+        return fast.json()
+
+    def test_event_list_matches_serializer(self):
+        """Test /api/events/ renders the same bytes with and without the fast path"""
+        data = self.assertSameAsSerializer('/api/events/')
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[1]['tickets_issued'], 1)
+        data = self.assertSameAsSerializer('/api/events/', page_size=1)
+        self.assertIsNotNone(data['next'])
+        from urllib.parse import parse_qs, urlsplit
+        cursor = parse_qs(urlsplit(data['next']).query)['cursor'][0]
+        data = self.assertSameAsSerializer('/api/events/', page_size=1, cursor=cursor)
+        self.assertEqual(data['results'][0]['title'], 'Bare event')
+
+    def test_my_tickets_match_serializer(self):
+        """Test /api/me/tickets/ renders the same bytes with and without the fast path"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.student).access_token}')
+        data = self.assertSameAsSerializer('/api/me/tickets/')
+        self.assertEqual(len(data), 3)
+        self.assertTrue(any(t['qr_png_url'] for t in data))
+
+    def test_fast_list_is_one_query(self):
+        """Test the fast list reads all events in one query when stats rows exist"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        EventStats.objects.get_or_create(event=self.events[1])
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/events/')
+        # the ETag aggregate, then the rows
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+    def test_missing_stats_rows_are_counted_once_per_page(self):
+        """Test events without stats rows cost one grouped count per page, not two queries each"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        EventStats.objects.all().delete()
+        data = self.assertSameAsSerializer('/api/events/')
+        self.assertEqual([e['tickets_issued'] for e in data], [2, 1])
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/events/')
+        # the ETag aggregate, the rows, then one COUNT ... GROUP BY event
+        self.assertEqual(len(ctx.captured_queries), 3)
+
+    def test_unknown_computed_field_falls_back_to_serializer(self):
+        """Test a method field the fast path cannot render switches it off instead of drifting"""
+        from unittest import mock
+        from rest_framework import serializers
+        from event_management import fastpath
+        from event_management.serializers import EventSerializer
+
+        class ExtendedEventSerializer(EventSerializer):
+            badge = serializers.SerializerMethodField()
+
+            class Meta(EventSerializer.Meta):
+                fields = EventSerializer.Meta.fields + ["badge"]
+
+            def get_badge(self, obj):
+                return "new"
+
+        converter = fastpath.RowConverter(ExtendedEventSerializer)
+        self.assertFalse(converter.available)
+        with mock.patch.object(fastpath, 'EVENT_ROWS', converter):
+            self.assertEqual(self.client.get('/api/events/').status_code, status.HTTP_200_OK)
+
+
+class CalendarFeedTests(TestCase):
+    """Test the streamed .ics feeds and their conditional GETs"""
+
+    def setUp(self):
+        from event_management.models import CalendarEntry
+        self.client = APIClient()
+        self.organizer = User.objects.create_user(email='ics-org@example.com', password='testpass123',
+                                                  name='ICS Organizer', role='organizer')
+        self.student = User.objects.create_user(email='ics-student@example.com', password='testpass123',
+                                                name='ICS Student', role='student')
+        venue = Venue.objects.create(name='Hall; East, Wing', address='1 Campus Way', capacity=100)
+        start = timezone.now() + timedelta(days=1)
+
+        def make(title, **kwargs):
+            return Event.objects.create(title=title, description='Line one\nLine two',
+                                        start_time=start, end_time=start + timedelta(hours=2),
+                                        organization='Org', category='Workshop',
+                                        organizer=self.organizer, **kwargs)
+        self.ticketed = make('Ticketed, event', venue=venue)
+        self.saved = make('Saved event ' + 'x' * 80)
+        self.pending = make('Pending event', is_approved=False)
+        Ticket.objects.create(event=self.ticketed, owner=self.student)
+        CalendarEntry.objects.create(user=self.student, event=self.ticketed)
+        CalendarEntry.objects.create(user=self.student, event=self.saved)
+
+    def feed_url(self):
+        from rest_framework_simplejwt.tokens import RefreshToken
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.student).access_token}')
+        url = self.client.get('/api/users/me/').data['calendar_url']
+        self.client.credentials()
+        return url
+
+    def get_ics(self, url, **headers):
+        response = self.client.get(url, **headers)
+        body = b''.join(response.streaming_content).decode('utf-8') if response.status_code == 200 else ''
+        return response, body
+
+    def test_personal_feed_with_key(self):
+        """Test the keyed feed lists ticketed and saved events once each, escaped and folded"""
+        response, body = self.get_ics(self.feed_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/calendar'))
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 2)
+        self.assertIn('SUMMARY:Ticketed\\, event\r\n', body)
+        self.assertIn('LOCATION:Hall\\; East\\, Wing\r\n', body)
+        self.assertIn('DESCRIPTION:Line one\\nLine two\r\n', body)
+        self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in body.split('\r\n')))
+        self.assertIn('\r\n x', body)
+
+    def test_personal_feed_auth(self):
+        """Test the personal feed needs a JWT or a valid key"""
+        self.assertEqual(self.client.get('/api/users/me/calendar.ics').status_code, status.HTTP_401_UNAUTHORIZED)
+        url = self.feed_url()
+        self.assertEqual(self.client.get(url + 'x').status_code, status.HTTP_403_FORBIDDEN)
+        # changing the password revokes the key
+        self.student.set_password('newpass123')
+        self.student.save()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_conditional_get(self):
+        """Test ETag / Last-Modified revalidation answers 304 until a feed event changes"""
+        url = self.feed_url()
+        response, _body = self.get_ics(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        self.saved.title = 'Renamed'
+        self.saved.save()
+        response, body = self.get_ics(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('SUMMARY:Renamed', body)
+
+    def test_organizer_feed_is_public(self):
+        """Test the organizer feed lists approved events without authentication"""
+        url = f'/api/organizers/{self.organizer.id}/calendar.ics'
+        response, body = self.get_ics(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(body.count('BEGIN:VEVENT'), 2)
+        self.assertNotIn('Pending event', body)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(f'/api/organizers/{self.student.id}/calendar.ics').status_code,
+                         status.HTTP_404_NOT_FOUND)
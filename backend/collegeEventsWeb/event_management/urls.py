@@ -10,7 +10,16 @@ from .views import (
     buy_ticket,
     get_ticket_for_event,
     cancel_ticket,
+    event_waitlist,
+    join_admission_queue,
+    admission_queue_status,
     checkin_ticket,
+    bulk_checkin,
+    checkin_manifest,
+    scan_checkin,
+    ticket_qr_png,
+    my_calendar_feed,
+    organizer_calendar_feed,
     MyTicketsList,
 )
 from .analytics_views import global_analytics  # from main
@@ -36,9 +45,29 @@ urlpatterns = [
     path('events/<int:event_id>/ticket/', get_ticket_for_event, name='get_ticket_for_event'),
     path('events/<int:event_id>/cancel/', cancel_ticket, name='cancel_ticket'),
 
+    # Admission queue for high-demand drops (join, then poll status until admitted)
+    path('events/<int:event_id>/queue/', join_admission_queue, name='join_admission_queue'),
+    path('queue/status/', admission_queue_status, name='admission_queue_status'),
+
+    # Waitlist for sold-out events (join / status / leave)
+    path('events/<int:event_id>/waitlist/', event_waitlist, name='event_waitlist'),
+
     # Ticket check-in by ticket id (used by QR scanner tools)
     path('tickets/<uuid:ticket_id>/checkin/', checkin_ticket, name='checkin_ticket'),
 
+    # Door scanners: one scanned QR code, or a batch of scans made offline
+    path('events/<int:event_id>/checkin/scan/', scan_checkin, name='scan_checkin'),
+    path('events/<int:event_id>/checkin/bulk/', bulk_checkin, name='bulk_checkin'),
+    # Signed ticket manifest (full or ?since= delta) for scanners validating offline
+    path('events/<int:event_id>/checkin/manifest/', checkin_manifest, name='checkin_manifest'),
+
+    # Ticket QR image, rendered on demand when the stored PNG is missing
+    path('tickets/<uuid:ticket_id>/qr.png', ticket_qr_png, name='ticket_qr_png'),
+
     # My tickets (class-based)
     path('me/tickets/', MyTicketsList.as_view(), name='my_tickets'),
+
+    # Subscribable iCalendar feeds (ETag / Last-Modified, 304 when unchanged)
+    path('users/me/calendar.ics', my_calendar_feed, name='my_calendar_feed'),
+    path('organizers/<int:organizer_id>/calendar.ics', organizer_calendar_feed, name='organizer_calendar_feed'),
 ]
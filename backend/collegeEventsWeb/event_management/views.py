@@ -1,29 +1,41 @@
 # backend/event_management/views.py
-import csv
-import qrcode
-import os
-from io import BytesIO
-
 from django.core.exceptions import FieldDoesNotExist
-from django.core.files.base import ContentFile
 from django.conf import settings
-from django.http import HttpResponse
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
 from django.shortcuts import get_object_or_404
-from django.utils.timezone import now
+from django.utils.timezone import now, get_current_timezone, make_aware
 import datetime
 
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from user_accounts.authentication import CachedJWTAuthentication
 from rest_framework.exceptions import PermissionDenied
 
-from .models import Event, Category, Venue, Ticket
-from django.db import IntegrityError
+from .models import Event, EventStats, Category, Venue, Ticket, WaitlistEntry
+from . import admission, fastpath, ical, manifest, waitlist
+from .checkin import ALREADY_USED, OK, UNKNOWN, bulk_check_in, check_in_ticket
+from .conditional import events_etag, not_modified
+from .exports import CONTENT_TYPES, STREAMERS, attendee_rows, gzip_stream
+from .pagination import AttendeePagination, EventCursorPagination, EventSearchPagination
+from .search import filter_events, query_tokens, rank_events
+from .suggest import suggest as suggest_events
+from .stats import rebuild_stats_for_event, release_ticket, reserve_ticket
+from .qr import (
+    parse_ticket_code, qr_etag, render_qr_png, schedule_ticket_qr, ticket_qr_payload, ticket_qr_url, ticket_token,
+)
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import Count, Q
 from .serializers import (
-    EventSerializer, CategorySerializer, VenueSerializer, TicketSerializer
+    EventSerializer, CategorySerializer, VenueSerializer, TicketSerializer, SlimTicketSerializer
 )
+from .sparse import FIELDS_PARAM, parse_field_paths, requested_fields, shape_queryset
 
 # ---------- helpers to tolerate either start_at/start_time and end_at/end_time ----------
 def _has_field(model, name: str) -> bool:
@@ -46,6 +58,13 @@ def _event_owner_id(event):
     # so defensively attempt to read it.
     return getattr(event, 'organizer_id', None)
 
+def _day_bounds(day):
+    """Return the aware [start, end) datetimes covering a calendar day in the current timezone."""
+    tz = get_current_timezone()
+    start = make_aware(datetime.datetime.combine(day, datetime.time.min), tz)
+    end = make_aware(datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time.min), tz)
+    return start, end
+
 def _first_existing_field(model, *candidates):
     for c in candidates:
         if _has_field(model, c):
@@ -57,7 +76,10 @@ class EventViewSet(viewsets.ModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     # Use JWT for API auth to avoid CSRF enforcement by SessionAuthentication on unsafe methods.
-    authentication_classes = [JWTAuthentication]
+    # CachedJWTAuthentication reuses the user RoleAuthorizationMiddleware already resolved.
+    authentication_classes = [CachedJWTAuthentication]
+    # Opt-in keyset pagination on (start_time, id); see EventCursorPagination
+    pagination_class = EventCursorPagination
 
     # ensure EventSerializer gets request in context (for absolute image_url)
     def get_serializer(self, *args, **kwargs):
@@ -78,16 +100,18 @@ class EventViewSet(viewsets.ModelViewSet):
         from_str = self.request.query_params.get("from") or None
         to_str = self.request.query_params.get("to") or None
 
+        # Date filters are rewritten as half-open datetime ranges on the raw
+        # columns (instead of __date transforms) so the Event indexes apply.
         if date_str:
             try:
                 date_obj = datetime.date.fromisoformat(date_str)
+                day_start, day_end = _day_bounds(date_obj)
                 if start_field and end_field:
                     # events that start on or before the date and end on or after the date
-                    qs = qs.filter(**{f"{start_field}__date__lte": date_obj, f"{end_field}__date__gte": date_obj})
-                elif start_field:
-                    qs = qs.filter(**{f"{start_field}__date": date_obj})
+                    qs = qs.filter(**{f"{start_field}__lt": day_end, f"{end_field}__gte": day_start})
                 else:
-                    qs = qs.filter(**{"start_time__date": date_obj})
+                    qs = qs.filter(**{f"{start_field or 'start_time'}__gte": day_start,
+                                      f"{start_field or 'start_time'}__lt": day_end})
             except Exception:
                 # ignore parse errors and continue with default queryset
                 pass
@@ -95,20 +119,14 @@ class EventViewSet(viewsets.ModelViewSet):
         if from_str:
             try:
                 from_obj = datetime.date.fromisoformat(from_str)
-                if start_field:
-                    qs = qs.filter(**{f"{start_field}__date__gte": from_obj})
-                else:
-                    qs = qs.filter(**{"start_time__date__gte": from_obj})
+                qs = qs.filter(**{f"{start_field or 'start_time'}__gte": _day_bounds(from_obj)[0]})
             except Exception:
                 pass
 
         if to_str:
             try:
                 to_obj = datetime.date.fromisoformat(to_str)
-                if start_field:
-                    qs = qs.filter(**{f"{start_field}__date__lte": to_obj})
-                else:
-                    qs = qs.filter(**{"start_time__date__lte": to_obj})
+                qs = qs.filter(**{f"{start_field or 'start_time'}__lt": _day_bounds(to_obj)[1]})
             except Exception:
                 pass
 
@@ -154,9 +172,21 @@ class EventViewSet(viewsets.ModelViewSet):
                 if not (getattr(self.request.user, 'is_staff', False) or getattr(self.request.user, 'role', '') == 'admin'):
                     qs = qs.filter(is_approved=True)
 
+        # Full-text filter for the list (?q=); the search action ranks instead,
+        # and detail actions such as attendees use ?q= for their own filters
+        q = self.request.query_params.get('q') or None
+        if q and self.action == 'list':
+            qs = filter_events(qs, q)
+
+        # Ticket counters for EventSerializer come from the joined EventStats
+        # row instead of COUNT queries per serialized event. The organizer is
+        # joined for organizer_name, the venue for venue_name.
+        qs = qs.select_related('organizer', 'stats', 'venue')
+
         # order by start if it exists, else by pk
         order_field = start_field or "id"
-        return qs.order_by(order_field)
+        # ?fields= / ?omit= / ?expand= also narrow the columns and joins (see sparse.py)
+        return shape_queryset(qs.order_by(order_field), self.get_serializer())
 
     def perform_create(self, serializer):
         """Auto-assign the requesting user as the organizer when creating an event."""
@@ -179,15 +209,51 @@ class EventViewSet(viewsets.ModelViewSet):
         else:
             serializer.save()
 
+    @staticmethod
+    def _revalidated(response, etag):
+        # Clients may keep the body but must revalidate it with If-None-Match
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """Event list; answers 304 when the If-None-Match ETag still matches."""
+        _count, etag = events_etag(self.filter_queryset(self.get_queryset()), request)
+        if not_modified(request, etag):
+            return self._revalidated(HttpResponseNotModified(), etag)
+        if fastpath.enabled(request, fastpath.EVENT_ROWS):
+            return self._revalidated(self._fast_list(request), etag)
+        return self._revalidated(super().list(request, *args, **kwargs), etag)
+
+    def _fast_list(self, request):
+        """list() built from values_list() rows instead of EventSerializer (see fastpath.py)."""
+        queryset = self.filter_queryset(self.get_queryset())
+        # cursor pagination reads the ordering columns off each row by name
+        paginated = self.paginator is not None and self.paginator.get_page_size(request) is not None
+        rows = fastpath.EVENT_ROWS.rows(queryset, named=paginated)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fastpath.EVENT_ROWS.to_representation(page, request))
+        return Response(fastpath.EVENT_ROWS.to_representation(rows, request))
+
     def retrieve(self, request, *args, **kwargs):
         """Allow the event owner or admin to retrieve a single unapproved event even when
         the default queryset hides unapproved events from public listing.
         This keeps discovery lists clean but lets owners and admins access details.
+
+        Events in the default queryset carry an ETag and revalidate with 304.
         """
         pk = kwargs.get('pk')
+        try:
+            count, etag = events_etag(self.get_queryset().filter(pk=pk), request)
+        except (TypeError, ValueError):
+            count, etag = 0, None
+        if count and not_modified(request, etag):
+            return self._revalidated(HttpResponseNotModified(), etag)
         try:
             # First try the normal path (object present in queryset)
-            return super().retrieve(request, *args, **kwargs)
+            response = super().retrieve(request, *args, **kwargs)
+            return self._revalidated(response, etag) if count else response
         except Exception:
             # If not found in the queryset, try to fetch directly and validate ownership/admin
             try:
@@ -212,6 +278,38 @@ class EventViewSet(viewsets.ModelViewSet):
         if owner_id != user.id and getattr(user, 'role', '') != 'admin' and not getattr(user, 'is_staff', False):
             raise PermissionDenied(detail='You do not have permission to perform this action on this event.')
 
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        """
+        Ranked full-text search over title, description, organization and category.
+
+        GET /api/events/search/?q=...&page=&page_size= applies the same
+        visibility and date filters as the list and orders by relevance.
+        """
+        q = request.query_params.get('q', '')
+        if not query_tokens(q):
+            return Response({'detail': 'Query parameter q is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        qs = rank_events(self.get_queryset(), q)
+        paginator = EventSearchPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='suggest')
+    def suggest(self, request):
+        """
+        Typeahead suggestions from the in-process index (no database query).
+
+        GET /api/events/suggest/?prefix=ja&limit=8 returns upcoming approved
+        events whose title, organization or category words start with the prefix.
+        """
+        prefix = request.query_params.get('prefix', '')
+        try:
+            limit = min(max(int(request.query_params.get('limit', 8)), 1), 20)
+        except (TypeError, ValueError):
+            limit = 8
+        return Response({'prefix': prefix, 'results': suggest_events(prefix, limit=limit)})
+
     @action(detail=True, methods=['get'], url_path='analytics')
     def analytics(self, request, pk=None):
         """
@@ -223,9 +321,13 @@ class EventViewSet(viewsets.ModelViewSet):
             self._ensure_owner_or_admin(event)
         except PermissionDenied:
             return Response({'detail': 'You do not have permission to view analytics for this event.'}, status=status.HTTP_403_FORBIDDEN)
-        # ticket related_name in this project is `event_management_tickets`
-        total_tickets = event.event_management_tickets.count()
-        checked_in = event.event_management_tickets.filter(is_used=True).count()
+        # Counters come from the event's EventStats row (joined by get_queryset)
+        try:
+            stats = event.stats
+        except EventStats.DoesNotExist:
+            stats = rebuild_stats_for_event(event.id)
+        total_tickets = stats.tickets_issued
+        checked_in = stats.tickets_checked_in
 
         # Determine if the event has ended to compute no-shows as a derived metric.
         ended = False
@@ -240,11 +342,9 @@ class EventViewSet(viewsets.ModelViewSet):
         except Exception:
             ended = False
 
-        # Event model may not have a Venue relation in this fork; be defensive.
-        venue_obj = getattr(event, 'venue', None)
-        if venue_obj is not None and hasattr(venue_obj, 'capacity'):
-            venue_capacity = venue_obj.capacity
-        else:
+        # Event capacity, else the linked venue's (see Event.effective_capacity)
+        venue_capacity = event.effective_capacity
+        if venue_capacity is None:
             # fallback: use total_tickets as capacity to avoid division errors
             venue_capacity = total_tickets or 0
 
@@ -271,6 +371,10 @@ class EventViewSet(viewsets.ModelViewSet):
     def attendees(self, request, pk=None):
         """
         Organizer-only attendee list (from main)
+
+        Supports ?checked_in=true|false, ?q= (name/email substring) and opt-in
+        pagination via ?page= / ?page_size=. total_attendees and
+        checked_in_count always describe the whole event.
         """
         event = self.get_object()
 
@@ -283,23 +387,55 @@ class EventViewSet(viewsets.ModelViewSet):
                         status=status.HTTP_403_FORBIDDEN
                     )
 
-        tickets = event.event_management_tickets.select_related('owner').all()
-        attendee_list = [{
-            'ticket_id': str(t.id),
-            'name': getattr(t.owner, "name", ""),
-            'email': getattr(t.owner, "email", ""),
-            'is_checked_in': t.is_used,
-            'check_in_time': t.created_at if t.is_used else None,
-            'qr_code': getattr(t, "qr_code", None),
-        } for t in tickets]
+        tickets = event.event_management_tickets.all()
+        # Event-wide totals in one aggregate, independent of the filters below
+        totals = tickets.aggregate(
+            total=Count('id'),
+            checked_in=Count('id', filter=Q(is_used=True)),
+        )
+
+        rows = tickets
+        checked_in_param = request.query_params.get('checked_in')
+        if checked_in_param is not None:
+            if checked_in_param.lower() in ('true', '1'):
+                rows = rows.filter(is_used=True)
+            elif checked_in_param.lower() in ('false', '0'):
+                rows = rows.filter(is_used=False)
+        search = (request.query_params.get('q') or '').strip()
+        if search:
+            rows = rows.filter(Q(owner__name__icontains=search) | Q(owner__email__icontains=search))
+        rows = (rows
+                .order_by('created_at', 'id')
+                .values('id', 'event_id', 'created_at', 'owner__name', 'owner__email', 'is_used', 'checked_in_at'))
+
+        # Paginated when ?page= / ?page_size= is given (see AttendeePagination)
+        paginator = AttendeePagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
 
-        return Response({
+        attendee_list = [{
+            'ticket_id': str(r['id']),
+            'name': r['owner__name'] or "",
+            'email': r['owner__email'] or "",
+            'is_checked_in': r['is_used'],
+            'check_in_time': r['checked_in_at'] if r['is_used'] else None,
+            # the same signed token as the ticket's QR (see qr.ticket_qr_payload)
+            'qr_code': ticket_token(r['event_id'], r['id'], r['created_at']),
+        } for r in (page if page is not None else rows)]
+
+        data = {
             'event_id': event.id,
             'event_title': event.title,
-            'total_attendees': len(attendee_list),
-            'checked_in_count': sum(1 for a in attendee_list if a['is_checked_in']),
+            'total_attendees': totals['total'],
+            'checked_in_count': totals['checked_in'],
             'attendees': attendee_list,
-        })
+        }
+        if page is not None:
+            data.update({
+                'count': paginator.page.paginator.count,
+                'next': paginator.get_next_link(),
+                'previous': paginator.get_previous_link(),
+            })
+        return Response(data)
 
     # Protect update/delete so non-owners cannot edit events
     def update(self, request, *args, **kwargs):
@@ -329,7 +465,10 @@ class EventViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'], url_path='attendees/export')
     def export_attendees(self, request, pk=None):
         """
-        Organizer-only CSV export
+        Organizer-only attendee export, streamed in constant memory.
+
+        ?file_format=csv (default) | ndjson | xlsx, and ?gzip=1 to compress.
+        (DRF reserves ?format= for renderer selection.)
         """
         event = self.get_object()
 
@@ -342,43 +481,79 @@ class EventViewSet(viewsets.ModelViewSet):
                         status=status.HTTP_403_FORBIDDEN
                     )
 
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="attendees_{event.id}_{event.title.replace(" ", "_")}.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['Ticket ID', 'Name', 'Email', 'Check-in Status', 'Check-in Time'])
-
-        for t in event.event_management_tickets.select_related('owner').all():
-            writer.writerow([
-                str(t.id),
-                getattr(t.owner, "name", ""),
-                getattr(t.owner, "email", ""),
-                'Checked In' if t.is_used else 'Not Checked In',
-                t.created_at if t.is_used else '',
-            ])
+        export_format = (request.query_params.get('file_format') or 'csv').lower()
+        if export_format not in STREAMERS:
+            return Response(
+                {'detail': f"Unsupported file_format. Choose one of: {', '.join(STREAMERS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        use_gzip = request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+        chunks = STREAMERS[export_format](attendee_rows(event))
+        filename = f'attendees_{event.id}_{event.title.replace(" ", "_")}.{export_format}'
+        if use_gzip:
+            response = StreamingHttpResponse(gzip_stream(chunks), content_type='application/gzip')
+            filename += '.gz'
+        else:
+            response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
         return response
 
 class CategoryViewSet(viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
+    def get_queryset(self):
+        return shape_queryset(super().get_queryset(), self.get_serializer())
+
 class VenueViewSet(viewsets.ModelViewSet):
     queryset = Venue.objects.all()
     serializer_class = VenueSerializer
 
+    def get_queryset(self):
+        return shape_queryset(super().get_queryset(), self.get_serializer())
+
 # ----------------- Tickets for current user -----------------
+def _wants_slim_tickets(request):
+    return request.query_params.get("view") == "slim"
+
+
+def _ticket_serializer_class(request):
+    """?view=slim selects the flattened ticket representation."""
+    return SlimTicketSerializer if _wants_slim_tickets(request) else TicketSerializer
+
+
+def _my_tickets_queryset(request):
+    """The user's tickets with exactly the joins the chosen serializer reads.
+
+    Full tickets nest EventSerializer (organizer name, venue name and the
+    EventStats counters); slim tickets need the event and venue, plus the
+    stats row only when ?fields= asks for the counters.
+    """
+    qs = Ticket.objects.filter(owner=request.user)   # adjust if model uses 'user'
+    if not _wants_slim_tickets(request):
+        return qs.select_related("event__organizer", "event__stats", "event__venue")
+    related = ["event__venue"]
+    wanted = requested_fields(parse_field_paths(request.query_params.get(FIELDS_PARAM))) or set()
+    if wanted & set(SlimTicketSerializer.Meta.optional_fields):
+        related.append("event__stats")
+    return qs.select_related(*related)
+
+
 class TicketViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Optional: /api/tickets/ for current user.
     """
     serializer_class = TicketSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    def get_serializer_class(self):
+        return _ticket_serializer_class(self.request)
+
     def get_queryset(self):
-        return (Ticket.objects
-                .select_related("event")
-                .filter(owner=self.request.user)   # adjust to .filter(user=...) if your model uses 'user'
-                .order_by("-created_at"))
+        return shape_queryset(_my_tickets_queryset(self.request).order_by("-created_at"),
+                              self.get_serializer())
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
@@ -387,7 +562,7 @@ class TicketViewSet(viewsets.ReadOnlyModelViewSet):
 
 # ----------------- Auth / Profile -----------------
 @api_view(["GET"])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([CachedJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def me(request):
     u = request.user
@@ -397,17 +572,66 @@ def me(request):
         "first_name": getattr(u, "first_name", "") or "",
         "last_name": getattr(u, "last_name", "") or "",
         "role": getattr(u, "role", "student"),
+        # Subscribable personal .ics feed (the key works without a JWT)
+        "calendar_url": request.build_absolute_uri(reverse("my_calendar_feed")) + "?key=" + ical.feed_key(u),
     })
 
 # ----------------- Buy / My tickets / Ticket for event -----------------
 @api_view(["POST"])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([CachedJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def buy_ticket(request, event_id: int):
     """
     POST /api/events/<event_id>/buy/ — one ticket per user per event.
+    Answers 409 once the event's capacity is reached.
+
+    During a rush the admission queue (see event_management.admission) turns
+    away requests without an admitted X-Admission-Token with 429.
     """
-    event = get_object_or_404(Event, pk=event_id)
+    admitted, queued = admission.gate(request, event_id, request.user.id)
+    if queued is not None:
+        if queued.get("sold_out"):
+            # someone who already holds a ticket still gets it back, not a 409
+            existing = Ticket.objects.filter(event_id=event_id, owner=request.user).first()
+            if existing:
+                return _existing_ticket_response(existing)
+            return Response({"detail": queued["detail"]}, status=409)
+        response = Response(queued, status=429)
+        response["Retry-After"] = "1"
+        return response
+    response = _issue_ticket(request, event_id)
+    if response.status_code != 503:
+        # keep the admission on retryable failures, free the slot otherwise
+        admission.release(admitted)
+    return response
+
+
+# PostgreSQL SQLSTATEs for lock_not_available, deadlock_detected, serialization_failure
+_RETRYABLE_SQLSTATES = {"55P03", "40P01", "40001"}
+
+
+def _is_lock_timeout(exc):
+    """True if an OperationalError is lock contention (retryable), not e.g. a schema problem."""
+    cause = exc.__cause__ or exc
+    sqlstate = getattr(cause, "sqlstate", None) or getattr(cause, "pgcode", None)
+    if sqlstate:
+        return sqlstate in _RETRYABLE_SQLSTATES
+    return "database is locked" in str(exc) or "database table is locked" in str(exc)
+
+
+def _existing_ticket_response(ticket):
+    """200 with the ticket a user already holds (buy is idempotent)."""
+    return Response({
+        "ticket_id": str(ticket.id),
+        "event": ticket.event_id,
+        "detail": "Ticket already exists.",
+        "qr_code": ticket_qr_payload(ticket),
+        "qr_png_url": ticket_qr_url(ticket),
+    }, status=200)
+
+
+def _issue_ticket(request, event_id):
+    event = get_object_or_404(Event.objects.select_related('venue'), pk=event_id)
     # Do not allow registration for events pending approval
     if hasattr(event, 'is_approved') and not getattr(event, 'is_approved'):
         return Response({"detail": "Event is not open for registration."}, status=403)
@@ -417,27 +641,31 @@ def buy_ticket(request, event_id: int):
     # that failed while saving QR), return the existing ticket instead of 400.
     existing = Ticket.objects.filter(event=event, owner=user).first()
     if existing:
-        return Response({
-            "ticket_id": str(existing.id),
-            "event": event.id,
-            "detail": "Ticket already exists.",
-            "qr_code": getattr(existing, "qr_code", None) or str(existing.id),
-            "qr_png_url": (existing.qr.url if hasattr(existing, "qr") and existing.qr else None),
-        }, status=200)
+        return _existing_ticket_response(existing)
 
+    # Take the seat and create the ticket in one transaction: the conditional
+    # counter update in reserve_ticket enforces capacity under concurrency,
+    # and a failed insert rolls the seat back.
     try:
-        ticket = Ticket.objects.create(event=event, owner=user)
+        with transaction.atomic():
+            if not reserve_ticket(event.id, event.effective_capacity):
+                admission.mark_sold_out(event.id)
+                return Response({"detail": "Event is sold out."}, status=409)
+            ticket = Ticket.objects.create(event=event, owner=user)
+            # a direct purchase ends the user's wait for this event
+            waitlist.leave(event.id, user)
+    except OperationalError as e:
+        if not _is_lock_timeout(e):
+            raise
+        # Lock timeout under heavy contention; safe for the client to retry
+        response = Response({"detail": "Ticketing is busy, please retry."}, status=503)
+        response["Retry-After"] = "1"
+        return response
     except IntegrityError as e:
         # In case of a race condition, return the existing ticket if present
         existing = Ticket.objects.filter(event=event, owner=user).first()
         if existing:
-            return Response({
-                "ticket_id": str(existing.id),
-                "event": event.id,
-                "detail": "Ticket already exists.",
-                "qr_code": getattr(existing, "qr_code", None) or str(existing.id),
-                "qr_png_url": (existing.qr.url if hasattr(existing, "qr") and existing.qr else None),
-            }, status=200)
+            return _existing_ticket_response(existing)
         # Surface diagnostic info in development
         from django.conf import settings as _settings
         msg = "Could not create ticket."
@@ -451,49 +679,46 @@ def buy_ticket(request, event_id: int):
             msg = f"{e.__class__.__name__}: {e}"
         return Response({"detail": msg}, status=400)
 
-    # Optional: save PNG to a File/ImageField named 'qr'.
-    # Be defensive about missing MEDIA_ROOT directory to avoid 500s.
-    if hasattr(ticket, "qr"):
-        try:
-            # Ensure MEDIA_ROOT exists so FileSystemStorage can write files
-            os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
-
-            qr_img = qrcode.make(str(ticket.id))
-            buf = BytesIO()
-            qr_img.save(buf, format="PNG")
-            ticket.qr.save(f"ticket-{ticket.id}.png", ContentFile(buf.getvalue()), save=True)
-        except Exception:
-            # If QR image saving fails (e.g., no filesystem), continue without blocking purchase
-            pass
+    # The PNG is rendered on the QR worker pool after commit; until it is
+    # stored, qr_png_url points at the on-demand /api/tickets/<id>/qr.png view.
+    schedule_ticket_qr(ticket.id)
 
     return Response({
         "ticket_id": str(ticket.id),
         "event": event.id,
         "detail": "Ticket purchased.",
         # Provide a textual QR payload as a fallback (works for client-side QR rendering)
-        "qr_code": getattr(ticket, "qr_code", None) or str(ticket.id),
-        "qr_png_url": (ticket.qr.url if hasattr(ticket, "qr") and ticket.qr else None),
+        "qr_code": ticket_qr_payload(ticket),
+        "qr_png_url": ticket_qr_url(ticket),
     }, status=201)
 
 class MyTicketsList(generics.ListAPIView):
     """
     /api/me/tickets/ — current user's tickets
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = TicketSerializer
 
+    def get_serializer_class(self):
+        return _ticket_serializer_class(self.request)
+
     def get_queryset(self):
-        return (Ticket.objects
-                .filter(owner=self.request.user)   # adjust if model uses 'user'
-                .select_related("event")
-                .order_by("-event__start_time", "-id"))
+        return shape_queryset(_my_tickets_queryset(self.request).order_by("-event__start_time", "-id"),
+                              self.get_serializer())
 
     def get_serializer_context(self):
         return {"request": self.request}
 
+    def list(self, request, *args, **kwargs):
+        # Full tickets are built from values_list() rows (see fastpath.py)
+        if fastpath.enabled(request, fastpath.TICKET_ROWS) and not _wants_slim_tickets(request):
+            rows = fastpath.TICKET_ROWS.rows(self.get_queryset())
+            return Response(fastpath.TICKET_ROWS.to_representation(rows, request))
+        return super().list(request, *args, **kwargs)
+
 @api_view(["GET"])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([CachedJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def get_ticket_for_event(request, event_id: int):
     """
@@ -511,27 +736,121 @@ def get_ticket_for_event(request, event_id: int):
         "ticket_id": str(ticket.id),
         "event": event.id,
         "event_title": getattr(event, "title", None) or getattr(event, "name", None),
-        "qr_code": getattr(ticket, "qr_code", None),
-        "qr_png_url": (ticket.qr.url if hasattr(ticket, "qr") and ticket.qr else None),
+        "qr_code": ticket_qr_payload(ticket),
+        "qr_png_url": ticket_qr_url(ticket),
     })
 
 @api_view(["POST"])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([CachedJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def cancel_ticket(request, event_id: int):
     """
     POST /api/events/<event_id>/cancel/
+
+    The freed seat goes to the head of the event's waitlist in the same transaction.
     """
-    get_object_or_404(Event, pk=event_id)  # ensure event exists
+    event = get_object_or_404(Event.objects.select_related('venue'), pk=event_id)  # ensure event exists
     ticket = Ticket.objects.filter(event_id=event_id, owner=request.user).first()  # adjust if model uses 'user'
     if not ticket:
         return Response({"detail": "No ticket for this event."}, status=404)
-    ticket.delete()
+    with transaction.atomic():
+        if not release_ticket(ticket):
+            # cancelled by an overlapping request: that one freed the seat
+            return Response({"detail": "No ticket for this event."}, status=404)
+        promoted = waitlist.promote_next(event)
+    if promoted is None:
+        # nobody was waiting: the seat is open to buyers again
+        admission.mark_sold_out(event_id, False)
     return Response({"detail": "Registration cancelled."}, status=200)
 
 
 @api_view(["POST"])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([CachedJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def join_admission_queue(request, event_id: int):
+    """
+    POST /api/events/<event_id>/queue/ — take a place in the event's admission queue.
+
+    Returns a token to poll /api/queue/status/ with and, once admitted, to
+    send to buy as the X-Admission-Token header.
+    """
+    if not admission.enabled():
+        return Response({"detail": "The admission queue is disabled."}, status=404)
+    if not Event.objects.filter(pk=event_id).exists():
+        return Response({"detail": "No Event matches the given query."}, status=404)
+    return Response(admission.join(event_id, request.user.id), status=201)
+
+
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def admission_queue_status(request):
+    """
+    GET /api/queue/status/?token=... — in-memory queue status (no DB, no auth).
+    """
+    payload = admission.status(request.query_params.get("token", ""))
+    if payload is None:
+        return Response({"detail": "Invalid queue token."}, status=400)
+    return Response(payload)
+
+
+def _waitlist_payload(entry):
+    data = {
+        "event": entry.event_id,
+        "status": entry.status.lower(),
+        "joined_at": entry.created_at,
+    }
+    if entry.status == WaitlistEntry.WAITING:
+        data["position"] = waitlist.queue_position(entry)
+    else:
+        data["ticket_id"] = str(entry.ticket_id) if entry.ticket_id else None
+        data["promoted_at"] = entry.promoted_at
+    return data
+
+
+@api_view(["GET", "POST", "DELETE"])
+@authentication_classes([CachedJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def event_waitlist(request, event_id: int):
+    """
+    /api/events/<event_id>/waitlist/
+      GET    — the caller's waitlist status (place in line, or the promoted ticket)
+      POST   — join the waitlist of a sold-out event
+      DELETE — leave the waitlist
+    """
+    event = get_object_or_404(Event.objects.select_related('venue', 'stats'), pk=event_id)
+    user = request.user
+
+    if request.method == "GET":
+        entry = (WaitlistEntry.objects.filter(event=event, user=user)
+                 .order_by('-position').first())
+        if not entry:
+            return Response({"detail": "Not on the waitlist for this event."}, status=404)
+        return Response(_waitlist_payload(entry))
+
+    if request.method == "DELETE":
+        if not waitlist.leave(event.id, user):
+            return Response({"detail": "Not on the waitlist for this event."}, status=404)
+        return Response({"detail": "Left the waitlist."}, status=200)
+
+    if hasattr(event, 'is_approved') and not getattr(event, 'is_approved'):
+        return Response({"detail": "Event is not open for registration."}, status=403)
+    if Ticket.objects.filter(event=event, owner=user).exists():
+        return Response({"detail": "You already have a ticket for this event."}, status=409)
+    capacity = event.effective_capacity
+    try:
+        issued = event.stats.tickets_issued
+    except EventStats.DoesNotExist:
+        issued = rebuild_stats_for_event(event.id).tickets_issued
+    if capacity is None or issued < capacity:
+        return Response({"detail": "Tickets are still available."}, status=409)
+
+    entry, created = waitlist.join(event, user)
+    return Response(_waitlist_payload(entry), status=201 if created else 200)
+
+
+@api_view(["POST"])
+@authentication_classes([CachedJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def checkin_ticket(request, ticket_id: str):
     """Endpoint to check-in a ticket by its id (used by QR scanner tools).
@@ -577,11 +896,9 @@ def checkin_ticket(request, ticket_id: str):
             pass
         return Response({"detail": "You do not have permission to check in this ticket."}, status=status.HTTP_403_FORBIDDEN)
 
-    if t.is_used:
+    # The conditional UPDATE decides: of two scanners racing, only one gets the row
+    if not check_in_ticket(t.pk, t.event_id):
         return Response({"detail": "Ticket already checked in."}, status=status.HTTP_400_BAD_REQUEST)
-
-    t.is_used = True
-    t.save()
     return Response({
         "ticket_id": str(t.id),
         "checked_in": True,
@@ -590,3 +907,209 @@ def checkin_ticket(request, ticket_id: str):
         "attendee_name": getattr(getattr(t, 'owner', None), 'name', None),
         "attendee_email": getattr(getattr(t, 'owner', None), 'email', None),
     }, status=200)
+
+
+def _can_run_door(user, event):
+    """Organizer of the event, admins and staff may check tickets in and pull manifests."""
+    return (_event_owner_id(event) == user.id
+            or getattr(user, 'role', '') == 'admin'
+            or getattr(user, 'is_staff', False))
+
+
+@api_view(["POST"])
+@authentication_classes([CachedJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def bulk_checkin(request, event_id: int):
+    """
+    POST /api/events/<event_id>/checkin/bulk/ — check in a batch of door scans.
+
+    Body: {"scans": [{"ticket_id": "<uuid>", "scanned_at": "<ISO 8601>"}, ...]}
+    (bare ticket id strings are accepted too). Returns one result per scan, in
+    order: ok, already-used, unknown or wrong-event. Only the event's
+    organizer, admins and staff may check tickets in.
+    """
+    event = get_object_or_404(Event.objects.select_related('organizer'), pk=event_id)
+    if not _can_run_door(request.user, event):
+        return Response({"detail": "You do not have permission to check in tickets for this event."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    scans = request.data.get('scans') if isinstance(request.data, dict) else None
+    if not isinstance(scans, list) or not scans:
+        return Response({"detail": "Send a non-empty 'scans' list."}, status=status.HTTP_400_BAD_REQUEST)
+    max_scans = getattr(settings, 'BULK_CHECKIN_MAX_SCANS', 500)
+    if len(scans) > max_scans:
+        return Response({"detail": f"At most {max_scans} scans per request."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    results = bulk_check_in(event.id, scans)
+    return Response({
+        "event": event.id,
+        "checked_in": sum(1 for r in results if r["result"] == OK),
+        "results": results,
+    }, status=200)
+
+
+@api_view(["POST"])
+@authentication_classes([CachedJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def scan_checkin(request, event_id: int):
+    """
+    POST /api/events/<event_id>/checkin/scan/ — check in the text read from a ticket's QR code.
+
+    Body: {"code": "<scanned text>"}. Signed codes are verified, and codes
+    for another event refused, before any database access; legacy codes (a
+    bare ticket id) are looked up as before.
+    """
+    code = parse_ticket_code(request.data.get("code") if isinstance(request.data, dict) else None)
+    if code is None:
+        return Response({"detail": "Invalid ticket code."}, status=status.HTTP_400_BAD_REQUEST)
+    if code.event_id is not None and code.event_id != event_id:
+        return Response({"detail": "This ticket is for another event."}, status=status.HTTP_409_CONFLICT)
+
+    event = get_object_or_404(Event.objects.select_related('organizer'), pk=event_id)
+    if not _can_run_door(request.user, event):
+        return Response({"detail": "You do not have permission to check in tickets for this event."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    result = bulk_check_in(event.id, [str(code.ticket_id)])[0]
+    if result["result"] == UNKNOWN:
+        return Response({"detail": "Ticket not found."}, status=status.HTTP_404_NOT_FOUND)
+    if result["result"] == ALREADY_USED:
+        return Response({"detail": "Ticket already checked in.", **result}, status=status.HTTP_409_CONFLICT)
+    if result["result"] != OK:
+        return Response({"detail": "This ticket is for another event."}, status=status.HTTP_409_CONFLICT)
+    return Response({
+        **result,
+        "checked_in": True,
+        "event": event.id,
+        "event_title": event.title,
+    }, status=200)
+
+
+@api_view(["GET"])
+@authentication_classes([CachedJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def checkin_manifest(request, event_id: int):
+    """
+    GET /api/events/<event_id>/checkin/manifest/ — signed ticket list for offline scanners.
+
+    ?encoding=sorted (default) or bloom picks the full-manifest format;
+    ?since=<cursor from a previous pull> returns only the tickets issued or
+    checked in since then. Full manifests also carry the event's scanner_key,
+    which checks every manifest's signature offline. See
+    event_management.manifest for the formats.
+    """
+    event = get_object_or_404(Event.objects.select_related('organizer'), pk=event_id)
+    if not _can_run_door(request.user, event):
+        return Response({"detail": "You do not have permission to check in tickets for this event."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    encoding = request.query_params.get('encoding', manifest.SORTED)
+    if encoding not in manifest.ENCODINGS:
+        return Response({"detail": f"encoding must be one of: {', '.join(manifest.ENCODINGS)}."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    since = None
+    cursor = request.query_params.get('since')
+    if cursor:
+        since = manifest.load_cursor(event.id, cursor)
+        if since is None:
+            return Response({"detail": "Invalid 'since' cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+    response = Response(manifest.build_manifest(event.id, encoding=encoding, since=since))
+    response["Cache-Control"] = "private, no-store"
+    return response
+
+
+@api_view(["GET"])
+@authentication_classes([CachedJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def ticket_qr_png(request, ticket_id):
+    """GET /api/tickets/<ticket_id>/qr.png — the ticket's QR code as PNG.
+
+    Serves the stored file when the worker has written it, otherwise renders
+    in memory (and queues the file write). The payload never changes for a
+    ticket, so responses carry a strong ETag and are cacheable by the client.
+    """
+    t = (Ticket.objects
+         .select_related('event')
+         .only('id', 'qr', 'owner', 'created_at', 'event__id', 'event__organizer')
+         .filter(pk=ticket_id)
+         .first())
+    if t is None:
+        return Response({"detail": "Ticket not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    user = request.user
+    if not (t.owner_id == user.id
+            or _event_owner_id(t.event) == user.id
+            or getattr(user, 'role', '') == 'admin'
+            or getattr(user, 'is_staff', False)):
+        return Response({"detail": "You do not have permission to view this ticket."}, status=status.HTTP_403_FORBIDDEN)
+
+    payload = ticket_qr_payload(t)
+    etag = qr_etag(payload)
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponse(status=304)
+    else:
+        png = None
+        if t.qr:
+            try:
+                with t.qr.open('rb') as fh:
+                    png = fh.read()
+            except Exception:
+                png = None
+        if png is None:
+            png = render_qr_png(payload)
+            schedule_ticket_qr(t.id)
+        response = HttpResponse(png, content_type='image/png')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
+# ----------------- iCalendar feeds -----------------
+def _calendar_response(request, validators, events, name, filename):
+    """Stream an .ics feed, or 304 when the client's ETag / Last-Modified still match."""
+    etag, last_modified = validators
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = StreamingHttpResponse(ical.stream_calendar(events, name),
+                                         content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+    response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@require_safe
+def my_calendar_feed(request):
+    """
+    GET /api/users/me/calendar.ics — events the user has tickets for or saved.
+
+    Authenticated by JWT (header or cookie) or by the ?key= that /api/users/me/
+    returns in calendar_url, for calendar apps that cannot send headers.
+    Plain Django view so calendar clients' Accept headers are not negotiated.
+    """
+    key = request.GET.get('key')
+    if key:
+        user = ical.user_for_key(key)
+        if user is None:
+            return JsonResponse({"detail": "Invalid calendar key."}, status=403)
+    else:
+        user = getattr(request, 'user', None)
+        if not (user and user.is_authenticated):
+            return JsonResponse({"detail": "Authentication required."}, status=401)
+    return _calendar_response(request, ical.user_feed_validators(user), ical.user_feed_events(user),
+                              name='My campus events', filename='my-events.ics')
+
+
+@require_safe
+def organizer_calendar_feed(request, organizer_id: int):
+    """GET /api/organizers/<organizer_id>/calendar.ics — an organizer's approved events (public)."""
+    organizer = get_object_or_404(get_user_model(), pk=organizer_id, role__in=['organizer', 'admin'])
+    return _calendar_response(request, ical.organizer_feed_validators(organizer.pk),
+                              ical.organizer_feed_events(organizer.pk),
+                              name=f'{organizer.name or organizer.email} events',
+                              filename=f'organizer-{organizer.pk}.ics')
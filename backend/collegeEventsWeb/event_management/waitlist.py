@@ -0,0 +1,102 @@
+"""FIFO waitlist for sold-out events.
+
+Joining takes the next position from the event's EventStats row with an F()
+update, so positions are strictly increasing per event. Promotion reads the
+head through the partial (event, position) index on WAITING entries. That is
+one index seek however long the queue is, not a scan. It runs in the
+transaction that frees the seat, once release_ticket has confirmed the ticket
+row was actually deleted (see cancel_ticket), so the seat goes straight to
+the next user. Emails are sent later, in batches, by ``manage.py
+process_waitlist``.
+"""
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .models import EventStats, Ticket, WaitlistEntry
+from .qr import schedule_ticket_qr
+from .stats import rebuild_stats_for_event, reserve_ticket
+
+# Entries skipped per promotion because their user already holds a ticket
+MAX_PROMOTION_SKIPS = 20
+
+
+def _next_position(event_id):
+    """Allocate the next queue position for an event (call inside a transaction)."""
+    bump = {'waitlist_last_position': F('waitlist_last_position') + 1}
+    if not EventStats.objects.filter(event_id=event_id).update(**bump):
+        rebuild_stats_for_event(event_id)
+        # a recreated stats row must not hand out positions already in use
+        last = WaitlistEntry.objects.filter(event_id=event_id).aggregate(m=Max('position'))['m'] or 0
+        EventStats.objects.filter(event_id=event_id).update(waitlist_last_position=last + 1)
+    return EventStats.objects.filter(event_id=event_id).values_list('waitlist_last_position', flat=True).get()
+
+
+def waiting_entry(event_id, user):
+    return WaitlistEntry.objects.filter(event_id=event_id, user=user, status=WaitlistEntry.WAITING).first()
+
+
+def join(event, user):
+    """Queue `user` for `event`; returns (entry, created)."""
+    with transaction.atomic():
+        existing = waiting_entry(event.id, user)
+        if existing:
+            return existing, False
+        entry = WaitlistEntry.objects.create(event=event, user=user, position=_next_position(event.id))
+    return entry, True
+
+
+def leave(event_id, user):
+    """Drop the user's waiting entry; returns True if there was one."""
+    deleted, _ = WaitlistEntry.objects.filter(
+        event_id=event_id, user=user, status=WaitlistEntry.WAITING).delete()
+    return bool(deleted)
+
+
+def queue_position(entry):
+    """1-based place in line (counted over the WAITING index range)."""
+    return WaitlistEntry.objects.filter(
+        event_id=entry.event_id, status=WaitlistEntry.WAITING, position__lte=entry.position).count()
+
+
+def promote_next(event):
+    """Give a freed seat to the head of the queue; returns the new ticket or None.
+
+    Call inside the transaction that released the seat, and only after
+    stats.release_ticket returned True: a cancellation that lost the race
+    freed nothing. The seat itself is still taken with the conditional
+    reserve_ticket UPDATE. The head entry is locked (on backends that support
+    it) so concurrent cancellations promote different users.
+    """
+    for _ in range(MAX_PROMOTION_SKIPS):
+        entry = (WaitlistEntry.objects.select_for_update()
+                 .filter(event_id=event.id, status=WaitlistEntry.WAITING)
+                 .order_by('position')
+                 .first())
+        if entry is None:
+            return None
+        if Ticket.objects.filter(event_id=event.id, owner_id=entry.user_id).exists():
+            # bought a ticket directly in the meantime
+            entry.delete()
+            continue
+        if not reserve_ticket(event.id, event.effective_capacity):
+            return None
+        ticket = Ticket.objects.create(event_id=event.id, owner_id=entry.user_id)
+        entry.status = WaitlistEntry.PROMOTED
+        entry.ticket = ticket
+        entry.promoted_at = timezone.now()
+        entry.save(update_fields=['status', 'ticket', 'promoted_at'])
+        schedule_ticket_qr(ticket.id)
+        return ticket
+    return None
+
+
+def fill_free_seats(event):
+    """Promote waiting users while the event has seats left (e.g. after a capacity increase)."""
+    promoted = []
+    while True:
+        with transaction.atomic():
+            ticket = promote_next(event)
+        if ticket is None:
+            return promoted
+        promoted.append(ticket)
@@ -3,6 +3,7 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from event_management.models import Event
+from event_management.qr import ticket_token
 
 
 class Ticket(models.Model):
@@ -38,9 +39,10 @@ class Ticket(models.Model):
         ]
 
     def save(self, *args, **kwargs):
-        # Provide a deterministic textual payload the frontend can encode as a QR if needed
+        # Provide a deterministic textual payload the frontend can encode as a QR if needed.
+        # Signed, so scanners can reject forged codes without a lookup (see event_management.qr).
         if not self.qr_code:
-            self.qr_code = f"{self.event_id}:{self.owner_id}:{self.id}"
+            self.qr_code = ticket_token(self.event_id, self.id, self.created_at)
         return super().save(*args, **kwargs)
 
     def __str__(self):
@@ -0,0 +1,84 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+
+class _UserLRU:
+    """Thread-safe LRU of resolved users keyed by token jti, with a TTL."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, ttl):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            stored_at, user = item
+            if time.monotonic() - stored_at > ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self._lock:
+            self._data[key] = (time.monotonic(), user)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+user_cache = _UserLRU(maxsize=getattr(settings, "JWT_USER_CACHE_SIZE", 1024))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves a token at most once per request.
+
+    RoleAuthorizationMiddleware authenticates with this class first and the
+    result is memoized on the Django request (``request._jwt_user`` /
+    ``request._jwt_token``); DRF views declaring this class reuse it instead
+    of decoding the token and loading the user again.
+
+    When settings.JWT_USER_CACHE_TTL is > 0, resolved users are additionally
+    kept in a per-process LRU keyed by the token's jti for that many seconds,
+    so repeat requests with the same token skip the users-table lookup.
+    """
+
+    def authenticate(self, request):
+        # DRF passes its Request wrapper; the memo lives on the Django request
+        django_request = getattr(request, "_request", request)
+        header = self.get_header(request)
+        if getattr(django_request, "_jwt_header", None) == header and hasattr(django_request, "_jwt_user"):
+            user = django_request._jwt_user
+            return (user, django_request._jwt_token) if user is not None else None
+
+        result = super().authenticate(request)
+        django_request._jwt_header = header
+        django_request._jwt_user, django_request._jwt_token = result if result else (None, None)
+        return result
+
+    def get_user(self, validated_token):
+        ttl = getattr(settings, "JWT_USER_CACHE_TTL", 0)
+        jti = validated_token.get(api_settings.JTI_CLAIM) if ttl > 0 else None
+        if jti:
+            cached = user_cache.get(jti, ttl)
+            if cached is not None:
+                # hand out a copy so per-request mutations don't leak between requests
+                return copy.copy(cached)
+
+        user = super().get_user(validated_token)
+        if jti:
+            user_cache.set(jti, copy.copy(user))
+        return user
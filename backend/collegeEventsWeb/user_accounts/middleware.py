@@ -1,6 +1,8 @@
+import re
+
 from django.http import JsonResponse
 from django.urls import resolve
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from .authentication import CachedJWTAuthentication
 
 ROLE_PATH_RULES = {
     "student": [
@@ -26,8 +28,61 @@ OPEN_PATHS = [
     "/admin",
     # CSRF helper used by the SPA to set the csrftoken cookie
     "/api/csrf",
+    # Admission queue polling: signed token in the query string, no JWT lookup
+    "/api/queue/status",
+    # Public organizer calendar feeds (not the organizer-only /api/organizer/...)
+    "/api/organizers/",
 ]
 
+def _prefix_pattern(prefixes):
+    """Regex source matching any of `prefixes` at the start of a string.
+
+    The prefixes are folded into a character trie first and the trie is
+    emitted as nested alternations, so matching is one pass over the path
+    however many rules there are. A prefix that is itself a rule ends the
+    branch: anything after it matches.
+    """
+    end = object()
+    root = {}
+    for prefix in prefixes:
+        node = root
+        for ch in prefix:
+            node = node.setdefault(ch, {})
+        node[end] = True
+
+    def emit(node):
+        if end in node:
+            return ''
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else '(?:%s)' % '|'.join(branches)
+
+    return emit(root) if root else None
+
+
+class PathRuleMatcher:
+    """OPEN_PATHS / ROLE_PATH_RULES compiled once into prefix regexes."""
+
+    def __init__(self, open_paths, role_rules):
+        self._open = self._compile(open_paths)
+        self._roles = [
+            (role, rx) for role, rx in
+            ((role, self._compile(prefixes)) for role, prefixes in role_rules.items())
+            if rx is not None
+        ]
+
+    @staticmethod
+    def _compile(prefixes):
+        pattern = _prefix_pattern(prefixes)
+        return re.compile(pattern) if pattern is not None else None
+
+    def is_open(self, path):
+        return self._open is not None and self._open.match(path) is not None
+
+    def allowed_roles(self, path):
+        """Union of the roles whose rules cover `path` (empty: not role-restricted)."""
+        return frozenset(role for role, rx in self._roles if rx.match(path))
+
+
 class RoleAuthorizationMiddleware:
     """
     Enforces:
@@ -35,16 +90,28 @@ class RoleAuthorizationMiddleware:
       - Organizer → /organizer/*
       - Admin → /adminpanel/*
     If a path isn't listed above, it won't be blocked here (your view can still require auth).
+
+    The rule tables are compiled when the middleware is instantiated and the
+    outcome is stored on the request as ``request.role_authorization``
+    (None for open paths, otherwise the set of roles the path requires), so
+    the decision is made once per request.
     """
     def __init__(self, get_response):
         self.get_response = get_response
-        self.jwt_auth = JWTAuthentication()
+        # Memoizes the resolved user on the request for DRF views (see CachedJWTAuthentication)
+        self.jwt_auth = CachedJWTAuthentication()
+        self.rules = PathRuleMatcher(OPEN_PATHS, ROLE_PATH_RULES)
 
     def __call__(self, request):
+        if hasattr(request, "role_authorization"):
+            # Already decided for this request
+            return self.get_response(request)
+
         path = request.path
 
         # Skip open paths
-        if any(path.startswith(p) for p in OPEN_PATHS):
+        if self.rules.is_open(path):
+            request.role_authorization = None
             return self.get_response(request)
 
         # Try to authenticate via cookie or header
@@ -69,10 +136,8 @@ class RoleAuthorizationMiddleware:
             pass
 
         # Determine which roles are allowed for this path (collect all matches)
-        allowed_roles = set()
-        for role, prefixes in ROLE_PATH_RULES.items():
-            if any(path.startswith(prefix) for prefix in prefixes):
-                allowed_roles.add(role)
+        allowed_roles = self.rules.allowed_roles(path)
+        request.role_authorization = allowed_roles
 
         if allowed_roles:
             if not (getattr(request, "user", None) and request.user.is_authenticated):
@@ -21,6 +21,7 @@ from .serializers import (
     LoginSerializer,
     UserSerializer,
 )
+from event_management.sparse import shape_queryset
 
 UserModel = get_user_model()
 
@@ -248,6 +249,10 @@ class UserViewSet(viewsets.ModelViewSet):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAdminUser]
 
+    def get_queryset(self):
+        # ?fields= / ?omit= also narrow the selected columns
+        return shape_queryset(super().get_queryset(), self.get_serializer())
+
     @action(detail=True, methods=['post'])
     def approve_organizer(self, request, pk=None):
         user = self.get_object()
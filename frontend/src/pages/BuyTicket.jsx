@@ -107,8 +107,8 @@ export default function BuyTicket() {
               <span className="buy-label">When:</span>{" "}
               {start.toLocaleString()} {end ? <>— {end.toLocaleString()}</> : null}
             </div>
-            {event.venue && (
-              <div><span className="buy-label">Where:</span> {event.venue}</div>
+            {event.venue_name && (
+              <div><span className="buy-label">Where:</span> {event.venue_name}</div>
             )}
           </div>
 
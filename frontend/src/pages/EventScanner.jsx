@@ -182,16 +182,22 @@ export default function EventScanner(){
   const handleDecoded = async (decoded) => {
     setStatus('QR detected — processing')
     setLastResult({ raw: decoded })
-    const ticketId = extractTicketId(decoded)
-    if(!ticketId){
+    // Signed codes (TK1:...) go to the server as scanned; older codes carry a bare ticket id
+    const signed = /^TK1:/i.test((decoded || '').trim())
+    const ticketId = signed ? null : extractTicketId(decoded)
+    if(!signed && !ticketId){
       setError('Could not find a ticket id inside the scanned QR code.')
       setStatus('')
       return
     }
 
-    setStatus(`Checking in ticket ${ticketId}…`)
+    setStatus(signed ? 'Checking in ticket…' : `Checking in ticket ${ticketId}…`)
     try{
-      const res = await fetch(api(`/tickets/${ticketId}/checkin/`), { method: 'POST', headers: { 'Content-Type':'application/json', ...authHeaders() } })
+      const res = await fetch(api(`/events/${eventId}/checkin/scan/`), {
+        method: 'POST',
+        headers: { 'Content-Type':'application/json', ...authHeaders() },
+        body: JSON.stringify({ code: signed ? decoded.trim() : ticketId }),
+      })
       if(res.ok){
         const data = await res.json().catch(()=>null)
         setLastResult({ ticketId, success: true, detail: data || 'Checked in' })
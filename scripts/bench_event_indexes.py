@@ -0,0 +1,142 @@
+"""
+Show how the Event discovery queries use the Event indexes on a large table.
+
+Run from repository root (Python venv activated):
+
+  python scripts/bench_event_indexes.py --events 500000
+  USE_SQLITE=0 python scripts/bench_event_indexes.py --events 500000   # PostgreSQL from .env
+
+The script inserts synthetic events inside a transaction, prints EXPLAIN output
+and timings for the querysets built by EventViewSet.get_queryset, and rolls the
+transaction back so the database is left untouched. Pass --without-indexes to
+drop the Event indexes inside the same transaction for a before/after comparison.
+"""
+import os
+import sys
+import time
+import argparse
+import random
+from datetime import timedelta
+
+
+def configure_django():
+    # Ensure the project package (collegeEventsWeb) is importable.
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_root = os.path.join(repo_root, 'backend', 'collegeEventsWeb')
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'collegeEventsWeb.settings')
+    import django
+
+    django.setup()
+
+
+class Rollback(Exception):
+    pass
+
+
+def make_events(Event, count, batch_size, organizers):
+    from django.utils import timezone
+
+    now = timezone.now()
+    categories = ['Workshop', 'Concert', 'Conference', 'Sports', 'Social']
+    created = 0
+    while created < count:
+        batch = []
+        for i in range(min(batch_size, count - created)):
+            # Spread events two years back and one year ahead; ~5% pending approval
+            start = now + timedelta(hours=random.randint(-2 * 365 * 24, 365 * 24))
+            batch.append(Event(
+                title=f'Bench event {created + i}',
+                organization='Bench Org',
+                category=random.choice(categories),
+                start_time=start,
+                end_time=start + timedelta(hours=random.randint(1, 6)),
+                is_approved=random.random() > 0.05,
+                organizer=random.choice(organizers) if organizers else None,
+            ))
+        Event.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def viewset_queryset(params, user):
+    """Build the queryset exactly as EventViewSet.list would for these query params."""
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from event_management.views import EventViewSet
+
+    view = EventViewSet()
+    request = Request(APIRequestFactory().get('/api/events/', params))
+    request.user = user
+    view.request = request
+    view.format_kwarg = None
+    return view.get_queryset()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=500000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--without-indexes', action='store_true',
+                        help='Drop the Event indexes (inside the rolled-back transaction) before querying')
+    args = parser.parse_args(argv)
+
+    configure_django()
+
+    from django.contrib.auth.models import AnonymousUser
+    from django.db import connection, transaction
+    from django.utils import timezone
+    from event_management.models import Event
+    from user_accounts.models import User
+
+    print(f'Database vendor: {connection.vendor}')
+    try:
+        with transaction.atomic():
+            organizers = [
+                User(email=f'bench-organizer{i}@example.com', name=f'Bench Organizer {i}', role='organizer')
+                for i in range(20)
+            ]
+            organizers = User.objects.bulk_create(organizers)
+
+            t0 = time.perf_counter()
+            total = make_events(Event, args.events, args.batch_size, organizers)
+            print(f'Inserted {total} events in {time.perf_counter() - t0:.1f}s')
+
+            if args.without_indexes:
+                with connection.schema_editor() as editor:
+                    for index in Event._meta.indexes:
+                        editor.remove_index(Event, index)
+                print('Dropped Event indexes for this run')
+
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            staff = organizers[0]
+            staff.is_staff = True
+            today = timezone.localdate()
+            scenarios = [
+                ('public upcoming', {}, AnonymousUser()),
+                ('public upcoming, first page', {'page_size': args.page_size}, AnonymousUser()),
+                ('single day', {'date': today.isoformat()}, AnonymousUser()),
+                ('date range', {'from': today.isoformat(), 'to': (today + timedelta(days=7)).isoformat()}, AnonymousUser()),
+                ('pending approvals', {'is_approved': 'false'}, staff),
+                ('organizer dashboard', {'organizer': organizers[1].id}, staff),
+            ]
+            for label, params, user in scenarios:
+                qs = viewset_queryset(params, user)
+                if 'page_size' in params:
+                    qs = qs.order_by('start_time', 'id')[:params['page_size']]
+                print(f'\n== {label} {params or ""}')
+                print(qs.explain())
+                t0 = time.perf_counter()
+                rows = len(list(qs))
+                print(f'-> {rows} rows in {(time.perf_counter() - t0) * 1000:.1f} ms')
+            raise Rollback()
+    except Rollback:
+        print('\nRolled back benchmark data.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Measure the per-request overhead of RoleAuthorizationMiddleware with a large rule table.
+
+Run from repository root (Python venv activated):
+
+  python scripts/bench_role_middleware.py --rules 5000 --requests 20000
+
+The script swaps OPEN_PATHS / ROLE_PATH_RULES for a synthetic table, then times
+the path lookups alone (linear prefix scan vs the compiled PathRuleMatcher) and
+a full middleware call for anonymous requests that hit open, unrestricted and
+role-protected paths. Protected paths return 401 without touching the database.
+"""
+import os
+import sys
+import time
+import argparse
+import random
+
+
+def configure_django():
+    # Ensure the project package (collegeEventsWeb) is importable.
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_root = os.path.join(repo_root, 'backend', 'collegeEventsWeb')
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'collegeEventsWeb.settings')
+    import django
+
+    django.setup()
+
+
+def make_rules(count, roles):
+    words = ['events', 'tickets', 'organizer', 'reports', 'venues', 'billing', 'exports', 'teams']
+    prefixes = set()
+    while len(prefixes) < count:
+        prefixes.add('/api/%s/%s-%d' % (random.choice(words), random.choice(words), random.randint(0, count)))
+    prefixes = sorted(prefixes)
+    random.shuffle(prefixes)
+    open_count = max(count // 10, 1)
+    open_paths = prefixes[:open_count]
+    role_rules = {role: [] for role in roles}
+    for i, prefix in enumerate(prefixes[open_count:]):
+        role_rules[roles[i % len(roles)]].append(prefix)
+    return open_paths, role_rules
+
+
+def make_paths(open_paths, role_rules, count):
+    protected = [p for prefixes in role_rules.values() for p in prefixes]
+    paths = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            paths.append(random.choice(open_paths) + '/detail/')
+        elif kind == 1:
+            paths.append(random.choice(protected) + '/%d/' % i)
+        else:
+            paths.append('/api/unlisted/%d/' % i)
+    return paths
+
+
+def naive_lookup(open_paths, role_rules, path):
+    # The scan the middleware used before the rules were compiled
+    if any(path.startswith(p) for p in open_paths):
+        return None
+    return {role for role, prefixes in role_rules.items() if any(path.startswith(p) for p in prefixes)}
+
+
+def timed(label, n, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<34} {elapsed * 1000:9.1f} ms total  {elapsed / n * 1e6:8.2f} us/request')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark RoleAuthorizationMiddleware path matching')
+    parser.add_argument('--rules', type=int, default=5000, help='number of path prefixes in the table')
+    parser.add_argument('--requests', type=int, default=20000, help='number of request paths to check')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    configure_django()
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from user_accounts import middleware
+
+    random.seed(args.seed)
+    open_paths, role_rules = make_rules(args.rules, ['student', 'organizer', 'admin'])
+    paths = make_paths(open_paths, role_rules, args.requests)
+    print(f'{args.rules} prefixes, {args.requests} requests')
+
+    start = time.perf_counter()
+    matcher = middleware.PathRuleMatcher(open_paths, role_rules)
+    print(f'compile: {(time.perf_counter() - start) * 1000:.1f} ms')
+
+    def compiled_lookup(path):
+        return None if matcher.is_open(path) else matcher.allowed_roles(path)
+
+    for path in paths[:500]:
+        assert naive_lookup(open_paths, role_rules, path) == compiled_lookup(path), path
+
+    timed('lookup: linear prefix scan', len(paths),
+          lambda: [naive_lookup(open_paths, role_rules, p) for p in paths])
+    timed('lookup: compiled matcher', len(paths),
+          lambda: [compiled_lookup(p) for p in paths])
+
+    middleware.OPEN_PATHS, middleware.ROLE_PATH_RULES = open_paths, role_rules
+    mw = middleware.RoleAuthorizationMiddleware(lambda request: HttpResponse())
+    factory = RequestFactory()
+    requests = [factory.get(p) for p in paths]
+    timed('middleware call (anonymous)', len(requests), lambda: [mw(r) for r in requests])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Compare list serialization throughput: DRF serializers vs the values_list() fast path.
+
+Run from repository root (Python venv activated):
+
+  python scripts/bench_serializers.py
+  python scripts/bench_serializers.py --rows 1000 10000 --repeat 5
+
+For each size the script inserts that many events (with venues, organizers and
+EventStats rows) and as many tickets for one student inside a transaction,
+then times building the /api/events/ and /api/me/tickets/ list payloads both
+ways, from the queryset to the list of dicts (query included, JSON rendering
+excluded). It checks the two outputs are equal, prints rows/s for each, and
+rolls the transaction back so the database is left untouched.
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import timedelta
+
+
+def configure_django():
+    # Ensure the project package (collegeEventsWeb) is importable.
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_root = os.path.join(repo_root, 'backend', 'collegeEventsWeb')
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'collegeEventsWeb.settings')
+    import django
+
+    django.setup()
+
+
+class Rollback(Exception):
+    pass
+
+
+def make_rows(count, batch_size):
+    """Insert count events and one ticket per event for a single student; return the student."""
+    from django.utils import timezone
+    from event_management.models import Event, EventStats, Ticket, Venue
+    from user_accounts.models import User
+
+    organizers = User.objects.bulk_create([
+        User(email=f'bench-serializer-org{i}@example.com', name=f'Bench Organizer {i}', role='organizer')
+        for i in range(10)
+    ])
+    student = User.objects.create(email='bench-serializer-student@example.com', name='Bench Student')
+    venues = Venue.objects.bulk_create([
+        Venue(name=f'Bench Hall {i}', address='1 Campus Way', capacity=200) for i in range(10)
+    ])
+    now = timezone.now()
+    created = 0
+    while created < count:
+        n = min(batch_size, count - created)
+        events = Event.objects.bulk_create([
+            Event(
+                title=f'Bench event {created + i}',
+                description='Synthetic event for serializer benchmarks',
+                organization='Bench Org',
+                category='Workshop',
+                start_time=now + timedelta(hours=created + i),
+                end_time=now + timedelta(hours=created + i + 2),
+                organizer=organizers[i % len(organizers)],
+                venue=venues[i % len(venues)] if i % 4 else None,
+                capacity=100,
+            )
+            for i in range(n)
+        ])
+        # bulk_create skips the post_save signal that creates stats rows
+        EventStats.objects.bulk_create([EventStats(event=e, tickets_issued=1) for e in events])
+        Ticket.objects.bulk_create([
+            Ticket(event=e, owner=student, qr=f'qr_codes/bench-{e.pk}.png' if e.pk % 2 else None)
+            for e in events
+        ])
+        created += n
+    return student
+
+
+def api_request(path, user):
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    request = Request(APIRequestFactory().get(path, HTTP_HOST='localhost'))
+    request.user = user
+    return request
+
+
+def best_of(repeat, fn):
+    best, result = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement; the best is reported')
+    args = parser.parse_args(argv)
+
+    configure_django()
+
+    from django.contrib.auth.models import AnonymousUser
+    from django.db import transaction
+    from event_management.fastpath import EVENT_ROWS, TICKET_ROWS
+    from event_management.models import Event, Ticket
+    from event_management.serializers import EventSerializer, TicketSerializer
+
+    print(f'{"rows":>8}  {"endpoint":<16} {"serializer rows/s":>18} {"fast path rows/s":>17} {"speedup":>8}')
+    for count in args.rows:
+        try:
+            with transaction.atomic():
+                student = make_rows(count, args.batch_size)
+                events = Event.objects.filter(title__startswith='Bench event ').order_by('start_time')
+                tickets = Ticket.objects.filter(owner=student).order_by('-event__start_time', '-id')
+                cases = [
+                    ('/api/events/', api_request('/api/events/', AnonymousUser()),
+                     events.select_related('organizer', 'stats', 'venue'), EventSerializer, EVENT_ROWS),
+                    ('/api/me/tickets/', api_request('/api/me/tickets/', student),
+                     tickets.select_related('event__organizer', 'event__stats', 'event__venue'),
+                     TicketSerializer, TICKET_ROWS),
+                ]
+                for label, request, queryset, serializer_class, converter in cases:
+                    slow_time, slow = best_of(args.repeat, lambda: serializer_class(
+                        queryset.all(), many=True, context={'request': request}).data)
+                    fast_time, fast = best_of(args.repeat, lambda: converter.to_representation(
+                        converter.rows(queryset.all()), request))
+                    if [dict(row) for row in slow] != fast:
+                        print(f'!! {label}: fast path output differs from {serializer_class.__name__}')
+                    print(f'{count:>8}  {label:<16} {count / slow_time:>18,.0f} {count / fast_time:>17,.0f} '
+                          f'{slow_time / fast_time:>7.1f}x')
+                raise Rollback()
+        except Rollback:
+            pass
+    print('\nRolled back benchmark data.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Load-test ticket purchases with and without the admission queue.
+
+Run from repository root (Python venv activated):
+
+  python scripts/loadtest_admission.py --buyers 10000 --capacity 500
+  python scripts/loadtest_admission.py --buyers 2000 --mode queue --max-active 20
+
+The script builds a throwaway SQLite database in a temp directory, creates the
+buyers and one event, then drives the API in-process (django.test.Client) from
+a pool of --concurrency threads. Each buyer either hammers /buy/ directly
+(retrying on 503) or joins /queue/, polls /api/queue/status/ and buys once
+admitted. It reports p50/p99 latency of the /buy/ requests and of each buyer's
+end-to-end wait, how many requests reached the purchase transaction, and
+checks that the event was not oversold.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def configure_django():
+    # Ensure the project package (collegeEventsWeb) is importable.
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_root = os.path.join(repo_root, 'backend', 'collegeEventsWeb')
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'collegeEventsWeb.settings')
+    os.environ['USE_SQLITE'] = '1'
+    import django
+
+    django.setup()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buy_ms = []
+        self.total_ms = []
+        self.codes = Counter()
+        self.polls = 0
+
+    def add_buy(self, ms, code):
+        with self.lock:
+            self.buy_ms.append(ms)
+            self.codes[code] += 1
+
+
+def run_scenario(mode, event, tokens, args):
+    from django.db import connection
+    from django.test import Client
+
+    stats = Stats()
+    buy_url = f'/api/events/{event.id}/buy/'
+    queue_url = f'/api/events/{event.id}/queue/'
+    poll_s = args.poll_ms / 1000.0
+
+    def timed_buy(client, headers):
+        start = time.perf_counter()
+        response = client.post(buy_url, **headers)
+        stats.add_buy((time.perf_counter() - start) * 1000, response.status_code)
+        return response.status_code
+
+    def buyer(token):
+        client = Client()
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        started = time.perf_counter()
+        try:
+            while True:
+                headers = dict(auth)
+                if mode == 'queue':
+                    data = client.post(queue_url, **auth).json()
+                    queue_token = data['token']
+                    while data['status'] == 'waiting':
+                        time.sleep(poll_s)
+                        data = client.get('/api/queue/status/', {'token': queue_token}).json()
+                        with stats.lock:
+                            stats.polls += 1
+                    if data['status'] == 'sold_out':
+                        break
+                    headers['HTTP_X_ADMISSION_TOKEN'] = queue_token
+                code = timed_buy(client, headers)
+                if code in (503, 429):
+                    time.sleep(0.01)
+                    continue
+                break
+            with stats.lock:
+                stats.total_ms.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(buyer, tokens))
+    wall = time.perf_counter() - wall
+    return stats, wall
+
+
+def report(mode, stats, wall, event):
+    from event_management.models import EventStats, Ticket
+
+    sold = Ticket.objects.filter(event=event).count()
+    counter = EventStats.objects.get(event=event).tickets_issued
+    reached_db = sum(n for code, n in stats.codes.items() if code != 429)
+    print(f'\n== {mode} ==')
+    print(f'wall time          {wall:8.1f} s')
+    print(f'/buy/ requests     {sum(stats.codes.values()):8d}  reaching the purchase path: {reached_db}')
+    print(f'status polls       {stats.polls:8d}')
+    print('status codes       ' + ', '.join(f'{code}: {n}' for code, n in sorted(stats.codes.items())))
+    print(f'/buy/ latency      p50 {percentile(stats.buy_ms, 50):8.1f} ms   p99 {percentile(stats.buy_ms, 99):8.1f} ms')
+    print(f'end-to-end         p50 {percentile(stats.total_ms, 50):8.1f} ms   p99 {percentile(stats.total_ms, 99):8.1f} ms')
+    print(f'tickets sold       {sold} (counter {counter}, capacity {event.capacity})'
+          + ('  OVERSOLD!' if sold > event.capacity or counter != sold else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test buy_ticket with and without the admission queue')
+    parser.add_argument('--buyers', type=int, default=10000)
+    parser.add_argument('--capacity', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=256, help='client threads (buyers in flight)')
+    parser.add_argument('--mode', choices=['both', 'direct', 'queue'], default='both')
+    parser.add_argument('--max-active', type=int, default=50, help='ADMISSION_MAX_ACTIVE for the queue run')
+    parser.add_argument('--poll-ms', type=int, default=250, help='client status polling interval')
+    args = parser.parse_args()
+
+    configure_django()
+    import logging
+    # every sold-out 409 is logged as a warning otherwise
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import override_settings, setup_test_environment
+    from django.utils import timezone
+    from datetime import timedelta
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from event_management import admission
+    from event_management.models import Event
+    from user_accounts.models import User
+
+    tmpdir = tempfile.mkdtemp(prefix='admission-load-')
+    settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = os.path.join(tmpdir, 'load.sqlite3')
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        User.objects.bulk_create([
+            User(email=f'buyer{i}@load.test', name=f'Buyer {i}', role='student', password='!')
+            for i in range(args.buyers)
+        ], batch_size=1000)
+        tokens = [str(RefreshToken.for_user(u).access_token)
+                  for u in User.objects.filter(email__endswith='@load.test').iterator()]
+        print(f'{len(tokens)} buyers, capacity {args.capacity}, {args.concurrency} client threads')
+
+        modes = ['direct', 'queue'] if args.mode == 'both' else [args.mode]
+        for mode in modes:
+            event = Event.objects.create(
+                title=f'Load test ({mode})', description='', organization='Load', category='Concert',
+                start_time=timezone.now() + timedelta(days=1),
+                end_time=timezone.now() + timedelta(days=1, hours=2),
+                capacity=args.capacity, is_approved=True,
+            )
+            admission.reset()
+            # Users are cached per token in both runs so the comparison isolates the purchase path
+            with override_settings(ADMISSION_QUEUE_ENABLED=(mode == 'queue'),
+                                   ADMISSION_MAX_ACTIVE=args.max_active,
+                                   JWT_USER_CACHE_TTL=600):
+                stats, wall = run_scenario(mode, event, tokens, args)
+            report(mode, stats, wall, event)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()